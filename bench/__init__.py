@@ -0,0 +1,4 @@
+"""Cross-runtime benchmark harness.
+
+Usage: ``python -m bench run io --runtimes asyncio,uvloop,trio,curio``.
+"""
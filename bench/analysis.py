@@ -0,0 +1,174 @@
+"""Statistics for deciding whether one result set really beats another.
+
+Pure Python on purpose: the numbers here gate loop choices, so they must
+be reproducible on any box that can run the benchmarks themselves.
+"""
+import math
+import random
+import statistics
+
+from bench import results
+
+
+def detect_warmup(values, max_fraction=0.5):
+    """Number of leading iterations that sit above the steady state.
+
+    The steady state is the median and MAD of the second half; leading
+    samples are dropped while they exceed median + 3 robust sigmas, at
+    most ``max_fraction`` of the run.
+    """
+    if len(values) < 4:
+        return 0
+    tail = values[len(values) // 2:]
+    center = statistics.median(tail)
+    mad = statistics.median(abs(v - center) for v in tail) * 1.4826
+    limit = center + 3 * mad if mad > 0 else center * 1.05
+    warmup = 0
+    while warmup < int(len(values) * max_fraction) and values[warmup] > limit:
+        warmup += 1
+    return warmup
+
+
+def trim_outliers(values, k=1.5):
+    """Splits ``values`` into (kept, removed) with Tukey's ``k`` * IQR fences."""
+    if len(values) < 4:
+        return list(values), []
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    low, high = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    kept = [v for v in values if low <= v <= high]
+    removed = [v for v in values if not low <= v <= high]
+    return kept, removed
+
+
+def bootstrap_ci(values, stat=statistics.mean, confidence=0.95, resamples=10000, seed=0):
+    """Percentile bootstrap confidence interval of ``stat(values)``."""
+    if len(values) < 2:
+        return (values[0], values[0]) if values else (None, None)
+    rng = random.Random(seed)
+    n = len(values)
+    estimates = sorted(stat(rng.choices(values, k=n)) for _ in range(resamples))
+    alpha = (1 - confidence) / 2
+    return estimates[int(alpha * resamples)], estimates[min(int((1 - alpha) * resamples), resamples - 1)]
+
+
+def bootstrap_ratio_ci(baseline, candidate, stat=statistics.median, confidence=0.95,
+                       resamples=10000, seed=0):
+    """Bootstrap CI of ``stat(candidate) / stat(baseline) - 1`` (relative difference)."""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        base = stat(rng.choices(baseline, k=len(baseline)))
+        cand = stat(rng.choices(candidate, k=len(candidate)))
+        if base:
+            ratios.append(cand / base - 1)
+    ratios.sort()
+    alpha = (1 - confidence) / 2
+    return ratios[int(alpha * len(ratios))], ratios[min(int((1 - alpha) * len(ratios)), len(ratios) - 1)]
+
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test (normal approximation, tie-corrected).
+
+    Returns ``(u, p_value)`` where ``u`` is the statistic of ``a``.
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return None, 1.0
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    r1 = sum(r for r, (_, group) in zip(ranks, combined) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    var_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return u1, 1.0
+    z = (abs(u1 - mean_u) - 0.5) / math.sqrt(var_u)
+    p = math.erfc(max(z, 0) / math.sqrt(2))
+    return u1, min(p, 1.0)
+
+
+def prepare(values, warmup=None, trim=True):
+    """Drops warmup iterations (detected when ``warmup`` is None) and outliers."""
+    skip = detect_warmup(values) if warmup is None else warmup
+    steady = list(values[skip:])
+    removed = []
+    if trim:
+        steady, removed = trim_outliers(steady)
+    return steady, {"warmup": skip, "outliers": len(removed)}
+
+
+def compare(baseline, candidate, lower_is_better=True, alpha=0.05, threshold=0.02,
+            warmup=None, trim=True):
+    """Compares two samples of one metric and returns a verdict dict.
+
+    A change is significant when the Mann-Whitney p-value is below
+    ``alpha`` and the bootstrap CI of the relative median difference
+    excludes zero; it is a regression when it also moves the wrong way
+    by more than ``threshold``.
+    """
+    base, base_info = prepare(baseline, warmup, trim)
+    cand, cand_info = prepare(candidate, warmup, trim)
+    base_median = statistics.median(base)
+    cand_median = statistics.median(cand)
+    rel = cand_median / base_median - 1 if base_median else None
+    rel_ci = bootstrap_ratio_ci(base, cand) if base_median else (None, None)
+    _, p = mann_whitney(base, cand)
+
+    significant = p < alpha and rel_ci[0] is not None and (rel_ci[0] > 0 or rel_ci[1] < 0)
+    worse = rel is not None and (rel > threshold if lower_is_better else rel < -threshold)
+    better = rel is not None and (rel < -threshold if lower_is_better else rel > threshold)
+    if significant and worse:
+        verdict = "regression"
+    elif significant and better:
+        verdict = "improvement"
+    else:
+        verdict = "no significant difference"
+    return {
+        "baseline": {"n": len(base), "median": base_median,
+                     "median_ci": bootstrap_ci(base, statistics.median), **base_info},
+        "candidate": {"n": len(cand), "median": cand_median,
+                      "median_ci": bootstrap_ci(cand, statistics.median), **cand_info},
+        "relative_difference": rel,
+        "relative_difference_ci": rel_ci,
+        "p_value": p,
+        "verdict": verdict,
+    }
+
+
+def _p99(sample):
+    hist = results.histogram(sample)
+    return hist.value_at_percentile(99) if hist is not None and hist.count else None
+
+
+# name -> (value of a loaded sample, lower is better)
+METRICS = {
+    "seconds": (lambda s: s["seconds"], True),
+    "throughput": (lambda s: s.get("throughput"), False),
+    "p99": (_p99, True),
+}
+
+
+def metric_values(record, metric):
+    extract, _ = METRICS[metric]
+    return [v for v in (extract(s) for s in record["samples"]) if v is not None]
+
+
+def select(records, workload, spec):
+    """Latest record of ``workload`` matching ``runtime`` or ``runtime@run_id``."""
+    runtime, _, run_id = spec.partition("@")
+    matches = [r for r in records
+               if r.get("kind") == "run" and r["workload"] == workload and r["runtime"] == runtime
+               and (not run_id or r["run_id"] == run_id)]
+    return matches[-1] if matches else None
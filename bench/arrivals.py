@@ -0,0 +1,49 @@
+"""Arrival schedules for open-loop load generation.
+
+Each schedule yields the intended send time of every request as an offset
+in seconds from the start of the run, independently of how fast the
+server answers.
+"""
+import random
+
+
+def fixed(rate, duration):
+    """Evenly spaced requests at ``rate`` per second."""
+    # Computed from the index so float drift never adds a request.
+    for i in range(int(duration * rate)):
+        yield i / rate
+
+
+def poisson(rate, duration, seed=None):
+    """Exponentially distributed gaps averaging ``rate`` per second."""
+    rng = random.Random(seed)
+    t = rng.expovariate(rate)
+    while t < duration:
+        yield t
+        t += rng.expovariate(rate)
+
+
+def ramp(rate, duration, ramp_to):
+    """Rate rising linearly from ``rate`` to ``ramp_to`` over ``duration``."""
+    t = 0.0
+    while t < duration:
+        yield t
+        current = rate + (ramp_to - rate) * t / duration
+        t += 1.0 / max(current, 1e-9)
+
+
+ARRIVALS = ("fixed", "poisson", "ramp")
+
+
+def schedule(kind, rate, duration, ramp_to=None, seed=None):
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if kind == "fixed":
+        return fixed(rate, duration)
+    if kind == "poisson":
+        return poisson(rate, duration, seed)
+    if kind == "ramp":
+        if ramp_to is None:
+            raise ValueError("a ramp schedule needs a final rate")
+        return ramp(rate, duration, ramp_to)
+    raise ValueError(f"unknown arrival schedule {kind!r} (choose from {', '.join(ARRIVALS)})")
@@ -0,0 +1,391 @@
+import argparse
+import importlib.util
+
+from bench import analysis, clients, matrix, results, runtimes, servers, sweep
+from bench.parallel import run_parallel
+from bench.report import print_stats
+from bench.runner import RunOptions, pin_cpus, run_isolated, run_workload
+from bench.workloads import WORKLOADS
+from bench.workloads.network import NetworkWorkload
+
+
+def _runtime_list(value):
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in runtimes.RUNTIMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown runtime(s) {', '.join(unknown)} (choose from {', '.join(runtimes.RUNTIMES)})")
+    return names
+
+
+def _client_list(value):
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    unknown = [n for n in names if n not in clients.CLIENTS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown client(s) {', '.join(unknown)} (choose from {', '.join(clients.CLIENTS)})")
+    return names
+
+
+def _int_list(value):
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}") from None
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an integer, got {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected 1 or more, got {value!r}")
+    return number
+
+
+def _positive_int_list(value):
+    return [_positive_int(v) for v in value.split(",") if v.strip()]
+
+
+def _add_common(p, cls, iterations):
+    p.add_argument("--runtimes", type=_runtime_list, default=None,
+                   help="comma-separated runtimes (default: every installed one)")
+    p.add_argument("--iterations", type=int, default=iterations,
+                   help=f"measured iterations per runtime (default: {iterations})")
+    p.add_argument("--processes", type=int, default=1,
+                   help="worker processes sharing the load, one loop each (default: 1)")
+    m = p.add_argument_group("measurement control")
+    m.add_argument("--warmup", type=int, default=0,
+                   help="unrecorded iterations run before measuring (default: 0)")
+    m.add_argument("--target-ci", type=float, default=None, metavar="PCT",
+                   help="keep iterating until the 95%% CI of the mean is narrower than PCT%% "
+                        "of it (--iterations becomes the minimum)")
+    m.add_argument("--max-iterations", type=int, default=None,
+                   help="cap for --target-ci (default: 10 x --iterations)")
+    m.add_argument("--time-budget", type=float, default=None,
+                   help="seconds after which --target-ci stops iterating anyway")
+    m.add_argument("--pin-cpus", type=_int_list, default=None, metavar="LIST",
+                   help="comma-separated CPUs to pin to (workers get one each)")
+    m.add_argument("--no-gc", action="store_true",
+                   help="collect, then disable the garbage collector during each iteration")
+    m.add_argument("--trace-memory", action="store_true",
+                   help="also record peak Python allocations (tracemalloc) and GC object "
+                        "growth per iteration; slows the run")
+    m.add_argument("--instrument", action="store_true",
+                   help="probe loop lag and time every task step alongside each iteration "
+                        "(puts asyncio loops in debug mode)")
+    m.add_argument("--lag-interval", type=float, default=0.005, metavar="SECONDS",
+                   help="sleep of the loop-lag probe (default: 0.005)")
+    m.add_argument("--slow-step", type=float, default=0.01, metavar="SECONDS",
+                   help="task steps at least this long count as slow (default: 0.01)")
+    m.add_argument("--isolate", action="store_true",
+                   help="run every iteration in a fresh process")
+    p.add_argument("--results", default=results.DEFAULT_PATH,
+                   help=f"JSONL store the records are appended to (default: {results.DEFAULT_PATH})")
+    p.add_argument("--no-save", action="store_true", help="do not write to the result store")
+    cls.add_arguments(p)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bench", description="Cross-runtime async benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="show workloads and installed runtimes")
+
+    run = sub.add_parser("run", help="run a workload under one or more runtimes")
+    workloads = run.add_subparsers(dest="workload", required=True)
+    for name, cls in WORKLOADS.items():
+        p = workloads.add_parser(name, help=cls.__doc__.splitlines()[0])
+        _add_common(p, cls, cls.iterations)
+
+    p = sub.add_parser("sweep", help="network throughput/latency over a grid of concurrency levels")
+    _add_common(p, NetworkWorkload, 1)
+    grid = p.add_argument_group("sweep grid")
+    grid.add_argument("--levels", type=_positive_int_list, default=None,
+                      help="explicit comma-separated concurrency levels (overrides the range)")
+    grid.add_argument("--min-concurrency", type=_positive_int, default=1)
+    grid.add_argument("--max-concurrency", type=_positive_int, default=10000)
+    grid.add_argument("--points", type=int, default=9, help="log-spaced levels in the range")
+    grid.add_argument("--request-counts", type=_int_list, default=[5000],
+                      help="comma-separated request totals per point (default: 5000)")
+    grid.add_argument("--plot", action="store_true",
+                      help="save sweep_throughput.png and sweep_latency.png (needs matplotlib)")
+
+    p = sub.add_parser("matrix", help="network throughput/p99 of every client under every runtime")
+    _add_common(p, NetworkWorkload, 1)
+    p.add_argument("--clients", type=_client_list, default=None,
+                   help="comma-separated clients (default: every one; --client is ignored)")
+    p.add_argument("--plot", action="store_true",
+                   help="save matrix_throughput.png and matrix_p99.png heatmaps (needs matplotlib)")
+
+    p = sub.add_parser("compare", help="statistically compare two stored result sets")
+    p.add_argument("--workload", required=True, choices=sorted(WORKLOADS))
+    p.add_argument("--baseline", required=True, help="runtime or runtime@run_id")
+    p.add_argument("--candidate", required=True, help="runtime or runtime@run_id")
+    p.add_argument("--results", default=results.DEFAULT_PATH, help="store holding the candidate")
+    p.add_argument("--baseline-results", default=None,
+                   help="store holding the baseline (default: same as --results)")
+    p.add_argument("--metric", choices=sorted(analysis.METRICS), default="seconds")
+    p.add_argument("--warmup", type=int, default=None,
+                   help="leading iterations to drop (default: detected)")
+    p.add_argument("--no-trim", action="store_true", help="keep IQR outliers")
+    p.add_argument("--alpha", type=float, default=0.05)
+    p.add_argument("--threshold", type=float, default=0.02,
+                   help="relative change below which nothing is flagged (default: 0.02)")
+    p.add_argument("--fail-on-regression", action="store_true",
+                   help="exit with status 1 when a regression is flagged")
+
+    p = sub.add_parser("serve", help="run a local target server for the network/web workloads")
+    p.add_argument("--backend", choices=servers.BACKENDS, default="asyncio")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--workers", type=int, default=1,
+                   help="server processes sharing the port through SO_REUSEPORT")
+    p.add_argument("--response-size", type=int, default=17, help="response body bytes")
+    p.add_argument("--delay-dist", choices=servers.DELAYS, default="none",
+                   help="distribution of the artificial per-request latency")
+    p.add_argument("--delay-ms", type=float, default=0.0, help="mean artificial latency")
+    p.add_argument("--error-rate", type=float, default=0.0,
+                   help="fraction of requests answered with a 500")
+    p.add_argument("--seed", type=int, default=None)
+    faults = p.add_argument_group("fault injection")
+    faults.add_argument("--reset-rate", type=float, default=0.0,
+                        help="fraction of requests answered by resetting the connection")
+    faults.add_argument("--stall-rate", type=float, default=0.0,
+                        help="fraction of requests never answered; the connection stays "
+                             "open until the client closes it")
+    faults.add_argument("--slow-rate", type=float, default=0.0,
+                        help="fraction of requests delayed by an extra --slow-ms")
+    faults.add_argument("--slow-ms", type=float, default=1000.0)
+    p.add_argument("--tls", action="store_true",
+                   help="serve HTTPS; without --certfile a self-signed localhost certificate "
+                        "is created in bench_tls/")
+    p.add_argument("--certfile", default=None)
+    p.add_argument("--keyfile", default=None)
+    p.add_argument("--http2", action="store_true",
+                   help="offer HTTP/2 next to HTTP/1.1 through ALPN (needs TLS, the asyncio or "
+                        "uvloop backend and the h2 package)")
+    return parser
+
+
+def cmd_list(args):
+    print("Workloads:")
+    for name, cls in WORKLOADS.items():
+        print(f"  {name:<10} {cls.__doc__.splitlines()[0]}")
+    print("Runtimes:")
+    for name, cls in runtimes.RUNTIMES.items():
+        state = "installed" if cls.available() else f"missing {', '.join(cls.requires)}"
+        print(f"  {name:<10} {state}")
+
+
+def _usable_runtimes(workload, names):
+    """Yields the adapters for ``names``, announcing each one that is skipped."""
+    for name in names or runtimes.installed():
+        print("=" * 50)
+        try:
+            rt = runtimes.get_runtime(name)
+        except RuntimeError as e:
+            print(f"skipping {name}: {e}")
+            continue
+        reason = workload.unsupported(rt)
+        if reason:
+            print(f"skipping {name}: {reason}")
+            continue
+        yield rt
+
+
+def _save(args, record):
+    if not args.no_save:
+        results.append(args.results, record)
+
+
+def _run_options(args):
+    """Validates the measurement controls and pins the coordinating process."""
+    if args.processes > 1 and (args.isolate or args.target_ci is not None):
+        raise SystemExit("--processes cannot be combined with --isolate or --target-ci")
+    if args.pin_cpus and args.processes <= 1 and not pin_cpus(args.pin_cpus):
+        print("warning: CPU pinning is not supported on this platform")
+    return RunOptions.from_args(args)
+
+
+def cmd_run(args):
+    workload = WORKLOADS[args.workload](args)
+    if workload.isolated and args.processes <= 1:
+        args.isolate = True
+    run_id = results.new_run_id()
+    options = _run_options(args)
+
+    workload.setup()
+    try:
+        for rt in _usable_runtimes(workload, args.runtimes):
+            count = (f"{args.iterations}+ iterations until CI < {args.target_ci}%"
+                     if args.target_ci is not None else f"{args.iterations} iterations")
+            print(f"{rt.name} {workload.name} bench ({count}, {args.warmup} warmup, "
+                  f"{args.processes} process{'es' if args.processes > 1 else ''})")
+
+            def on_sample(sample, rt=rt):
+                print(workload.format_sample(rt, sample))
+
+            if args.processes > 1:
+                samples = run_parallel(workload, rt, options, args.processes, on_sample,
+                                       args.pin_cpus)
+            elif args.isolate:
+                samples = run_isolated(workload, rt, options, on_sample)
+            else:
+                samples = run_workload(workload, rt, options, on_sample)
+            print_stats(rt, samples, workload)
+            _save(args, results.make_record(run_id, "run", workload.name, rt.name, args, samples))
+    finally:
+        workload.teardown()
+
+
+def cmd_sweep(args):
+    if args.rate is not None:
+        raise SystemExit("sweep measures the closed loop; drop --rate")
+    levels = args.levels or sweep.log_levels(args.min_concurrency, args.max_concurrency, args.points)
+    workload = NetworkWorkload(args)
+    run_id = results.new_run_id()
+    options = _run_options(args)
+
+    rows = []
+    workload.setup()
+    try:
+        for rt in _usable_runtimes(workload, args.runtimes):
+            print(f"{rt.name} sweep over concurrency {levels}, requests {args.request_counts}")
+            rt_rows = sweep.sweep_runtime(workload, rt, levels, args.request_counts, options,
+                                          args.processes, args.isolate, args.pin_cpus)
+            sweep.print_table(rt_rows)
+            rows.extend(rt_rows)
+            _save(args, results.make_record(run_id, "sweep", workload.name, rt.name, args,
+                                            extra={"points": rt_rows}))
+    finally:
+        workload.teardown()
+
+    if not rows:
+        return
+    print("=" * 50)
+    for (runtime, requests), knee in sweep.knees(rows).items():
+        print(f"{runtime} ({requests} requests): knee at concurrency {knee if knee else '-'}")
+    if args.plot:
+        sweep.save_plots(rows)
+
+
+def cmd_matrix(args):
+    if args.rate is not None:
+        raise SystemExit("matrix measures the closed loop; drop --rate")
+    names = args.clients or list(clients.CLIENTS)
+    workload = NetworkWorkload(args)
+    run_id = results.new_run_id()
+    options = _run_options(args)
+
+    rows = []
+    workload.setup()
+    try:
+        for name in args.runtimes or runtimes.installed():
+            print("=" * 50)
+            try:
+                rt = runtimes.get_runtime(name)
+            except RuntimeError as e:
+                print(f"skipping {name}: {e}")
+                continue
+            rt_rows = []
+            for client in names:
+                row = matrix.run_cell(workload, rt, client, options, args.processes,
+                                      args.isolate, args.pin_cpus)
+                if "skipped" in row:
+                    print(f"{rt.name} x {client}: skipped ({row['skipped']})")
+                else:
+                    p99 = f"{row['p99'] * 1000:.3f}" if row["p99"] is not None else "-"
+                    print(f"{rt.name} x {client}: {row['throughput']:.2f} req/s, "
+                          f"p99 {p99} ms, {row['errors']} errors")
+                rt_rows.append(row)
+            rows.extend(rt_rows)
+            _save(args, results.make_record(run_id, "matrix", workload.name, rt.name, args,
+                                            extra={"points": rt_rows}))
+    finally:
+        workload.teardown()
+
+    if not rows:
+        return
+    print("=" * 50)
+    matrix.print_table(rows, "throughput", "throughput (req/s):")
+    matrix.print_table(rows, "p99", "p99 latency (ms):")
+    if args.plot:
+        matrix.save_plots(rows)
+
+
+def cmd_compare(args):
+    candidates = results.load(args.results)
+    baselines = results.load(args.baseline_results) if args.baseline_results else candidates
+    base = analysis.select(baselines, args.workload, args.baseline)
+    cand = analysis.select(candidates, args.workload, args.candidate)
+    for spec, record in ((args.baseline, base), (args.candidate, cand)):
+        if record is None:
+            raise SystemExit(f"no {args.workload} run found for {spec}")
+
+    _, lower_is_better = analysis.METRICS[args.metric]
+    base_values = analysis.metric_values(base, args.metric)
+    cand_values = analysis.metric_values(cand, args.metric)
+    if len(base_values) < 2 or len(cand_values) < 2:
+        raise SystemExit(f"need at least 2 samples of {args.metric} on each side")
+
+    result = analysis.compare(base_values, cand_values, lower_is_better, args.alpha,
+                              args.threshold, args.warmup, not args.no_trim)
+    print(f"metric: {args.metric} ({'lower' if lower_is_better else 'higher'} is better)")
+    for side, record in (("baseline", base), ("candidate", cand)):
+        r = result[side]
+        lo, hi = r["median_ci"]
+        print(f"{side:<10} {record['runtime']}@{record['run_id']}  n={r['n']} "
+              f"(warmup {r['warmup']}, outliers {r['outliers']})  "
+              f"median {r['median']:.9f} [{lo:.9f}, {hi:.9f}]")
+    rel = result["relative_difference"]
+    lo, hi = result["relative_difference_ci"]
+    print(f"relative difference: {rel:+.2%} [{lo:+.2%}, {hi:+.2%}], "
+          f"Mann-Whitney p={result['p_value']:.4g} -> {result['verdict']}")
+    if args.fail_on_regression and result["verdict"] == "regression":
+        raise SystemExit(1)
+
+
+def cmd_serve(args):
+    behaviour = servers.Behaviour(args.response_size, args.delay_dist, args.delay_ms,
+                                  args.error_rate, args.seed, args.reset_rate, args.stall_rate,
+                                  args.slow_rate, args.slow_ms)
+    if args.backend == "uvicorn" and behaviour.drops_connections:
+        raise SystemExit("Error: uvicorn cannot reset or stall connections; pick another backend")
+    tls = None
+    if args.tls or args.certfile:
+        if args.certfile:
+            tls = (args.certfile, args.keyfile or args.certfile)
+        else:
+            tls = servers.self_signed_certificate()
+            print(f"self-signed certificate: {tls[0]} (give it to clients as their CA)")
+    if args.http2:
+        if tls is None or args.backend not in ("asyncio", "uvloop"):
+            raise SystemExit("Error: --http2 needs --tls and the asyncio or uvloop backend")
+        if importlib.util.find_spec("h2") is None:
+            raise SystemExit("Error: --http2 needs the h2 package (pip install h2)")
+    scheme = "https" if tls else "http"
+    print(f"{args.backend} server on {scheme}://{args.host}:{args.port} ({args.workers} worker(s)"
+          f"{', HTTP/2 and HTTP/1.1' if args.http2 else ''})")
+    try:
+        servers.serve(args.backend, args.host, args.port, behaviour, args.workers, tls,
+                      args.http2)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "list":
+        cmd_list(args)
+    elif args.command == "run":
+        cmd_run(args)
+    elif args.command == "sweep":
+        cmd_sweep(args)
+    elif args.command == "matrix":
+        cmd_matrix(args)
+    elif args.command == "compare":
+        cmd_compare(args)
+    elif args.command == "serve":
+        cmd_serve(args)
@@ -0,0 +1,149 @@
+"""HTTP client adapters shared by the network and web workloads and the matrix.
+
+Each adapter is an async context manager exposing ``await client.get(url)``
+which returns the response status code. Options are passed through to the
+underlying library untouched, so a workload decides how a pool is sized.
+"""
+import importlib.util
+
+from bench.native_http import NativeClient
+
+
+class HttpxClient:
+    name = "httpx"
+    # httpcore only ships asyncio and trio backends.
+    families = ("asyncio", "trio")
+    requires = ("httpx",)
+
+    def __init__(self, rt, **options):
+        import httpx
+        if "max_connections" in options or "max_keepalive_connections" in options:
+            options["limits"] = httpx.Limits(
+                max_connections=options.pop("max_connections", 100),
+                max_keepalive_connections=options.pop("max_keepalive_connections", 20),
+            )
+        self._client = httpx.AsyncClient(**options)
+
+    async def __aenter__(self):
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._client.__aexit__(exc_type, exc, tb)
+
+    async def get(self, url, **kwargs):
+        resp = await self._client.get(url, **kwargs)
+        return resp.status_code
+
+
+class AiohttpClient:
+    name = "aiohttp"
+    families = ("asyncio",)
+    requires = ("aiohttp",)
+
+    def __init__(self, rt, **options):
+        self._options = options
+        self._session = None
+
+    async def __aenter__(self):
+        import aiohttp
+        options = dict(self._options)
+        if "limit" in options or "limit_per_host" in options:
+            options["connector"] = aiohttp.TCPConnector(
+                limit=options.pop("limit", 100),
+                limit_per_host=options.pop("limit_per_host", 0),
+            )
+        # The session must be built inside the running loop.
+        self._session = aiohttp.ClientSession(**options)
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._session.__aexit__(exc_type, exc, tb)
+
+    async def get(self, url, **kwargs):
+        async with self._session.get(url, **kwargs) as resp:
+            return resp.status
+
+
+class AsksClient:
+    name = "asks"
+    # asks 3 runs on anyio, which dropped curio.
+    families = ("asyncio", "trio")
+    requires = ("asks",)
+
+    def __init__(self, rt, connections=100, **options):
+        import asks
+        # asks defaults to a single pooled connection; 100 matches the
+        # default limit of aiohttp and httpx.
+        self._session = asks.Session(connections=connections, **options)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def get(self, url, **kwargs):
+        resp = await self._session.get(url, **kwargs)
+        return resp.status_code
+
+
+class _AnyioStream:
+    """anyio byte stream behind the send/receive/close surface of native_http."""
+
+    def __init__(self, stream, end_of_stream):
+        self._stream = stream
+        self._end_of_stream = end_of_stream
+
+    async def send(self, data):
+        await self._stream.send(data)
+
+    async def receive(self):
+        try:
+            return await self._stream.receive(65536)
+        except self._end_of_stream:
+            return b""
+
+    async def close(self):
+        await self._stream.aclose()
+
+
+async def _connect_anyio(rt, host, port):
+    import anyio
+    return _AnyioStream(await anyio.connect_tcp(host, port), anyio.EndOfStream)
+
+
+class AnyioClient(NativeClient):
+    """The native client's HTTP/1.1 over anyio streams instead of the runtime's own.
+
+    Against ``native`` it isolates what the anyio layer costs.
+    """
+
+    name = "anyio"
+    families = ("asyncio", "trio")
+    requires = ("anyio",)
+
+    def __init__(self, rt, **options):
+        super().__init__(rt, **options)
+        self._connect = _connect_anyio
+
+
+CLIENTS = {cls.name: cls
+           for cls in (HttpxClient, AiohttpClient, AsksClient, AnyioClient, NativeClient)}
+
+
+def compatible(rt):
+    """Names of the installed clients able to run under runtime ``rt``."""
+    return [name for name, cls in CLIENTS.items()
+            if rt.family in cls.families
+            and all(importlib.util.find_spec(m) is not None for m in cls.requires)]
+
+
+def open_client(name, rt, **options):
+    """Builds client ``name`` for runtime ``rt``; use it as ``async with``."""
+    try:
+        cls = CLIENTS[name]
+    except KeyError:
+        raise ValueError(f"unknown client {name!r} (choose from {', '.join(CLIENTS)})") from None
+    return cls(rt, **options)
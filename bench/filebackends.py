@@ -0,0 +1,266 @@
+"""Alternative asyncio file backends for the io workload.
+
+aiofiles, trio.open_file and curio.aopen all push every open, read, write
+and close through a worker thread. The backends here keep the workload
+unchanged but swap how those calls reach the kernel, to separate the cost
+of the thread hand-off from the cost of the syscalls:
+
+* ``default``: the runtime's own wrapper (``rt.open_file``).
+* ``uring``: reads and writes are submitted to one io_uring per loop,
+  through the optional ``liburing`` binding, and completions are reaped
+  from an eventfd registered with the loop. Submissions made in one loop
+  iteration go to the kernel in a single ``io_uring_submit``, at most a
+  ring's worth at a time; the rest queue until completions free slots.
+  Falls back to ``preadv`` when the binding or the kernel support is
+  missing.
+* ``preadv``: ``os.preadv``/``os.pwritev`` in the loop's default executor,
+  the same thread hops as aiofiles without its wrapper objects.
+* ``direct``: the same syscalls made on the loop thread, with no hand-off
+  at all. It blocks the loop, so it is only a lower bound.
+
+``open`` and ``close`` are plain syscalls on the loop thread for
+``uring`` and ``direct``; the binding used here has no ``openat``.
+"""
+import collections
+import contextlib
+import itertools
+import os
+
+BACKENDS = ("default", "uring", "preadv", "direct")
+
+_FLAGS = {
+    "r": os.O_RDONLY,
+    "w": os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+    "a": os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+}
+
+
+def uring_unavailable():
+    """Why io_uring cannot be used here, or None if it can."""
+    try:
+        import liburing
+    except ImportError:
+        return "the liburing binding is not installed"
+    if not hasattr(os, "eventfd"):
+        return "os.eventfd is not available"
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(2, ring)
+    except OSError as e:
+        return f"the kernel refused io_uring_setup ({e.strerror})"
+    liburing.io_uring_queue_exit(ring)
+    return None
+
+
+def resolve(backend):
+    """Returns ``(backend actually used, reason for a fallback or None)``."""
+    if backend == "uring":
+        reason = uring_unavailable()
+        if reason:
+            return "preadv", reason
+    return backend, None
+
+
+class _Ring:
+    """One io_uring bound to a running asyncio loop.
+
+    At most ``entries`` operations are in the kernel at once, so the
+    completion queue (twice that size) cannot overflow; later ones wait in
+    a backlog and are submitted as completions come in.
+    """
+
+    def __init__(self, loop, entries=256):
+        import liburing
+        self._lib = liburing
+        self._loop = loop
+        self._ring = liburing.Ring()
+        self._cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(entries, self._ring)
+        self._efd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        liburing.io_uring_register_eventfd(self._ring, self._efd)
+        loop.add_reader(self._efd, self._reap)
+        self._entries = entries
+        self._in_flight = 0
+        # (prep function, fd, buffer, offset, future) beyond the ring's capacity
+        self._backlog = collections.deque()
+        # user_data -> (future, buffer the kernel may still be using)
+        self._waiters = {}
+        self._ids = itertools.count()
+        self._flush_pending = False
+
+    def _submit(self, prep, fd, buf, offset):
+        future = self._loop.create_future()
+        if self._in_flight < self._entries:
+            self._start(prep, fd, buf, offset, future)
+        else:
+            self._backlog.append((prep, fd, buf, offset, future))
+        return future
+
+    def _start(self, prep, fd, buf, offset, future):
+        # Fewer than ``entries`` operations are in flight, so a slot is free.
+        sqe = self._lib.io_uring_get_sqe(self._ring)
+        prep(sqe, fd, buf, offset)
+        key = next(self._ids)
+        self._lib.io_uring_sqe_set_data64(sqe, key)
+        self._waiters[key] = (future, buf)
+        self._in_flight += 1
+        if not self._flush_pending:
+            self._flush_pending = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        self._lib.io_uring_submit(self._ring)
+
+    def read(self, fd, buf, offset):
+        return self._submit(self._lib.io_uring_prep_read, fd, buf, offset)
+
+    def write(self, fd, buf, offset):
+        return self._submit(self._lib.io_uring_prep_write, fd, buf, offset)
+
+    def _reap(self):
+        try:
+            os.eventfd_read(self._efd)
+        except BlockingIOError:
+            pass
+        lib = self._lib
+        flushed_overflow = False
+        while True:
+            try:
+                lib.io_uring_peek_cqe(self._ring, self._cqe)
+            except BlockingIOError:
+                if not flushed_overflow and lib.io_uring_cq_has_overflow(self._ring):
+                    # Completions that found the queue full wait in the
+                    # kernel until asked for.
+                    lib.io_uring_get_events(self._ring)
+                    flushed_overflow = True
+                    continue
+                break
+            entry = self._cqe[0]
+            key = entry.user_data
+            try:
+                # .res raises OSError for a failed operation.
+                res, error = entry.res, None
+            except OSError as e:
+                res, error = None, e
+            lib.io_uring_cqe_seen(self._ring, entry)
+            self._in_flight -= 1
+            future, _ = self._waiters.pop(key)
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(res)
+        while self._backlog and self._in_flight < self._entries:
+            item = self._backlog.popleft()
+            if not item[-1].cancelled():
+                self._start(*item)
+
+    def close(self):
+        self._loop.remove_reader(self._efd)
+        self._lib.io_uring_queue_exit(self._ring)
+        os.close(self._efd)
+
+
+class _File:
+    """File with awaitable ``read``/``write`` over positional syscalls."""
+
+    def __init__(self, fd, text, pread, pwrite):
+        self._fd = fd
+        self._text = text
+        self._pread = pread
+        self._pwrite = pwrite
+        self._offset = 0
+
+    async def read(self, size=-1):
+        if size is None or size < 0:
+            size = max(os.fstat(self._fd).st_size - self._offset, 0)
+        buf = bytearray(size)
+        got = await self._pread(self._fd, buf, self._offset)
+        while 0 < got < size:
+            # Short read: fetch the rest into a fresh buffer.
+            rest = bytearray(size - got)
+            n = await self._pread(self._fd, rest, self._offset + got)
+            if not n:
+                break
+            buf[got:got + n] = rest[:n]
+            got += n
+        self._offset += got
+        del buf[got:]
+        return buf.decode() if self._text else bytes(buf)
+
+    async def write(self, data):
+        buf = bytearray(data.encode() if self._text else data)
+        done = 0
+        while done < len(buf):
+            done += await self._pwrite(self._fd, buf[done:] if done else buf, self._offset + done)
+        self._offset += done
+        return len(data)
+
+
+def _flags(mode):
+    flags = _FLAGS[mode.replace("b", "").replace("t", "")]
+    return flags | getattr(os, "O_CLOEXEC", 0), "b" not in mode
+
+
+@contextlib.asynccontextmanager
+async def _open_inline(path, mode, pread, pwrite):
+    flags, text = _flags(mode)
+    fd = os.open(path, flags, 0o644)
+    try:
+        yield _File(fd, text, pread, pwrite)
+    finally:
+        os.close(fd)
+
+
+@contextlib.asynccontextmanager
+async def _open_threaded(loop, path, mode):
+    flags, text = _flags(mode)
+
+    def pread(fd, buf, offset):
+        return loop.run_in_executor(None, os.preadv, fd, [buf], offset)
+
+    def pwrite(fd, buf, offset):
+        return loop.run_in_executor(None, os.pwritev, fd, [buf], offset)
+
+    fd = await loop.run_in_executor(None, os.open, path, flags, 0o644)
+    try:
+        yield _File(fd, text, pread, pwrite)
+    finally:
+        await loop.run_in_executor(None, os.close, fd)
+
+
+async def _pread_direct(fd, buf, offset):
+    return os.preadv(fd, [buf], offset)
+
+
+async def _pwrite_direct(fd, buf, offset):
+    return os.pwritev(fd, [buf], offset)
+
+
+@contextlib.asynccontextmanager
+async def opener(backend, rt):
+    """Yields an ``open_file(path, mode)`` for ``backend`` on the running loop.
+
+    ``backend`` should already have gone through :func:`resolve`; every
+    backend but ``default`` needs an asyncio-family runtime.
+    """
+    if backend == "default":
+        yield rt.open_file
+        return
+
+    import asyncio
+    loop = asyncio.get_running_loop()
+    if backend == "preadv":
+        yield lambda path, mode: _open_threaded(loop, path, mode)
+    elif backend == "direct":
+        yield lambda path, mode: _open_inline(path, mode, _pread_direct, _pwrite_direct)
+    elif backend == "uring":
+        ring = _Ring(loop)
+        try:
+            yield lambda path, mode: _open_inline(path, mode, ring.read, ring.write)
+        finally:
+            ring.close()
+    else:
+        raise ValueError(f"unknown file backend {backend!r} (choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,202 @@
+"""Fixed-memory, log-bucketed latency histogram (HdrHistogram layout).
+
+Latencies are recorded in seconds and stored as integer microsecond counts
+in buckets whose width grows with magnitude, so every recorded value is
+kept to ``significant_figures`` digits of precision while the memory used
+is fixed at construction time whatever the number of requests.
+Histograms with the same configuration can be merged, and ``to_dict()``
+/ ``from_dict()`` carry them across processes or into result files.
+"""
+import math
+from array import array
+
+TICKS_PER_SECOND = 1_000_000
+
+
+class Histogram:
+    def __init__(self, highest_seconds=60.0, significant_figures=3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.highest_seconds = highest_seconds
+        self.significant_figures = significant_figures
+        self._highest = max(2, int(highest_seconds * TICKS_PER_SECOND))
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        sub_bucket_count_magnitude = math.ceil(math.log2(largest_single_unit))
+        self._half_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._sub_bucket_count = 1 << (self._half_magnitude + 1)
+        self._half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count
+        while smallest_untrackable <= self._highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self._counts = array("q", bytes(8 * (bucket_count + 1) * self._half_count))
+
+        self.count = 0
+        self._min = None
+        self._max = 0
+        self._sum = 0
+
+    # --- indexing -----------------------------------------------------
+
+    def _index(self, ticks):
+        bucket = (ticks | self._sub_bucket_mask).bit_length() - (self._half_magnitude + 1)
+        sub_bucket = ticks >> bucket
+        return ((bucket + 1) << self._half_magnitude) + (sub_bucket - self._half_count)
+
+    def _range(self, index):
+        """(lowest, highest) tick values that land in counts slot ``index``."""
+        bucket = (index >> self._half_magnitude) - 1
+        sub_bucket = (index & (self._half_count - 1)) + self._half_count
+        if bucket < 0:
+            sub_bucket -= self._half_count
+            bucket = 0
+        lowest = sub_bucket << bucket
+        return lowest, lowest + (1 << bucket) - 1
+
+    # --- recording ----------------------------------------------------
+
+    def record(self, seconds, count=1):
+        ticks = min(max(int(seconds * TICKS_PER_SECOND), 0), self._highest)
+        self._counts[self._index(ticks)] += count
+        self.count += count
+        self._sum += ticks * count
+        if self._min is None or ticks < self._min:
+            self._min = ticks
+        if ticks > self._max:
+            self._max = ticks
+
+    def record_corrected(self, seconds, expected_interval, count=1):
+        """Records ``seconds`` plus the samples a stalled closed loop never sent.
+
+        A request that took N expected intervals hid N - 1 requests that
+        would have been issued meanwhile; they are backfilled with
+        linearly decreasing latencies, as HdrHistogram does.
+        """
+        self.record(seconds, count)
+        if expected_interval is None or expected_interval <= 0:
+            return
+        missing = seconds - expected_interval
+        while missing >= expected_interval:
+            self.record(missing, count)
+            missing -= expected_interval
+
+    def corrected(self, expected_interval):
+        """Returns a coordinated-omission-corrected copy of this histogram."""
+        out = self._empty_like()
+        for index, count in self._nonzero():
+            highest = min(self._range(index)[1], self._max)
+            out.record_corrected(highest / TICKS_PER_SECOND, expected_interval, count)
+        return out
+
+    def corrected_percentiles(self, expected_interval, points=(99, 99.9)):
+        """Coordinated-omission-corrected percentiles, never below the raw ones.
+
+        The backfilled samples sit below the stalled one, so they can pull a
+        corrected percentile slightly under the raw value; each one is
+        clamped to the raw percentile.
+        """
+        corrected = self.corrected(expected_interval)
+        return {p: max(corrected.value_at_percentile(p), self.value_at_percentile(p))
+                for p in points}
+
+    def merge(self, other):
+        if len(other._counts) != len(self._counts) or other._half_magnitude != self._half_magnitude:
+            raise ValueError("cannot merge histograms with different configurations")
+        for index, count in other._nonzero():
+            self._counts[index] += count
+        self.count += other.count
+        self._sum += other._sum
+        if other._min is not None and (self._min is None or other._min < self._min):
+            self._min = other._min
+        self._max = max(self._max, other._max)
+        return self
+
+    # --- queries ------------------------------------------------------
+
+    def _nonzero(self):
+        return ((i, c) for i, c in enumerate(self._counts) if c)
+
+    def value_at_percentile(self, percentile):
+        """Latency in seconds below which ``percentile`` % of samples fall."""
+        if not self.count:
+            return None
+        target = max(1, int(percentile / 100 * self.count + 0.5))
+        seen = 0
+        for index, count in self._nonzero():
+            seen += count
+            if seen >= target:
+                return min(self._range(index)[1], self._max) / TICKS_PER_SECOND
+        return self.max
+
+    @property
+    def min(self):
+        return None if self._min is None else self._min / TICKS_PER_SECOND
+
+    @property
+    def max(self):
+        return self._max / TICKS_PER_SECOND
+
+    @property
+    def mean(self):
+        return self._sum / self.count / TICKS_PER_SECOND if self.count else None
+
+    def percentiles(self, points=(50, 90, 99, 99.9)):
+        return {p: self.value_at_percentile(p) for p in points}
+
+    # --- (de)serialization --------------------------------------------
+
+    def _empty_like(self):
+        return Histogram(self.highest_seconds, self.significant_figures)
+
+    def to_dict(self):
+        return {
+            "highest_seconds": self.highest_seconds,
+            "significant_figures": self.significant_figures,
+            "count": self.count,
+            "min": self._min,
+            "max": self._max,
+            "sum": self._sum,
+            "counts": {str(i): c for i, c in self._nonzero()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data["highest_seconds"], data["significant_figures"])
+        for index, count in data["counts"].items():
+            hist._counts[int(index)] = count
+        hist.count = data["count"]
+        hist._min = data["min"]
+        hist._max = data["max"]
+        hist._sum = data["sum"]
+        return hist
+
+    def __repr__(self):
+        return f"<Histogram count={self.count} max={self.max:.6f}s>"
+
+
+def merged(histograms):
+    """Merges an iterable of histograms into a new one (None if empty)."""
+    out = None
+    for hist in histograms:
+        if out is None:
+            out = hist._empty_like()
+        out.merge(hist)
+    return out
+
+
+def format_latency(hist, expected_interval=None):
+    """One line of percentiles; adds the corrected p99 when an interval is known."""
+    if hist is None or not hist.count:
+        return "latency: no successful requests"
+    parts = [f"p{p:g}={v * 1000:.3f}ms" for p, v in hist.percentiles().items()]
+    parts.append(f"max={hist.max * 1000:.3f}ms")
+    line = "latency: " + " ".join(parts)
+    if expected_interval:
+        corrected = hist.corrected_percentiles(expected_interval)
+        line += (f" | CO-corrected p99={corrected[99] * 1000:.3f}ms"
+                 f" p99.9={corrected[99.9] * 1000:.3f}ms")
+    return line
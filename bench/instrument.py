@@ -0,0 +1,224 @@
+"""Loop instrumentation that runs alongside any workload.
+
+Two probes tell a slow client loop apart from a slow server:
+
+* the lag probe, a task that sleeps ``interval`` seconds in a loop and
+  records how late each wakeup is. Lag is time the loop could not get
+  back to a ready task, so it covers every kind of stall;
+* the step tracer, which times every task step (one run of a task
+  between two suspensions) and keeps the slowest ones. asyncio and uvloop
+  report steps through debug mode's slow-callback warnings with the
+  threshold at zero, trio through an Instrument's before/after_task_step
+  and curio through a kernel Activation's running/suspended hooks.
+
+Debug mode makes asyncio loops noticeably slower, so instrumented runs
+should only be compared with other instrumented runs.
+"""
+import contextlib
+import heapq
+import logging
+import re
+import time
+
+from bench.histogram import Histogram, merged
+
+# Slowest steps kept per sample, with what was running.
+_KEEP = 5
+
+
+class LagProbe:
+    """Records how late each of a stream of fixed sleeps wakes up."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.hist = Histogram()
+
+    async def run(self, rt):
+        while True:
+            due = time.perf_counter() + self.interval
+            await rt.sleep(self.interval)
+            self.hist.record(max(time.perf_counter() - due, 0.0))
+
+
+class StepRecorder:
+    """Step-time histogram plus the count and descriptions of slow steps."""
+
+    def __init__(self, slow):
+        self.slow = slow
+        self.hist = Histogram()
+        self.slow_count = 0
+        self._slowest = []
+
+    def record(self, seconds, describe):
+        """``describe()`` names the step; it is only called for slow ones."""
+        self.hist.record(seconds)
+        if seconds >= self.slow:
+            self.slow_count += 1
+            entry = (seconds, describe())
+            if len(self._slowest) < _KEEP:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        return [list(entry) for entry in sorted(self._slowest, reverse=True)]
+
+
+def _describe_handle(handle):
+    """The coroutine behind an asyncio handle's repr, or the start of the repr."""
+    text = str(handle)
+    match = re.search(r"coro=<([^\s(]+)", text)
+    return match.group(1) if match else text[:120]
+
+
+class _AsyncioStepHandler(logging.Handler):
+    def __init__(self, recorder):
+        super().__init__()
+        self._recorder = recorder
+
+    def emit(self, record):
+        # Both loops log ``"Executing %s took %.3f seconds", handle, delta``.
+        if record.msg.startswith("Executing") and len(record.args) == 2:
+            handle, seconds = record.args
+            self._recorder.record(seconds, lambda: _describe_handle(handle))
+
+
+@contextlib.asynccontextmanager
+async def _trace_asyncio(recorder):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    logger = logging.getLogger("asyncio")
+    handler = _AsyncioStepHandler(recorder)
+    saved = (loop.get_debug(), loop.slow_callback_duration, logger.level, logger.propagate)
+    loop.set_debug(True)
+    loop.slow_callback_duration = 0
+    logger.setLevel(logging.WARNING)
+    # The records are data here, not warnings for the console.
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        yield
+    finally:
+        logger.removeHandler(handler)
+        loop.set_debug(saved[0])
+        loop.slow_callback_duration = saved[1]
+        logger.setLevel(saved[2])
+        logger.propagate = saved[3]
+
+
+@contextlib.asynccontextmanager
+async def _trace_trio(recorder):
+    import trio
+
+    class StepInstrument(trio.abc.Instrument):
+        def __init__(self):
+            self._started = {}
+
+        def before_task_step(self, task):
+            self._started[task] = time.perf_counter()
+
+        def after_task_step(self, task):
+            started = self._started.pop(task, None)
+            if started is not None:
+                recorder.record(time.perf_counter() - started, lambda: task.name)
+
+    instrument = StepInstrument()
+    trio.lowlevel.add_instrument(instrument)
+    try:
+        yield
+    finally:
+        trio.lowlevel.remove_instrument(instrument)
+
+
+@contextlib.asynccontextmanager
+async def _trace_curio(recorder):
+    from curio.kernel import Activation
+    from curio.traps import _get_kernel
+
+    class StepActivation(Activation):
+        def __init__(self):
+            self._started = {}
+
+        def running(self, task):
+            self._started[task] = time.perf_counter()
+
+        def suspended(self, task, trap):
+            started = self._started.pop(task, None)
+            if started is not None:
+                recorder.record(time.perf_counter() - started, lambda: task.name)
+
+    # The kernel loop reads this list on every step, so an activation can
+    # join and leave a kernel that is already running.
+    kernel = await _get_kernel()
+    activation = StepActivation()
+    activation.activate(kernel)
+    kernel._activations.append(activation)
+    try:
+        yield
+    finally:
+        kernel._activations.remove(activation)
+
+
+TRACERS = {"asyncio": _trace_asyncio, "trio": _trace_trio, "curio": _trace_curio}
+
+
+class Probes:
+    """What one instrumented iteration observed; ``fields()`` goes into its sample."""
+
+    def __init__(self, lag_interval, slow_step):
+        self.lag = LagProbe(lag_interval)
+        self.steps = StepRecorder(slow_step)
+
+    def fields(self):
+        return {
+            "loop_lag": self.lag.hist,
+            "steps": self.steps.hist,
+            "slow_steps": self.steps.slow_count,
+            "slowest_steps": self.steps.slowest,
+        }
+
+
+@contextlib.asynccontextmanager
+async def instrumented(rt, lag_interval=0.005, slow_step=0.01):
+    """Runs the lag probe and the step tracer for the duration of the block."""
+    probes = Probes(lag_interval, slow_step)
+    async with TRACERS[rt.family](probes.steps):
+        async with rt.open_group() as g:
+            await g.spawn(probes.lag.run, rt)
+            try:
+                yield probes
+            finally:
+                await g.cancel()
+
+
+def merge_fields(merged_sample, samples):
+    """Merges the instrumentation of parallel workers' samples into ``merged_sample``."""
+    if "loop_lag" not in samples[0] or "loop_lag" in merged_sample:
+        return merged_sample
+    merged_sample["loop_lag"] = merged(s["loop_lag"] for s in samples)
+    merged_sample["steps"] = merged(s["steps"] for s in samples)
+    merged_sample["slow_steps"] = sum(s["slow_steps"] for s in samples)
+    slowest = sorted((entry for s in samples for entry in s["slowest_steps"]), reverse=True)
+    merged_sample["slowest_steps"] = slowest[:_KEEP]
+    return merged_sample
+
+
+def format_probes(samples):
+    """Lines summarizing loop lag and task steps over the samples, or None."""
+    if "loop_lag" not in samples[0]:
+        return None
+    lines = []
+    for label, key in (("loop lag", "loop_lag"), ("task steps", "steps")):
+        hist = merged(s[key] for s in samples)
+        if hist is not None and hist.count:
+            parts = [f"p{p:g}={v * 1000:.3f}ms" for p, v in hist.percentiles().items()]
+            lines.append(f"{label}: " + " ".join(parts) + f" max={hist.max * 1000:.3f}ms")
+    slow = sum(s["slow_steps"] for s in samples)
+    slowest = sorted((entry for s in samples for entry in s["slowest_steps"]), reverse=True)
+    line = f"slow steps: {slow}"
+    if slowest:
+        seconds, description = slowest[0]
+        line += f", slowest {seconds * 1000:.3f}ms in {description}"
+    lines.append(line)
+    return "\n".join(lines)
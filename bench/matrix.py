@@ -0,0 +1,85 @@
+"""Client x runtime matrix: every HTTP client under every runtime.
+
+Runs the closed-loop network workload once per (client, runtime) pair
+against the same URL, so client-library cost can be told apart from
+runtime cost: a row that is slow everywhere is the client, a column that
+is slow for every client is the runtime. Pairs that cannot run (asks
+under curio, aiohttp under trio, ...) are kept as empty cells with the
+reason.
+"""
+from bench.histogram import merged
+from bench.parallel import run_parallel
+from bench.runner import run_isolated, run_workload
+
+
+def run_cell(workload, rt, client, options, processes=1, isolate=False, cpus=None):
+    """One matrix cell: the network workload under ``rt`` with ``client``."""
+    workload.args.client = client
+    reason = workload.unsupported(rt)
+    if reason:
+        return {"runtime": rt.name, "client": client, "skipped": reason}
+    if processes > 1:
+        samples = run_parallel(workload, rt, options, processes, cpus=cpus)
+    elif isolate:
+        samples = run_isolated(workload, rt, options)
+    else:
+        samples = run_workload(workload, rt, options)
+    hist = merged(s["histogram"] for s in samples)
+    return {
+        "runtime": rt.name,
+        "client": client,
+        "throughput": sum(s["throughput"] for s in samples) / len(samples),
+        "p50": hist.value_at_percentile(50),
+        "p99": hist.value_at_percentile(99),
+        "errors": sum(s["issued"] - s["requests"] for s in samples),
+    }
+
+
+def _grid(rows):
+    runtimes = list(dict.fromkeys(r["runtime"] for r in rows))
+    clients = list(dict.fromkeys(r["client"] for r in rows))
+    cells = {(r["client"], r["runtime"]): r for r in rows}
+    return clients, runtimes, cells
+
+
+def _value(row, metric):
+    if row is None or "skipped" in row or row[metric] is None:
+        return None
+    return row[metric] * 1000 if metric in ("p50", "p99") else row[metric]
+
+
+def print_table(rows, metric, title):
+    """Clients down, runtimes across; ``-`` marks pairs that cannot run."""
+    clients, runtimes, cells = _grid(rows)
+    print(title)
+    print(f"{'':<10}" + "".join(f"{name:>12}" for name in runtimes))
+    for client in clients:
+        values = [_value(cells.get((client, runtime)), metric) for runtime in runtimes]
+        print(f"{client:<10}" + "".join(f"{'-' if v is None else f'{v:.2f}':>12}"
+                                        for v in values))
+
+
+def save_plots(rows, prefix="matrix"):
+    """Throughput and p99 heatmaps, one cell per client x runtime (needs matplotlib)."""
+    import matplotlib.pyplot as plt
+
+    clients, runtimes, cells = _grid(rows)
+    for metric, title, unit, colors in (("throughput", "Throughput", "req/s", "viridis"),
+                                        ("p99", "p99 Latency", "milliseconds", "viridis_r")):
+        values = [[_value(cells.get((c, r)), metric) for r in runtimes] for c in clients]
+        # Missing cells are NaN, which imshow leaves blank.
+        data = [[float("nan") if v is None else v for v in row] for row in values]
+        fig, ax = plt.subplots(figsize=(2 + 1.6 * len(runtimes), 1.5 + 0.8 * len(clients)))
+        image = ax.imshow(data, cmap=colors, aspect="auto")
+        ax.set_xticks(range(len(runtimes)), runtimes)
+        ax.set_yticks(range(len(clients)), clients)
+        for i, row in enumerate(values):
+            for j, v in enumerate(row):
+                ax.text(j, i, "n/a" if v is None else f"{v:.0f}" if metric == "throughput"
+                        else f"{v:.2f}", ha="center", va="center", color="w")
+        fig.colorbar(image, ax=ax, label=unit)
+        ax.set_title(f"{title}: client x runtime")
+        fig.tight_layout()
+        fig.savefig(f"{prefix}_{metric}.png")
+        plt.close(fig)
+        print(f"Saved: {prefix}_{metric}.png")
@@ -0,0 +1,110 @@
+"""Process memory probes for the memory-sensitive workloads.
+
+Peak RSS comes from ``VmHWM`` in /proc/self/status, whose high-water mark
+Linux lets a process reset through /proc/self/clear_refs, so it can be
+measured per iteration. Elsewhere it falls back to ``ru_maxrss``, the
+peak since the process started, and on Windows it is not recorded. Python-level allocations come from
+tracemalloc, which slows allocation down noticeably, so it is opt-in,
+and so is the count of objects tracked by the garbage collector.
+"""
+import gc
+import sys
+import tracemalloc
+
+# Sample fields the runner records around every iteration.
+FIELDS = ("peak_rss", "allocated_peak", "objects")
+
+
+def _status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def current_rss():
+    """Resident set size in bytes, or None where /proc is unavailable."""
+    kb = _status_kb("VmRSS")
+    return kb * 1024 if kb is not None else None
+
+
+def reset_peak_rss():
+    """Resets the peak-RSS high-water mark; False where that is unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak resident set size in bytes, or None where it cannot be read."""
+    kb = _status_kb("VmHWM")
+    if kb is not None:
+        return kb * 1024
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module.
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Tracker:
+    """Measures peak RSS and, with ``trace``, allocations over a block.
+
+    After the block, ``peak_rss`` is in bytes, ``rss_since_reset`` says
+    whether it covers only the block, and with ``trace`` set
+    ``allocated_peak`` is the most Python memory allocated at once above
+    what was live when the block started, and ``objects`` the growth in
+    GC-tracked objects.
+    """
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.peak_rss = None
+        self.rss_since_reset = False
+        self.allocated_peak = None
+        self.objects = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._baseline, _ = tracemalloc.get_traced_memory()
+            self._objects = len(gc.get_objects())
+        self.rss_since_reset = reset_peak_rss()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.peak_rss = peak_rss()
+        if self.trace:
+            self.objects = len(gc.get_objects()) - self._objects
+            _, peak = tracemalloc.get_traced_memory()
+            self.allocated_peak = peak - self._baseline
+            if self._started_tracing:
+                tracemalloc.stop()
+        return False
+
+
+def merge_fields(merged, samples):
+    """Sums the memory fields of parallel workers' samples into ``merged``.
+
+    Workloads that record these fields themselves have already merged them.
+    """
+    for key in FIELDS:
+        if key not in merged:
+            values = [s[key] for s in samples if s.get(key) is not None]
+            if values:
+                merged[key] = sum(values)
+    return merged
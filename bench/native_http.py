@@ -0,0 +1,401 @@
+"""Minimal HTTP/1.1 client on each runtime's native streams.
+
+Built only from what the loop itself provides (an ``asyncio.Protocol``,
+``trio.SocketStream`` or a curio socket) plus a small sans-IO response
+parser, so a benchmark through it measures the event loop rather than
+httpx/httpcore or aiohttp parsing. Connections are kept alive and may
+pipeline up to ``pipeline`` requests each; a new connection is opened
+only when every existing one already has that many in flight.
+"""
+import collections
+import functools
+import socket
+from urllib.parse import urlsplit
+
+
+class Response(collections.namedtuple("Response", "status headers body keep_alive")):
+    __slots__ = ()
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class ResponseParser:
+    """Incremental parser: feed() bytes, get back every completed Response."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._head = None        # (status, headers, keep_alive) once parsed
+        self._length = None      # remaining body bytes, or None
+        self._chunked = False
+        self._until_eof = False
+        self._body = bytearray()
+
+    def feed(self, data):
+        """Parses ``data``; an empty ``data`` means the peer closed."""
+        if not data:
+            if self._head is not None and self._until_eof:
+                return [self._finish()]
+            if self._head is not None or self._buf:
+                raise ProtocolError("connection closed mid-response")
+            return []
+        self._buf += data
+        done = []
+        while True:
+            if self._head is None and not self._parse_head():
+                break
+            if not self._parse_body():
+                break
+            done.append(self._finish())
+        return done
+
+    def _parse_head(self):
+        end = self._buf.find(b"\r\n\r\n")
+        if end < 0:
+            return False
+        lines = bytes(self._buf[:end]).decode("latin-1").split("\r\n")
+        del self._buf[:end + 4]
+        try:
+            version, status = lines[0].split(" ", 2)[:2]
+            status = int(status)
+        except ValueError:
+            raise ProtocolError(f"bad status line {lines[0]!r}") from None
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+        self._head = (status, headers, keep_alive)
+        self._body = bytearray()
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        self._until_eof = False
+        if self._chunked:
+            self._length = None
+        elif "content-length" in headers:
+            self._length = int(headers["content-length"])
+        elif status < 200 or status in (204, 304):
+            self._length = 0
+        else:
+            self._length = None
+            self._until_eof = True
+            self._head = (status, headers, False)
+        return True
+
+    def _parse_body(self):
+        if self._until_eof:
+            self._body += self._buf
+            self._buf.clear()
+            return False
+        if not self._chunked:
+            take = min(self._length, len(self._buf))
+            self._body += self._buf[:take]
+            del self._buf[:take]
+            self._length -= take
+            return self._length == 0
+        while True:
+            if self._length is None:
+                end = self._buf.find(b"\r\n")
+                if end < 0:
+                    return False
+                size = int(bytes(self._buf[:end]).split(b";")[0], 16)
+                del self._buf[:end + 2]
+                if size == 0:
+                    self._length = -1
+                else:
+                    self._length = size
+            if self._length == -1:
+                # Last chunk: skip optional trailers up to the blank line.
+                end = self._buf.find(b"\r\n")
+                if end < 0:
+                    return False
+                del self._buf[:end + 2]
+                if end == 0:
+                    return True
+                continue
+            if len(self._buf) < self._length + 2:
+                return False
+            self._body += self._buf[:self._length]
+            del self._buf[:self._length + 2]
+            self._length = None
+
+    def _finish(self):
+        status, headers, keep_alive = self._head
+        response = Response(status, headers, bytes(self._body), keep_alive)
+        self._head = None
+        self._length = None
+        self._chunked = False
+        self._until_eof = False
+        self._body = bytearray()
+        return response
+
+
+# --- transports --------------------------------------------------------
+#
+# Each exposes ``await send(data)``, ``await receive()`` (b"" at EOF) and
+# ``await close()``.
+
+
+@functools.lru_cache(maxsize=None)
+def _asyncio_protocol_class():
+    import asyncio
+
+    class AsyncioStream(asyncio.Protocol):
+        def __init__(self):
+            self._loop = asyncio.get_running_loop()
+            self._transport = None
+            self._chunks = collections.deque()
+            self._eof = False
+            self._error = None
+            self._waiter = None
+            self._write_ready = None
+
+        def connection_made(self, transport):
+            self._transport = transport
+
+        def data_received(self, data):
+            self._chunks.append(data)
+            self._wake()
+
+        def eof_received(self):
+            self._eof = True
+            self._wake()
+
+        def connection_lost(self, exc):
+            self._eof = True
+            self._error = exc
+            self._wake()
+            if self._write_ready is not None and not self._write_ready.done():
+                self._write_ready.set_result(None)
+
+        def pause_writing(self):
+            self._write_ready = self._loop.create_future()
+
+        def resume_writing(self):
+            if self._write_ready is not None and not self._write_ready.done():
+                self._write_ready.set_result(None)
+            self._write_ready = None
+
+        def _wake(self):
+            if self._waiter is not None and not self._waiter.done():
+                self._waiter.set_result(None)
+
+        async def send(self, data):
+            if self._write_ready is not None:
+                await self._write_ready
+            self._transport.write(data)
+
+        async def receive(self):
+            while not self._chunks and not self._eof:
+                self._waiter = self._loop.create_future()
+                await self._waiter
+                self._waiter = None
+            if not self._chunks:
+                # Report a reset as one, like trio and curio sockets do.
+                if self._error is not None:
+                    raise self._error
+                return b""
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            return data
+
+        async def close(self):
+            self._transport.close()
+
+    return AsyncioStream
+
+
+async def _connect_asyncio(rt, host, port):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    _, protocol = await loop.create_connection(_asyncio_protocol_class(), host, port)
+    return protocol
+
+
+class _TrioStream:
+    def __init__(self, stream):
+        self._stream = stream
+
+    async def send(self, data):
+        await self._stream.send_all(data)
+
+    async def receive(self):
+        return await self._stream.receive_some(65536)
+
+    async def close(self):
+        await self._stream.aclose()
+
+
+async def _connect_trio(rt, host, port):
+    import trio
+    return _TrioStream(await trio.open_tcp_stream(host, port))
+
+
+class _CurioStream:
+    def __init__(self, sock):
+        self._sock = sock
+
+    async def send(self, data):
+        await self._sock.sendall(data)
+
+    async def receive(self):
+        return await self._sock.recv(65536)
+
+    async def close(self):
+        await self._sock.close()
+
+
+async def _connect_curio(rt, host, port):
+    import curio
+    sock = await curio.open_connection(host, port)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return _CurioStream(sock)
+
+
+CONNECTORS = {"asyncio": _connect_asyncio, "trio": _connect_trio, "curio": _connect_curio}
+
+
+# --- connections and pool ----------------------------------------------
+
+
+class Connection:
+    """One keep-alive connection carrying up to ``pipeline`` requests at once.
+
+    Requests are written in order under a send lock and numbered. Whoever
+    holds the receive lock reads and parses on behalf of every waiter,
+    filing each response under the next number, so responses are matched
+    to requests without a background reader task on any runtime.
+    """
+
+    def __init__(self, rt, connect, host, port):
+        self._rt = rt
+        self._connect = connect
+        self._address = (host, port)
+        self._stream = None
+        self._send_lock = rt.limiter(1)
+        self._recv_lock = rt.limiter(1)
+        self._parser = ResponseParser()
+        self._sent = 0
+        self._served = 0
+        self._results = {}
+        self.in_flight = 0
+        self.closed = False
+
+    async def request(self, data):
+        self.in_flight += 1
+        try:
+            async with self._send_lock:
+                if self.closed:
+                    raise ConnectionError("connection closed")
+                if self._stream is None:
+                    # Opened lazily by the first request, so requests that
+                    # picked this connection meanwhile queue behind the lock
+                    # instead of opening connections of their own.
+                    self._stream = await self._connect(self._rt, *self._address)
+                ticket = self._sent
+                self._sent += 1
+                await self._stream.send(data)
+            async with self._recv_lock:
+                while ticket not in self._results:
+                    if self.closed:
+                        raise ConnectionError("connection closed before the response")
+                    chunk = await self._stream.receive()
+                    for response in self._parser.feed(chunk):
+                        self._results[self._served] = response
+                        self._served += 1
+                        if not response.keep_alive:
+                            self.closed = True
+                    if not chunk:
+                        self.closed = True
+            return self._results.pop(ticket)
+        except BaseException:
+            # A request abandoned mid-flight (a timeout, a reset) leaves the
+            # stream in an unknown state: close it instead of leaking it.
+            self.closed = True
+            if self._stream is not None:
+                try:
+                    await self._stream.close()
+                except Exception:
+                    pass
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        self.closed = True
+        if self._stream is not None:
+            await self._stream.close()
+
+
+class NativeClient:
+    """Client adapter (see :mod:`bench.clients`) over native runtime streams."""
+
+    name = "native"
+    families = ("asyncio", "trio", "curio")
+    requires = ()
+
+    def __init__(self, rt, max_connections=100, pipeline=1, **options):
+        self._rt = rt
+        self._connect = CONNECTORS[rt.family]
+        self._max_connections = max_connections
+        self._pipeline = pipeline
+        self._slots = rt.limiter(max_connections * pipeline)
+        self._pools = {}
+        self._requests = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        for pool in self._pools.values():
+            for conn in pool:
+                try:
+                    await conn.close()
+                except OSError:
+                    pass
+        self._pools.clear()
+        return False
+
+    def _target(self, url):
+        try:
+            return self._requests[url]
+        except KeyError:
+            pass
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise ValueError(f"native client only speaks plain http, got {url!r}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        host = parts.hostname
+        port = parts.port or 80
+        data = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                f"Connection: keep-alive\r\n\r\n").encode("latin-1")
+        self._requests[url] = target = (host, port, data)
+        return target
+
+    def _connection(self, host, port):
+        pool = self._pools.setdefault((host, port), [])
+        pool[:] = [c for c in pool if not c.closed]
+        candidates = [c for c in pool if c.in_flight < self._pipeline]
+        if candidates:
+            return min(candidates, key=lambda c: c.in_flight)
+        # Holding a slot guarantees fewer than max_connections are saturated.
+        conn = Connection(self._rt, self._connect, host, port)
+        pool.append(conn)
+        return conn
+
+    async def request(self, url):
+        """Sends a GET and returns the parsed :class:`Response`."""
+        host, port, data = self._target(url)
+        async with self._slots:
+            return await self._connection(host, port).request(data)
+
+    async def get(self, url, timeout=None):
+        """Returns the status; ``timeout`` bounds the whole request, in seconds."""
+        if timeout is None:
+            return (await self.request(url)).status
+        async with self._rt.timeout(timeout):
+            return (await self.request(url)).status
@@ -0,0 +1,71 @@
+"""Multi-process coordinator: one event loop per core, merged into one report.
+
+Each worker process builds its own runtime and workload, takes its share
+of the load via ``Workload.for_worker()``, waits on a barrier so all
+workers start together, and sends its samples back to the parent, which
+merges iteration ``i`` of every worker with ``Workload.merge_samples()``.
+"""
+import multiprocessing
+import traceback
+
+from bench import instrument, memory, runtimes
+from bench.runner import RunOptions, pin_cpus, run_workload
+
+
+def _worker(workload_cls, args, runtime_name, index, count, barrier, results, options, cpus):
+    try:
+        if cpus:
+            pin_cpus([cpus[index % len(cpus)]])
+        rt = runtimes.get_runtime(runtime_name)
+        workload = workload_cls(args)
+        workload.setup()
+        workload.for_worker(index, count)
+        barrier.wait()
+        results.put((index, run_workload(workload, rt, options), None))
+    except BaseException:
+        barrier.abort()
+        results.put((index, None, traceback.format_exc()))
+
+
+def run_parallel(workload, rt, iterations, processes, on_sample=lambda sample: None, cpus=None):
+    """Like :func:`bench.runner.run_workload` but spread over ``processes`` workers.
+
+    With ``cpus``, worker ``i`` is pinned to ``cpus[i % len(cpus)]``.
+    """
+    options = iterations if isinstance(iterations, RunOptions) else RunOptions(iterations)
+    if options.target_ci is not None:
+        raise ValueError("a CI target would give workers different iteration counts")
+    ctx = multiprocessing.get_context()
+    barrier = ctx.Barrier(processes)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, daemon=True,
+                    args=(type(workload), workload.args, rt.name, i, processes, barrier, results,
+                          options, cpus))
+        for i in range(processes)
+    ]
+    for w in workers:
+        w.start()
+
+    per_worker = {}
+    errors = []
+    for _ in workers:
+        index, samples, error = results.get()
+        if error:
+            errors.append(f"worker {index}:\n{error}")
+        else:
+            per_worker[index] = samples
+    for w in workers:
+        w.join()
+    if errors:
+        raise RuntimeError("parallel run failed\n" + "\n".join(errors))
+
+    merged_samples = []
+    for i in range(options.iterations):
+        parts = [per_worker[w][i] for w in sorted(per_worker)]
+        sample = workload.merge_samples(parts)
+        memory.merge_fields(sample, parts)
+        instrument.merge_fields(sample, parts)
+        on_sample(sample)
+        merged_samples.append(sample)
+    return merged_samples
@@ -0,0 +1,53 @@
+"""Summary statistics printed identically for every runtime."""
+import statistics
+
+from bench.histogram import format_latency, merged
+from bench.instrument import format_probes
+
+
+def summarize(values):
+    """mean/min/max/population stddev/total of a list of seconds."""
+    mean = sum(values) / len(values)
+    return {
+        "mean": mean,
+        "min": min(values),
+        "max": max(values),
+        "stddev": (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5,
+        "total": sum(values),
+    }
+
+
+def format_memory(samples):
+    """Peak RSS over the samples and, when traced, allocations and object growth."""
+    rss = [s["peak_rss"] for s in samples if s.get("peak_rss") is not None]
+    if not rss:
+        return None
+    line = f"memory: peak RSS {max(rss) / 2 ** 20:.1f} MiB"
+    allocated = [s["allocated_peak"] for s in samples if s.get("allocated_peak") is not None]
+    if allocated:
+        line += f", allocated peak {max(allocated) / 2 ** 20:.2f} MiB"
+    objects = [s["objects"] for s in samples if s.get("objects") is not None]
+    if objects:
+        line += f", {statistics.median(objects):+.0f} objects (median)"
+    return line
+
+
+def print_stats(rt, samples, workload):
+    stats = summarize([s["seconds"] for s in samples])
+    print(f"--- Stats ({rt.name}) ---")
+    for key, value in stats.items():
+        print(f"{key}: {value:.9f} seconds")
+    summary = workload.format_summary(samples)
+    if summary:
+        print(summary)
+    memory = format_memory(samples)
+    if memory:
+        print(memory)
+    probes = format_probes(samples)
+    if probes:
+        print(probes)
+
+    hist = merged(s["histogram"] for s in samples if "histogram" in s)
+    if hist is not None:
+        interval = workload.expected_interval(hist) if hist.count else None
+        print(format_latency(hist, interval))
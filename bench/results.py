@@ -0,0 +1,123 @@
+"""Append-only JSONL result store.
+
+Every measured (workload, runtime) pair becomes one JSON line holding the
+parameters, every per-iteration sample, serialized histograms and the
+environment it ran in, so results can be compared across library
+upgrades long after the console output is gone.
+"""
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import uuid
+
+from bench.histogram import Histogram
+from bench.report import summarize
+
+DEFAULT_PATH = "results.jsonl"
+
+# Libraries whose versions move the numbers.
+TRACKED_PACKAGES = (
+    "aiofiles", "aiohttp", "anyio", "asks", "curio", "curio-compat", "h11", "httpcore",
+    "httpx", "liburing", "orjson", "trio", "uvicorn", "uvloop", "winloop",
+)
+
+# CLI arguments that select what runs rather than how it runs.
+_NOT_PARAMETERS = ("command", "workload", "runtimes", "results", "no_save")
+
+
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def environment():
+    """Machine and library metadata attached to every record."""
+    versions = {}
+    for name in TRACKED_PACKAGES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "kernel": platform.release(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+        "packages": versions,
+    }
+
+
+def parameters(args):
+    return {k: v for k, v in sorted(vars(args).items())
+            if k not in _NOT_PARAMETERS and not callable(v)}
+
+
+def _jsonable(value):
+    """Serializes histograms anywhere in a sample, including nested points."""
+    if isinstance(value, Histogram):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def make_record(run_id, kind, workload, runtime, args, samples=(), extra=None):
+    """Builds one store line; histograms are serialized with ``to_dict()``."""
+    record = {
+        "run_id": run_id,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "kind": kind,
+        "workload": workload,
+        "runtime": runtime,
+        "parameters": parameters(args),
+        "samples": [_jsonable(s) for s in samples],
+        "environment": environment(),
+    }
+    if samples:
+        record["summary"] = summarize([s["seconds"] for s in samples])
+    if extra:
+        record.update(extra)
+    return record
+
+
+def append(path, record):
+    with open(path, "a") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def load(path, **filters):
+    """Records from ``path`` whose top-level fields equal every filter given."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if all(record.get(k) == v for k, v in filters.items() if v is not None):
+                records.append(record)
+    return records
+
+
+def histogram(sample):
+    """The Histogram stored in a loaded sample, or None."""
+    data = sample.get("histogram")
+    return Histogram.from_dict(data) if data else None
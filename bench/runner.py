@@ -0,0 +1,185 @@
+"""Drives a workload through the iterations of one runtime.
+
+:class:`RunOptions` carries the measurement controls shared by every
+workload: unrecorded warmup iterations, an optional confidence-interval
+target that keeps iterating until the mean is known precisely enough,
+GC suspension around each measurement, memory tracing, loop
+instrumentation (see :mod:`bench.instrument`), and process-per-iteration
+isolation. Every sample gets the iteration's peak
+RSS (see :mod:`bench.memory`).
+"""
+import gc
+import math
+import multiprocessing
+import os
+import statistics
+import time
+import traceback
+
+from bench.instrument import instrumented
+from bench.memory import Tracker
+
+
+class RunOptions:
+    def __init__(self, iterations, warmup=0, target_ci=None, max_iterations=None,
+                 time_budget=None, gc_off=False, trace_memory=False, instrument=False,
+                 lag_interval=0.005, slow_step=0.01):
+        self.iterations = iterations
+        self.warmup = warmup
+        # Percent of the mean that the 95% CI width must fall under.
+        self.target_ci = target_ci
+        self.max_iterations = max_iterations or iterations * 10
+        self.time_budget = time_budget
+        self.gc_off = gc_off
+        # Adds allocation peaks and object growth to every sample (slow).
+        self.trace_memory = trace_memory
+        # Runs the loop-lag probe and step tracer alongside every iteration.
+        self.instrument = instrument
+        self.lag_interval = lag_interval
+        self.slow_step = slow_step
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.iterations, args.warmup, args.target_ci, args.max_iterations,
+                   args.time_budget, args.no_gc, args.trace_memory, args.instrument,
+                   args.lag_interval, args.slow_step)
+
+    def ci_width(self, samples):
+        """95% CI width of the mean as a percent of the mean (t approximation)."""
+        values = [s["seconds"] for s in samples]
+        if len(values) < 2:
+            return math.inf
+        mean = statistics.mean(values)
+        t = 1.96 + 2.4 / (len(values) - 1)
+        return 2 * t * statistics.stdev(values) / math.sqrt(len(values)) / mean * 100 if mean else 0.0
+
+    def done(self, samples, started):
+        """True once enough measured samples have been taken."""
+        n = len(samples)
+        if self.target_ci is None:
+            return n >= self.iterations
+        if n >= self.max_iterations:
+            return True
+        if self.time_budget is not None and time.perf_counter() - started >= self.time_budget:
+            return n >= 2
+        return n >= self.iterations and self.ci_width(samples) < self.target_ci
+
+
+async def _iteration(workload, rt, state, options):
+    if not options.instrument:
+        return await workload.iteration(rt, state)
+    async with instrumented(rt, options.lag_interval, options.slow_step) as probes:
+        sample = await workload.iteration(rt, state)
+    sample.update(probes.fields())
+    return sample
+
+
+async def _measure(workload, rt, state, options):
+    if options.gc_off:
+        gc.collect()
+        gc.disable()
+    try:
+        with Tracker(options.trace_memory) as memory:
+            sample = await _iteration(workload, rt, state, options)
+    finally:
+        if options.gc_off:
+            gc.enable()
+    # Workloads measuring memory themselves keep their own figures.
+    sample.setdefault("peak_rss", memory.peak_rss)
+    if options.trace_memory:
+        sample.setdefault("allocated_peak", memory.allocated_peak)
+        sample.setdefault("objects", memory.objects)
+    return sample
+
+
+async def _one(workload, rt, options):
+    async with workload.session(rt) as state:
+        return await _measure(workload, rt, state, options)
+
+
+async def _many(workload, rt, options, on_sample):
+    samples = []
+    async with workload.session(rt) as state:
+        for _ in range(options.warmup):
+            await _measure(workload, rt, state, options)
+        started = time.perf_counter()
+        while not options.done(samples, started):
+            sample = await _measure(workload, rt, state, options)
+            on_sample(sample)
+            samples.append(sample)
+    return samples
+
+
+def _as_options(iterations):
+    return iterations if isinstance(iterations, RunOptions) else RunOptions(iterations)
+
+
+def run_workload(workload, rt, iterations, on_sample=lambda sample: None):
+    """Returns the samples of the measured iterations.
+
+    ``iterations`` is a count or a :class:`RunOptions`.
+    """
+    options = _as_options(iterations)
+    if not workload.fresh_loop:
+        return rt.run(_many, workload, rt, options, on_sample)
+    for _ in range(options.warmup):
+        rt.run(_one, workload, rt, options)
+    samples = []
+    started = time.perf_counter()
+    while not options.done(samples, started):
+        sample = rt.run(_one, workload, rt, options)
+        on_sample(sample)
+        samples.append(sample)
+    return samples
+
+
+def _isolated(workload_cls, args, runtime_name, options, conn):
+    from bench import runtimes
+    try:
+        workload = workload_cls(args)
+        workload.setup()
+        rt = runtimes.get_runtime(runtime_name)
+        conn.send((rt.run(_one, workload, rt, options), None))
+    except BaseException:
+        conn.send((None, traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _run_in_child(workload, rt, options):
+    ctx = multiprocessing.get_context()
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_isolated, args=(type(workload), workload.args, rt.name, options, child))
+    proc.start()
+    child.close()
+    sample, error = parent.recv()
+    proc.join()
+    if error:
+        raise RuntimeError(f"isolated iteration failed\n{error}")
+    return sample
+
+
+def run_isolated(workload, rt, iterations, on_sample=lambda sample: None):
+    """Like :func:`run_workload` but every iteration runs in a fresh process.
+
+    Nothing warmed by one iteration (imports, allocator arenas, the
+    interpreter's caches) survives into the next.
+    """
+    options = _as_options(iterations)
+    for _ in range(options.warmup):
+        _run_in_child(workload, rt, options)
+    samples = []
+    started = time.perf_counter()
+    while not options.done(samples, started):
+        sample = _run_in_child(workload, rt, options)
+        on_sample(sample)
+        samples.append(sample)
+    return samples
+
+
+def pin_cpus(cpus):
+    """Restricts the current process to ``cpus``; returns False if unsupported."""
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(0, set(cpus))
+    return True
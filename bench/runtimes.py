@@ -0,0 +1,371 @@
+"""Runtime adapters: one object per event loop implementation.
+
+Every workload is written once against the small surface exposed here
+(run, open_group, limiter, queue, timeout, sleep, open_file, and the
+worker-pool hooks run_in_thread, set_thread_limit and run_in_executor) so
+the same code is executed under asyncio, uvloop, winloop, trio and curio.
+"""
+import concurrent.futures
+import contextlib
+import importlib.util
+
+
+class Runtime:
+    """Base adapter. Subclasses bind the primitives of one runtime."""
+
+    name = None
+    # Runtimes sharing a family can use the same third-party libraries
+    # (e.g. aiohttp works on asyncio, uvloop and winloop alike).
+    family = None
+    requires = ()
+
+    @classmethod
+    def available(cls):
+        """Returns True if every module the runtime needs is importable."""
+        return all(importlib.util.find_spec(m) is not None for m in cls.requires)
+
+    def run(self, fn, *args):
+        """Runs ``fn(*args)`` to completion on a fresh loop and returns its result."""
+        raise NotImplementedError
+
+    def sleep(self, seconds):
+        raise NotImplementedError
+
+    def open_group(self):
+        """Async context manager whose ``await g.spawn(fn, *args)`` starts a task.
+
+        Leaving the block waits for every spawned task to finish.
+        ``await g.cancel()`` cancels the tasks still running instead.
+        """
+        raise NotImplementedError
+
+    def limiter(self, n):
+        """Async context manager admitting at most ``n`` holders at a time."""
+        raise NotImplementedError
+
+    def queue(self, maxsize):
+        """FIFO with awaitable ``put``/``get`` and ``qsize()``, bounded to ``maxsize`` items.
+
+        ``put`` waits while the queue is full, which is what gives a
+        pipeline its backpressure.
+        """
+        raise NotImplementedError
+
+    def timeout(self, seconds):
+        """Async context manager cancelling its block after ``seconds``.
+
+        The cancellation surfaces as the builtin ``TimeoutError`` whatever
+        the runtime's own exception is.
+        """
+        raise NotImplementedError
+
+    def open_file(self, path, mode):
+        """Async context manager yielding a file with awaitable read/write."""
+        raise NotImplementedError
+
+    def run_in_thread(self, fn, *args):
+        """Awaitable running ``fn(*args)`` in the pool that backs ``open_file``."""
+        raise NotImplementedError
+
+    async def set_thread_limit(self, n):
+        """Resizes that pool to ``n`` threads for the rest of the current run."""
+        raise NotImplementedError
+
+    def run_in_executor(self, executor, fn, *args):
+        """Awaitable running ``fn(*args)`` in a ``concurrent.futures`` executor."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<Runtime {self.name}>"
+
+
+class _AsyncioGroup:
+    """gather()-based group, equivalent to the original scripts."""
+
+    def __init__(self, asyncio):
+        self._asyncio = asyncio
+        self._tasks = []
+        self._cancelled = False
+
+    async def __aenter__(self):
+        return self
+
+    async def spawn(self, fn, *args):
+        self._tasks.append(self._asyncio.ensure_future(fn(*args)))
+
+    async def cancel(self):
+        self._cancelled = True
+        for task in self._tasks:
+            task.cancel()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            for task in self._tasks:
+                task.cancel()
+            await self._asyncio.gather(*self._tasks, return_exceptions=True)
+            return False
+        if self._cancelled:
+            # Cancelled tasks are expected; anything else still propagates.
+            for result in await self._asyncio.gather(*self._tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    raise result
+            return False
+        if self._tasks:
+            await self._asyncio.gather(*self._tasks)
+        return False
+
+
+class AsyncioRuntime(Runtime):
+    name = "asyncio"
+    family = "asyncio"
+
+    def __init__(self):
+        import asyncio
+        self._asyncio = asyncio
+        self._executor = None
+
+    def run(self, fn, *args):
+        return self._asyncio.run(fn(*args))
+
+    def sleep(self, seconds):
+        return self._asyncio.sleep(seconds)
+
+    def open_group(self):
+        return _AsyncioGroup(self._asyncio)
+
+    def limiter(self, n):
+        return self._asyncio.Semaphore(n)
+
+    def queue(self, maxsize):
+        return self._asyncio.Queue(maxsize)
+
+    def timeout(self, seconds):
+        # Raises TimeoutError itself (Python 3.11+).
+        return self._asyncio.timeout(seconds)
+
+    def open_file(self, path, mode):
+        # asyncio has no native file API; aiofiles is what the original
+        # scripts used, so it is only required by file workloads.
+        import aiofiles
+        return aiofiles.open(path, mode)
+
+    def run_in_thread(self, fn, *args):
+        return self._asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def set_thread_limit(self, n):
+        # aiofiles offloads to the loop's default executor. asyncio.run()
+        # shuts down the last one; earlier ones are released here.
+        previous, self._executor = self._executor, concurrent.futures.ThreadPoolExecutor(n)
+        self._asyncio.get_running_loop().set_default_executor(self._executor)
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def run_in_executor(self, executor, fn, *args):
+        return self._asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+class UvloopRuntime(AsyncioRuntime):
+    name = "uvloop"
+    requires = ("uvloop",)
+
+    def run(self, fn, *args):
+        import uvloop
+        return uvloop.run(fn(*args))
+
+
+class WinloopRuntime(AsyncioRuntime):
+    name = "winloop"
+    requires = ("winloop",)
+
+    def run(self, fn, *args):
+        import winloop
+        return winloop.run(fn(*args))
+
+
+class _TrioGroup:
+    """Nursery wrapper exposing the awaitable spawn() of the common surface."""
+
+    def __init__(self, trio):
+        self._cm = trio.open_nursery()
+        self._nursery = None
+
+    async def __aenter__(self):
+        self._nursery = await self._cm.__aenter__()
+        return self
+
+    async def spawn(self, fn, *args):
+        self._nursery.start_soon(fn, *args)
+
+    async def cancel(self):
+        self._nursery.cancel_scope.cancel()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._cm.__aexit__(exc_type, exc, tb)
+
+
+class _TrioQueue:
+    """Memory channel pair behind the put/get/qsize surface of asyncio.Queue."""
+
+    def __init__(self, trio, maxsize):
+        self._send, self._receive = trio.open_memory_channel(maxsize)
+
+    async def put(self, item):
+        await self._send.send(item)
+
+    async def get(self):
+        return await self._receive.receive()
+
+    def qsize(self):
+        return self._send.statistics().current_buffer_used
+
+
+class TrioRuntime(Runtime):
+    name = "trio"
+    family = "trio"
+    requires = ("trio",)
+
+    def __init__(self):
+        import trio
+        self._trio = trio
+
+    def run(self, fn, *args):
+        return self._trio.run(fn, *args)
+
+    def sleep(self, seconds):
+        return self._trio.sleep(seconds)
+
+    def open_group(self):
+        return _TrioGroup(self._trio)
+
+    def limiter(self, n):
+        return self._trio.CapacityLimiter(n)
+
+    def queue(self, maxsize):
+        return _TrioQueue(self._trio, maxsize)
+
+    @contextlib.asynccontextmanager
+    async def timeout(self, seconds):
+        try:
+            with self._trio.fail_after(seconds):
+                yield
+        except self._trio.TooSlowError:
+            raise TimeoutError from None
+
+    @contextlib.asynccontextmanager
+    async def open_file(self, path, mode):
+        f = await self._trio.open_file(path, mode)
+        async with f:
+            yield f
+
+    def run_in_thread(self, fn, *args):
+        return self._trio.to_thread.run_sync(fn, *args)
+
+    async def set_thread_limit(self, n):
+        # trio.open_file and to_thread share the run's default limiter.
+        self._trio.to_thread.current_default_thread_limiter().total_tokens = n
+
+    async def run_in_executor(self, executor, fn, *args):
+        lowlevel = self._trio.lowlevel
+        future = executor.submit(fn, *args)
+        task = lowlevel.current_task()
+        token = lowlevel.current_trio_token()
+        future.add_done_callback(lambda _: token.run_sync_soon(lowlevel.reschedule, task))
+        # Submitted work cannot be recalled, so cancellation waits for it.
+        await lowlevel.wait_task_rescheduled(lambda raise_cancel: lowlevel.Abort.FAILED)
+        return future.result()
+
+
+class _CurioGroup:
+    """TaskGroup wrapper; its own cancel is called cancel_remaining()."""
+
+    def __init__(self, curio):
+        self._group = curio.TaskGroup()
+
+    async def __aenter__(self):
+        await self._group.__aenter__()
+        return self
+
+    async def spawn(self, fn, *args):
+        await self._group.spawn(fn, *args)
+
+    async def cancel(self):
+        await self._group.cancel_remaining()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._group.__aexit__(exc_type, exc, tb)
+
+
+class CurioRuntime(Runtime):
+    name = "curio"
+    family = "curio"
+    requires = ("curio",)
+
+    def __init__(self):
+        import curio
+        self._curio = curio
+
+    def run(self, fn, *args):
+        return self._curio.run(fn, *args)
+
+    def sleep(self, seconds):
+        return self._curio.sleep(seconds)
+
+    def open_group(self):
+        return _CurioGroup(self._curio)
+
+    def limiter(self, n):
+        return self._curio.Semaphore(n)
+
+    def queue(self, maxsize):
+        return self._curio.Queue(maxsize)
+
+    @contextlib.asynccontextmanager
+    async def timeout(self, seconds):
+        try:
+            async with self._curio.timeout_after(seconds):
+                yield
+        except self._curio.TaskTimeout:
+            raise TimeoutError from None
+
+    def open_file(self, path, mode):
+        return self._curio.aopen(path, mode)
+
+    def run_in_thread(self, fn, *args):
+        return self._curio.run_in_thread(fn, *args)
+
+    async def set_thread_limit(self, n):
+        # The kernel creates its pool from MAX_WORKER_THREADS on first use;
+        # swap in a pool of the requested size instead.
+        from curio import workers
+        from curio.traps import _get_kernel
+        kernel = await _get_kernel()
+        previous = getattr(kernel, "thread_pool", None)
+        kernel.thread_pool = workers.ThreadPool(n)
+        kernel._call_at_shutdown(kernel.thread_pool.shutdown)
+        if previous is not None:
+            previous.shutdown()
+
+    def run_in_executor(self, executor, fn, *args):
+        return self._curio.run_in_executor(executor, fn, *args)
+
+
+RUNTIMES = {
+    cls.name: cls
+    for cls in (AsyncioRuntime, UvloopRuntime, WinloopRuntime, TrioRuntime, CurioRuntime)
+}
+
+
+def installed():
+    """Names of the runtimes whose dependencies are importable here."""
+    return [name for name, cls in RUNTIMES.items() if cls.available()]
+
+
+def get_runtime(name):
+    """Instantiates the adapter called ``name``."""
+    try:
+        cls = RUNTIMES[name]
+    except KeyError:
+        raise ValueError(f"unknown runtime {name!r} (choose from {', '.join(RUNTIMES)})") from None
+    if not cls.available():
+        raise RuntimeError(f"runtime {name!r} is not installed (needs {', '.join(cls.requires)})")
+    return cls()
@@ -0,0 +1,643 @@
+"""Local target servers for the network and web workloads.
+
+network_bench/server.py (FastAPI) is often slower than the client under
+test. These servers answer from precomputed bytes on a raw asyncio
+Protocol, uvloop, trio or a bare ASGI app under uvicorn, can run one
+process per core on SO_REUSEPORT sockets, and can shape their responses
+(body size, artificial latency, error rate) through :class:`Behaviour`,
+which can also inject faults: connection resets, stalls that never answer
+and slow responses. A request can ask for its own body size with
+``?size=N``, and a POST is answered with the number of bytes it uploaded.
+With a certificate they serve HTTPS instead;
+:func:`self_signed_certificate` makes one for localhost. Over HTTPS the
+asyncio and uvloop servers can also offer HTTP/2 through ALPN, answered
+with the h2 package.
+"""
+import collections
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import ssl
+import struct
+import subprocess
+from urllib.parse import parse_qs, urlsplit
+
+BACKENDS = ("asyncio", "uvloop", "trio", "uvicorn")
+DELAYS = ("none", "fixed", "exponential", "lognormal")
+# Bodies a ``?shape=`` query can ask for: one padded object or an array of records.
+SHAPES = ("pad", "records")
+# Distinct ``?size=`` responses kept ready; large ones are costly to rebuild.
+_SIZED_CACHE = 8
+FAULTS = ("reset", "stall", "slow")
+# SO_LINGER with a zero timeout: close() sends an RST instead of a FIN.
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+Request = collections.namedtuple("Request", "method target headers body keep_alive")
+
+
+class Behaviour:
+    """Decides, per request, how long to wait and which bytes to send."""
+
+    def __init__(self, response_size=17, delay_dist="none", delay_ms=0.0, error_rate=0.0,
+                 seed=None, reset_rate=0.0, stall_rate=0.0, slow_rate=0.0, slow_ms=1000.0):
+        if delay_dist not in DELAYS:
+            raise ValueError(f"unknown delay distribution {delay_dist!r} (choose from {', '.join(DELAYS)})")
+        self.response_size = response_size
+        self.delay_dist = delay_dist
+        self.delay = delay_ms / 1000
+        self.error_rate = error_rate
+        self.rates = {"reset": reset_rate, "stall": stall_rate, "slow": slow_rate}
+        self.slow = slow_ms / 1000
+        self.seed = seed
+        self._rng = random.Random(seed)
+
+        self.body = self._payload(response_size)
+        self.ok = self._response(200, "OK", self.body)
+        self.error = self._response(500, "Internal Server Error", b'{"message": "error"}')
+        self._sized = {}
+
+    @staticmethod
+    def _payload(size, shape="pad"):
+        """A JSON body of exactly ``size`` bytes; 17 is the original {"message": "ok"}.
+
+        ``shape="records"`` is an array of small objects instead, like an API
+        listing, of at least ``size`` bytes; it is what JSON decoding costs.
+        """
+        if shape == "records":
+            return _records(size)
+        head, tail = b'{"message": "ok", "pad": "', b'"}'
+        if size == 17:
+            return b'{"message": "ok"}'
+        if size < len(head) + len(tail):
+            return b"x" * size
+        return head + b"x" * (size - len(head) - len(tail)) + tail
+
+    @staticmethod
+    def _response(status, reason, body):
+        return (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+
+    def next_delay(self):
+        if self.delay_dist == "none" or self.delay <= 0:
+            return 0.0
+        if self.delay_dist == "fixed":
+            return self.delay
+        if self.delay_dist == "exponential":
+            return self._rng.expovariate(1 / self.delay)
+        # lognormal with the requested mean and sigma 1
+        return self._rng.lognormvariate(math.log(self.delay) - 0.5, 1.0)
+
+    def _sized_entry(self, target):
+        """(body, response) for a ``?size=N&shape=...`` query, cached."""
+        query = parse_qs(urlsplit(target).query)
+        try:
+            size = int(query.get("size", [self.response_size])[0])
+        except ValueError:
+            size = self.response_size
+        shape = query.get("shape", ["pad"])[0]
+        key = (max(size, 0), shape if shape in SHAPES else "pad")
+        entry = self._sized.get(key)
+        if entry is None:
+            if len(self._sized) >= _SIZED_CACHE:
+                del self._sized[next(iter(self._sized))]
+            body = self._payload(*key)
+            entry = self._sized[key] = (body, self._response(200, "OK", body))
+        return entry
+
+    def body_for(self, request):
+        """The body of a 200 answer to ``request`` (None means a plain GET)."""
+        if request is None:
+            return self.body
+        if request.method == "POST":
+            return b'{"received": %d}' % len(request.body)
+        if "?" not in request.target:
+            return self.body
+        return self._sized_entry(request.target)[0]
+
+    def _ok_for(self, request):
+        if request is None or (request.method != "POST" and "?" not in request.target):
+            return self.ok
+        if request.method == "POST":
+            return self._response(200, "OK", self.body_for(request))
+        return self._sized_entry(request.target)[1]
+
+    def fault(self):
+        """Draws the fault injected into the next request: None or one of FAULTS."""
+        if not any(self.rates.values()):
+            return None
+        draw = self._rng.random()
+        for name, rate in self.rates.items():
+            if draw < rate:
+                return name
+            draw -= rate
+        return None
+
+    @property
+    def drops_connections(self):
+        """True when some requests are answered by a reset or a stall."""
+        return bool(self.rates["reset"] or self.rates["stall"])
+
+    def respond(self, request):
+        """Returns ``(delay_seconds, status, response_bytes)`` for ``request``.
+
+        ``status`` is "reset" or "stall", with no bytes, when the server must
+        reset the connection or stop answering on it.
+        """
+        fault = self.fault()
+        if fault in ("reset", "stall"):
+            return 0.0, fault, None
+        delay = self.next_delay() + (self.slow if fault == "slow" else 0.0)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return delay, 500, self.error
+        return delay, 200, self._ok_for(request)
+
+    def reseed(self, worker):
+        """Gives each worker process its own random stream."""
+        self._rng = random.Random(None if self.seed is None else self.seed + worker)
+
+
+def _records(size):
+    """A JSON array of small objects, at least ``size`` bytes."""
+    records = []
+    total = 2
+    while total < size:
+        i = len(records)
+        record = (b'{"id": %d, "name": "item-%d", "active": true, "score": %d.5, '
+                  b'"tags": ["alpha", "beta"]}' % (i, i, i % 1000))
+        records.append(record)
+        total += len(record) + 2
+    return b"[" + b", ".join(records) + b"]"
+
+
+class RequestParser:
+    """Incremental HTTP/1.1 request parser (Content-Length and chunked bodies)."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._head = None
+        self._length = 0
+        self._chunked = False
+        self._body = bytearray()
+
+    def feed(self, data):
+        self._buf += data
+        done = []
+        while True:
+            if self._head is None:
+                end = self._buf.find(b"\r\n\r\n")
+                if end < 0:
+                    break
+                lines = bytes(self._buf[:end]).decode("latin-1").split("\r\n")
+                del self._buf[:end + 4]
+                method, target, version = (lines[0].split(" ", 2) + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                self._head = (method, target, headers, keep_alive)
+                self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+                self._length = None if self._chunked else int(headers.get("content-length", 0) or 0)
+                self._body = bytearray()
+            if self._chunked:
+                if not self._parse_chunks():
+                    break
+                body = bytes(self._body)
+            else:
+                if len(self._buf) < self._length:
+                    break
+                body = bytes(self._buf[:self._length])
+                del self._buf[:self._length]
+            method, target, headers, keep_alive = self._head
+            done.append(Request(method, target, headers, body, keep_alive))
+            self._head = None
+        return done
+
+    def _parse_chunks(self):
+        """Moves complete chunks into the body; True once the last one is in."""
+        while True:
+            if self._length is None:
+                end = self._buf.find(b"\r\n")
+                if end < 0:
+                    return False
+                size = int(bytes(self._buf[:end]).split(b";")[0], 16)
+                del self._buf[:end + 2]
+                self._length = size if size else -1
+            if self._length == -1:
+                # Last chunk: skip optional trailers up to the blank line.
+                end = self._buf.find(b"\r\n")
+                if end < 0:
+                    return False
+                del self._buf[:end + 2]
+                if end == 0:
+                    return True
+                continue
+            if len(self._buf) < self._length + 2:
+                return False
+            self._body += self._buf[:self._length]
+            del self._buf[:self._length + 2]
+            self._length = None
+
+
+def listen_socket(host, port, reuse_port=False, backlog=4096):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+def self_signed_certificate(directory="bench_tls"):
+    """Returns ``(certfile, keyfile)`` for localhost, creating them with openssl once.
+
+    Clients trust the server by loading ``certfile`` as their CA.
+    """
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    if os.path.exists(certfile) and os.path.exists(keyfile):
+        return certfile, keyfile
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is needed to create a certificate; pass --certfile/--keyfile")
+    os.makedirs(directory, exist_ok=True)
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "365",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", keyfile, "-out", certfile],
+        check=True, capture_output=True)
+    return certfile, keyfile
+
+
+def server_ssl_context(tls, http2=False):
+    """Server-side context for ``tls = (certfile, keyfile)``, or None for plain HTTP.
+
+    With ``http2`` the context offers h2 ahead of http/1.1 through ALPN.
+    """
+    if tls is None:
+        return None
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(*tls)
+    if http2:
+        context.set_alpn_protocols(["h2", "http/1.1"])
+    return context
+
+
+# --- asyncio / uvloop ---------------------------------------------------
+
+
+def _asyncio_protocol(behaviour):
+    import asyncio
+
+    class HTTPProtocol(asyncio.Protocol):
+        def __init__(self):
+            self._parser = RequestParser()
+            self._transport = None
+            # Responses must leave in request order; delayed ones are
+            # chained behind this future.
+            self._tail = None
+            self._stalled = False
+
+        def connection_made(self, transport):
+            self._transport = transport
+
+        def data_received(self, data):
+            if self._stalled:
+                return
+            for request in self._parser.feed(data):
+                delay, status, payload = behaviour.respond(request)
+                if status == "reset":
+                    sock = self._transport.get_extra_info("socket")
+                    if sock is not None:
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+                    self._transport.abort()
+                    return
+                if status == "stall":
+                    # Swallow this request and every later one until the
+                    # client gives up and closes.
+                    self._stalled = True
+                    return
+                if delay or self._tail is not None:
+                    self._tail = asyncio.ensure_future(
+                        self._later(self._tail, delay, payload, request.keep_alive))
+                else:
+                    self._write(payload, request.keep_alive)
+
+        async def _later(self, previous, delay, payload, keep_alive):
+            if previous is not None:
+                await previous
+            if delay:
+                await asyncio.sleep(delay)
+            self._write(payload, keep_alive)
+            if self._tail is asyncio.current_task():
+                self._tail = None
+
+        def _write(self, payload, keep_alive):
+            if self._transport.is_closing():
+                return
+            self._transport.write(payload)
+            if not keep_alive:
+                self._transport.close()
+
+        def connection_lost(self, exc):
+            if self._tail is not None:
+                self._tail.cancel()
+
+    return HTTPProtocol
+
+
+def _h2_protocol(behaviour):
+    import asyncio
+
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+
+    class H2Protocol(asyncio.Protocol):
+        """HTTP/2 on one connection; streams are answered independently.
+
+        Every request shares the connection, so faults stay on their own
+        stream: a reset sends RST_STREAM and a stall leaves the stream
+        unanswered.
+        """
+
+        def __init__(self):
+            self._conn = h2.connection.H2Connection(
+                h2.config.H2Configuration(client_side=False, header_encoding="latin-1"))
+            self._transport = None
+            self._requests = {}
+            # Response bytes held back by flow control, per stream.
+            self._pending = {}
+            self._timers = {}
+
+        def connection_made(self, transport):
+            self._transport = transport
+            self._conn.initiate_connection()
+            self._flush()
+
+        def data_received(self, data):
+            try:
+                events = self._conn.receive_data(data)
+            except h2.exceptions.ProtocolError:
+                self._flush()
+                self._transport.close()
+                return
+            for event in events:
+                if isinstance(event, h2.events.RequestReceived):
+                    self._requests[event.stream_id] = (dict(event.headers), bytearray())
+                elif isinstance(event, h2.events.DataReceived):
+                    if event.stream_id in self._requests:
+                        self._requests[event.stream_id][1].extend(event.data)
+                    self._conn.acknowledge_received_data(event.flow_controlled_length,
+                                                         event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    self._request_ended(event.stream_id)
+                elif isinstance(event, h2.events.StreamReset):
+                    self._requests.pop(event.stream_id, None)
+                    self._pending.pop(event.stream_id, None)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    for stream_id in list(self._pending):
+                        self._send_body(stream_id)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    self._flush()
+                    self._transport.close()
+                    return
+            self._flush()
+
+        def _request_ended(self, stream_id):
+            headers, body = self._requests.pop(stream_id, ({}, b""))
+            request = Request(headers.get(":method", "GET"), headers.get(":path", "/"),
+                              headers, bytes(body), True)
+            delay, status, _ = behaviour.respond(request)
+            if status == "reset":
+                self._conn.reset_stream(stream_id, h2.errors.ErrorCodes.INTERNAL_ERROR)
+                return
+            if status == "stall":
+                return
+            body = behaviour.body_for(request) if status == 200 else b'{"message": "error"}'
+            if delay:
+                self._timers[stream_id] = asyncio.get_running_loop().call_later(
+                    delay, self._delayed, stream_id, status, body)
+            else:
+                self._respond(stream_id, status, body)
+
+        def _delayed(self, stream_id, status, body):
+            del self._timers[stream_id]
+            if self._transport.is_closing():
+                return
+            self._respond(stream_id, status, body)
+            self._flush()
+
+        def _respond(self, stream_id, status, body):
+            try:
+                self._conn.send_headers(stream_id, [
+                    (":status", str(status)), ("content-type", "application/json"),
+                    ("content-length", str(len(body)))])
+            except h2.exceptions.StreamClosedError:
+                return
+            self._pending[stream_id] = memoryview(body)
+            self._send_body(stream_id)
+
+        def _send_body(self, stream_id):
+            """Sends as much of the stream's body as the flow-control windows allow."""
+            body = self._pending.pop(stream_id)
+            try:
+                if not body:
+                    self._conn.end_stream(stream_id)
+                while body:
+                    size = min(len(body), self._conn.local_flow_control_window(stream_id),
+                               self._conn.max_outbound_frame_size)
+                    if size <= 0:
+                        self._pending[stream_id] = body
+                        return
+                    self._conn.send_data(stream_id, body[:size].tobytes(),
+                                         end_stream=size == len(body))
+                    body = body[size:]
+            except h2.exceptions.StreamClosedError:
+                pass
+
+        def _flush(self):
+            data = self._conn.data_to_send()
+            if data and not self._transport.is_closing():
+                self._transport.write(data)
+
+        def connection_lost(self, exc):
+            for timer in self._timers.values():
+                timer.cancel()
+
+    return H2Protocol
+
+
+def _alpn_protocol(behaviour):
+    """HTTP/2 or HTTP/1.1 per connection, whichever ALPN settled on."""
+    import asyncio
+    http1, http2 = _asyncio_protocol(behaviour), _h2_protocol(behaviour)
+
+    class ALPNProtocol(asyncio.Protocol):
+        def __init__(self):
+            self._inner = None
+
+        def connection_made(self, transport):
+            # The TLS handshake, and with it ALPN, is over by now.
+            ssl_object = transport.get_extra_info("ssl_object")
+            h2 = ssl_object is not None and ssl_object.selected_alpn_protocol() == "h2"
+            self._inner = http2() if h2 else http1()
+            self._inner.connection_made(transport)
+
+        def data_received(self, data):
+            self._inner.data_received(data)
+
+        def connection_lost(self, exc):
+            if self._inner is not None:
+                self._inner.connection_lost(exc)
+
+    return ALPNProtocol
+
+
+async def _serve_asyncio(sock, behaviour, tls=None, http2=False):
+    import asyncio
+    protocol = _alpn_protocol(behaviour) if http2 else _asyncio_protocol(behaviour)
+    server = await asyncio.get_running_loop().create_server(
+        protocol, sock=sock, ssl=server_ssl_context(tls, http2))
+    async with server:
+        await server.serve_forever()
+
+
+# --- trio ---------------------------------------------------------------
+
+
+async def _serve_trio(sock, behaviour, tls=None):
+    import trio
+
+    async def handler(stream):
+        parser = RequestParser()
+        try:
+            while True:
+                data = await stream.receive_some(65536)
+                if not data:
+                    return
+                for request in parser.feed(data):
+                    delay, status, payload = behaviour.respond(request)
+                    if status == "reset":
+                        # An SSLStream wraps the SocketStream that owns the socket.
+                        sock = getattr(stream, "transport_stream", stream).socket
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+                        return
+                    if status == "stall":
+                        while await stream.receive_some(65536):
+                            pass
+                        return
+                    if delay:
+                        await trio.sleep(delay)
+                    await stream.send_all(payload)
+                    if not request.keep_alive:
+                        return
+        except trio.BrokenResourceError:
+            pass
+        finally:
+            await stream.aclose()
+
+    listener = trio.SocketListener(trio.socket.from_stdlib_socket(sock))
+    if tls is not None:
+        listener = trio.SSLListener(listener, server_ssl_context(tls), https_compatible=True)
+    await trio.serve_listeners(handler, [listener])
+
+
+# --- uvicorn ------------------------------------------------------------
+
+
+def _asgi_app(behaviour):
+    import asyncio
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        if scope["method"] == "POST":
+            chunks = []
+            while True:
+                message = await receive()
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            body = b"".join(chunks)
+        target = scope["path"]
+        if scope["query_string"]:
+            target += "?" + scope["query_string"].decode("latin-1")
+        request = Request(scope["method"], target, {}, body, True)
+        delay, status, _ = behaviour.respond(request)
+        if delay:
+            await asyncio.sleep(delay)
+        body = behaviour.body_for(request) if status == 200 else b'{"message": "error"}'
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def _run_uvicorn(sock, behaviour, tls=None):
+    import uvicorn
+    certfile, keyfile = tls or (None, None)
+    config = uvicorn.Config(_asgi_app(behaviour), log_level="warning", access_log=False,
+                            lifespan="off", ssl_certfile=certfile, ssl_keyfile=keyfile)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+# --- entry points -------------------------------------------------------
+
+
+def serve_one(backend, host, port, behaviour, reuse_port=False, worker=0, tls=None,
+              http2=False):
+    """Runs one server process until interrupted; ``tls = (certfile, keyfile)`` serves HTTPS.
+
+    ``http2`` offers HTTP/2 through ALPN; only the asyncio and uvloop
+    backends speak it.
+    """
+    if http2 and (tls is None or backend not in ("asyncio", "uvloop")):
+        raise ValueError("HTTP/2 needs TLS and the asyncio or uvloop backend")
+    behaviour.reseed(worker)
+    sock = listen_socket(host, port, reuse_port)
+    if backend == "asyncio":
+        import asyncio
+        asyncio.run(_serve_asyncio(sock, behaviour, tls, http2))
+    elif backend == "uvloop":
+        import uvloop
+        uvloop.run(_serve_asyncio(sock, behaviour, tls, http2))
+    elif backend == "trio":
+        import trio
+        trio.run(_serve_trio, sock, behaviour, tls)
+    elif backend == "uvicorn":
+        _run_uvicorn(sock, behaviour, tls)
+    else:
+        raise ValueError(f"unknown backend {backend!r} (choose from {', '.join(BACKENDS)})")
+
+
+def serve(backend, host, port, behaviour, workers=1, tls=None, http2=False):
+    """Runs ``workers`` processes of ``backend``, sharing the port via SO_REUSEPORT."""
+    if workers <= 1:
+        serve_one(backend, host, port, behaviour, tls=tls, http2=http2)
+        return
+    ctx = multiprocessing.get_context()
+    procs = [ctx.Process(target=serve_one,
+                         args=(backend, host, port, behaviour, True, i, tls, http2), daemon=True)
+             for i in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
@@ -0,0 +1,138 @@
+"""Concurrency sweep: saturation curves and knee detection per runtime.
+
+Runs the network workload over a grid of concurrency levels and request
+counts and reports, for every point, throughput and latency percentiles.
+The knee of the throughput-vs-concurrency curve is the limiter value past
+which more in-flight requests mostly add latency.
+"""
+import math
+
+from bench.histogram import merged
+from bench.parallel import run_parallel
+from bench.runner import run_isolated, run_workload
+
+
+def log_levels(low, high, points):
+    """``points`` log-spaced integers from ``low`` to ``high``, deduplicated."""
+    if points < 2 or low == high:
+        return [low]
+    ratio = (high / low) ** (1 / (points - 1))
+    return sorted({round(low * ratio ** i) for i in range(points)})
+
+
+def find_knee(xs, ys):
+    """Kneedle on the rising part of the curve: the x farthest above its chord.
+
+    Past the throughput peak more concurrency only hurts, so only the
+    points up to the peak are considered, normalized between the first
+    point and the peak. ``xs`` are compared on a log scale since
+    concurrency grids are log-spaced. A curve that rises in fewer than
+    three points, or along its chord, has its knee at the peak. Returns
+    None when there are fewer than three points.
+
+    >>> find_knee([1, 10, 100, 1000], [6900, 8600, 3000, 1200])
+    10
+    >>> find_knee([1, 10, 100, 1000], [1000, 8000, 8100, 8150])
+    10
+    """
+    if len(xs) < 3:
+        return None
+    peak = max(range(len(ys)), key=ys.__getitem__)
+    if peak < 2:
+        return xs[peak]
+    lx = [math.log(x) for x in xs[:peak + 1]]
+    x_span = (lx[-1] - lx[0]) or 1.0
+    y_span = (ys[peak] - ys[0]) or 1.0
+    best, best_gap = xs[peak], 0.0
+    for x, l, y in zip(xs, lx, ys[:peak + 1]):
+        gap = (y - ys[0]) / y_span - (l - lx[0]) / x_span
+        if gap > best_gap:
+            best, best_gap = x, gap
+    return best
+
+
+def sweep_runtime(workload, rt, levels, request_counts, iterations, processes=1, isolate=False,
+                  cpus=None):
+    """Returns one row per (requests, concurrency) point.
+
+    ``iterations`` is a count or a :class:`bench.runner.RunOptions`.
+    """
+    rows = []
+    for requests in request_counts:
+        for concurrency in levels:
+            workload.args.requests = requests
+            workload.args.concurrency = concurrency
+            if processes > 1:
+                samples = run_parallel(workload, rt, iterations, processes, cpus=cpus)
+            elif isolate:
+                samples = run_isolated(workload, rt, iterations)
+            else:
+                samples = run_workload(workload, rt, iterations)
+            hist = merged(s["histogram"] for s in samples)
+            rows.append({
+                "runtime": rt.name,
+                "requests": requests,
+                "concurrency": concurrency,
+                "throughput": sum(s["throughput"] for s in samples) / len(samples),
+                "p50": hist.value_at_percentile(50),
+                "p99": hist.value_at_percentile(99),
+                "errors": sum(s["issued"] - s["requests"] for s in samples),
+            })
+    return rows
+
+
+def knees(rows):
+    """{(runtime, requests): knee concurrency} for every curve in ``rows``."""
+    curves = {}
+    for row in rows:
+        curves.setdefault((row["runtime"], row["requests"]), []).append(row)
+    return {
+        key: find_knee([r["concurrency"] for r in curve], [r["throughput"] for r in curve])
+        for key, curve in curves.items()
+    }
+
+
+def print_table(rows):
+    print(f"{'runtime':<10}{'requests':>10}{'conc':>8}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for r in rows:
+        p50 = f"{r['p50'] * 1000:.3f}" if r["p50"] is not None else "-"
+        p99 = f"{r['p99'] * 1000:.3f}" if r["p99"] is not None else "-"
+        print(f"{r['runtime']:<10}{r['requests']:>10}{r['concurrency']:>8}"
+              f"{r['throughput']:>12.2f}{p50:>10}{p99:>10}{r['errors']:>8}")
+
+
+def save_plots(rows, prefix="sweep"):
+    """Throughput-vs-concurrency and p99-vs-throughput charts (needs matplotlib)."""
+    import matplotlib.pyplot as plt
+
+    curves = {}
+    for row in rows:
+        curves.setdefault((row["runtime"], row["requests"]), []).append(row)
+
+    plt.figure(figsize=(10, 6))
+    for (runtime, requests), curve in curves.items():
+        plt.plot([r["concurrency"] for r in curve], [r["throughput"] for r in curve],
+                 marker="o", label=f"{runtime} ({requests} req)")
+    plt.xscale("log")
+    plt.title("Throughput vs. Concurrency")
+    plt.xlabel("Concurrency limit")
+    plt.ylabel("Throughput (req/s)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.savefig(f"{prefix}_throughput.png")
+    plt.close()
+    print(f"Saved: {prefix}_throughput.png")
+
+    plt.figure(figsize=(10, 6))
+    for (runtime, requests), curve in curves.items():
+        points = [r for r in curve if r["p99"] is not None]
+        plt.plot([r["throughput"] for r in points], [r["p99"] * 1000 for r in points],
+                 marker="o", label=f"{runtime} ({requests} req)")
+    plt.title("p99 Latency vs. Throughput")
+    plt.xlabel("Throughput (req/s)")
+    plt.ylabel("p99 latency (milliseconds)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.savefig(f"{prefix}_latency.png")
+    plt.close()
+    print(f"Saved: {prefix}_latency.png")
@@ -0,0 +1,20 @@
+from bench.workloads.body import BodyWorkload
+from bench.workloads.durable import DurableWorkload
+from bench.workloads.faults import FaultsWorkload
+from bench.workloads.footprint import FootprintWorkload
+from bench.workloads.io import IOWorkload
+from bench.workloads.lifecycle import LifecycleWorkload
+from bench.workloads.network import NetworkWorkload
+from bench.workloads.offload import OffloadWorkload
+from bench.workloads.pipeline import PipelineWorkload
+from bench.workloads.pool import PoolWorkload
+from bench.workloads.readpath import ReadPathWorkload
+from bench.workloads.sched import SchedWorkload
+from bench.workloads.stream import StreamWorkload
+from bench.workloads.web import WebWorkload
+
+WORKLOADS = {cls.name: cls for cls in (
+    IOWorkload, StreamWorkload, OffloadWorkload, ReadPathWorkload, DurableWorkload,
+    PipelineWorkload, SchedWorkload, FootprintWorkload, NetworkWorkload, LifecycleWorkload,
+    PoolWorkload, BodyWorkload, FaultsWorkload, WebWorkload,
+)}
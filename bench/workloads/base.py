@@ -0,0 +1,90 @@
+import contextlib
+import importlib.util
+
+from bench.histogram import merged
+
+
+class Workload:
+    """A benchmark written once against the :mod:`bench.runtimes` surface.
+
+    ``iteration()`` performs one timed measurement and returns a sample dict
+    holding at least ``"seconds"``. By default every iteration runs on a
+    fresh loop (``rt.run`` per iteration, as the io scripts always did);
+    workloads that keep state across iterations, such as a reused HTTP
+    session, set ``fresh_loop = False`` and get every iteration inside a
+    single ``rt.run``.
+    """
+
+    name = None
+    label = None
+    iterations = 20
+    fresh_loop = True
+    # Run every iteration in a fresh process, as if --isolate were given,
+    # unless the work is split over --processes.
+    isolated = False
+    # Third-party modules needed per runtime family, e.g. {"asyncio": ("aiofiles",)}.
+    requires = {}
+    # Sample fields that add up across parallel worker processes.
+    additive = ()
+    # Additive field that merged throughput is computed from.
+    counted = "requests"
+
+    def __init__(self, args):
+        self.args = args
+
+    @classmethod
+    def add_arguments(cls, parser):
+        """Registers the workload's own command-line options."""
+
+    def unsupported(self, rt):
+        """Returns why ``rt`` cannot run this workload, or None if it can."""
+        missing = [m for m in self.requires.get(rt.family, ())
+                   if importlib.util.find_spec(m) is None]
+        if missing:
+            return f"needs {', '.join(missing)}"
+        return None
+
+    def for_worker(self, index, count):
+        """Narrows ``self.args`` to worker ``index`` of ``count`` processes."""
+
+    def merge_samples(self, samples):
+        """Combines the same iteration measured by parallel worker processes.
+
+        Workers start together, so the wall time is the slowest worker's;
+        histograms merge, additive counters sum and throughput is
+        recomputed from the merged totals.
+        """
+        out = {"seconds": max(s["seconds"] for s in samples)}
+        for key in self.additive:
+            values = [s[key] for s in samples if s.get(key) is not None]
+            out[key] = sum(values) if values else None
+        if "histogram" in samples[0]:
+            out["histogram"] = merged(s["histogram"] for s in samples)
+        if "throughput" in samples[0]:
+            out["throughput"] = out[self.counted] / out["seconds"] if out["seconds"] else 0.0
+        return out
+
+    def setup(self):
+        """Prepares shared state before any runtime is measured."""
+
+    def teardown(self):
+        """Undoes whatever setup() and the iterations left behind."""
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        """Untimed per-loop state handed to every iteration()."""
+        yield None
+
+    async def iteration(self, rt, state):
+        raise NotImplementedError
+
+    def expected_interval(self, hist):
+        """Interval used for coordinated-omission correction, or None to skip it."""
+        return None
+
+    def format_sample(self, rt, sample):
+        return f"{rt.name}: {self.label} in {sample['seconds']:.9f} seconds"
+
+    def format_summary(self, samples):
+        """Extra line printed under the stats of a runtime, or None."""
+        return None
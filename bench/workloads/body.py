@@ -0,0 +1,297 @@
+import importlib.util
+import json
+import statistics
+import time
+
+from bench.histogram import Histogram, merged
+from bench.workloads.base import Workload
+from bench.workloads.sched import comma_list
+from bench.workloads.stream import format_size, parse_size
+
+DIRECTIONS = ("download", "upload")
+DECODERS = ("none", "json", "orjson")
+DEFAULT_CLIENTS = {"asyncio": "aiohttp", "trio": "httpx"}
+
+
+def _decoder(name):
+    if name == "orjson":
+        import orjson
+        return orjson.loads
+    return json.loads
+
+
+async def _chunks(payload, chunk_size):
+    """A streamed request body: ``payload`` in ``chunk_size`` pieces."""
+    for offset in range(0, len(payload), chunk_size):
+        yield payload[offset:offset + chunk_size]
+
+
+class _AiohttpBodies:
+    """Streams bodies with ``resp.content.iter_chunked`` and async-generator uploads."""
+
+    name = "aiohttp"
+    families = ("asyncio",)
+
+    def __init__(self, pool, timeout):
+        self._options = (pool, timeout)
+        self._session = None
+
+    async def __aenter__(self):
+        import aiohttp
+        pool, timeout = self._options
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=pool),
+                                              timeout=aiohttp.ClientTimeout(total=timeout))
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._session.__aexit__(exc_type, exc, tb)
+
+    async def download(self, url, chunk_size, keep):
+        """Returns ``(status, bytes read, the chunks if keep)``."""
+        chunks, size = [], 0
+        async with self._session.get(url) as resp:
+            async for chunk in resp.content.iter_chunked(chunk_size):
+                size += len(chunk)
+                if keep:
+                    chunks.append(chunk)
+            return resp.status, size, chunks
+
+    async def upload(self, url, payload, chunk_size):
+        """Returns ``(status, response body)``."""
+        async with self._session.post(url, data=_chunks(payload, chunk_size)) as resp:
+            return resp.status, await resp.read()
+
+
+class _HttpxBodies:
+    """Streams bodies with ``aiter_bytes`` and async-iterator uploads."""
+
+    name = "httpx"
+    families = ("asyncio", "trio")
+
+    def __init__(self, pool, timeout):
+        import httpx
+        self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=pool),
+                                         timeout=timeout)
+
+    async def __aenter__(self):
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._client.__aexit__(exc_type, exc, tb)
+
+    async def download(self, url, chunk_size, keep):
+        chunks, size = [], 0
+        async with self._client.stream("GET", url) as resp:
+            async for chunk in resp.aiter_bytes(chunk_size):
+                size += len(chunk)
+                if keep:
+                    chunks.append(chunk)
+            return resp.status_code, size, chunks
+
+    async def upload(self, url, payload, chunk_size):
+        resp = await self._client.post(url, content=_chunks(payload, chunk_size))
+        return resp.status_code, resp.content
+
+
+STREAMING_CLIENTS = {cls.name: cls for cls in (_AiohttpBodies, _HttpxBodies)}
+
+
+class BodyWorkload(Workload):
+    """Response and request body throughput, 1 KB to 100 MB per request.
+
+    Every iteration sends ``--requests`` requests, ``--concurrency`` at a
+    time, for each of ``--sizes`` to a ``python -m bench serve`` target,
+    which sizes each answer from a ``?size=`` query. ``download`` streams
+    the response body through ``resp.content.iter_chunked`` (aiohttp) or
+    ``aiter_bytes`` (httpx) in ``--chunk-size`` pieces; with ``--decode
+    json`` or ``orjson`` the body is an array of records, joined and
+    decoded once it is in, and the decode time is kept apart. ``upload``
+    POSTs a body of each size from an async generator, i.e. a chunked,
+    streamed request, and checks the byte count the server echoes back.
+
+    Per size it reports requests/s, MB/s, latency and the client's CPU
+    seconds per MB (process time, so a server on the same machine is not
+    counted), which is what moving payloads costs the gateway.
+    """
+
+    name = "body"
+    label = "requests"
+    iterations = 5
+    additive = ("requests", "bytes")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/",
+                            help="python -m bench serve target (it honours ?size=N)")
+        parser.add_argument("--direction", choices=DIRECTIONS, default="download")
+        parser.add_argument("--sizes", type=comma_list(parse_size),
+                            default=[parse_size(s) for s in ("1K", "64K", "1M", "16M")],
+                            help="comma-separated body sizes, e.g. 1K,1M,100M "
+                                 "(default: 1K,64K,1M,16M)")
+        parser.add_argument("--chunk-size", type=parse_size, default=parse_size("64K"),
+                            help="bytes per streamed chunk")
+        parser.add_argument("--decode", choices=DECODERS, default="none",
+                            help="decode downloaded JSON with the stdlib or orjson")
+        parser.add_argument("--client", default=None, choices=sorted(STREAMING_CLIENTS),
+                            help="HTTP client (default: aiohttp on asyncio loops, httpx on trio)")
+        parser.add_argument("--requests", type=int, default=20, help="requests per size")
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="requests in flight at once")
+        parser.add_argument("--timeout", type=float, default=60.0)
+
+    def setup(self):
+        args = self.args
+        if args.decode != "none" and args.direction == "upload":
+            raise SystemExit("Error: --decode applies to downloads")
+        self.decode = None if args.decode == "none" else _decoder(args.decode)
+        self._payloads = {}
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.requests = args.requests // count + (index < args.requests % count)
+        args.concurrency = max(1, args.concurrency // count)
+
+    def client_for(self, rt):
+        return self.args.client or DEFAULT_CLIENTS.get(rt.family)
+
+    def unsupported(self, rt):
+        client = self.client_for(rt)
+        if client is None or rt.family not in STREAMING_CLIENTS[client].families:
+            return f"no client with a streaming body API runs under {rt.name}"
+        missing = [m for m in (client, "orjson" if self.args.decode == "orjson" else None)
+                   if m is not None and importlib.util.find_spec(m) is None]
+        if missing:
+            return f"needs {', '.join(missing)}"
+        return None
+
+    def merge_samples(self, samples):
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            counts = {key: sum(p[key] for p in group)
+                      for key in ("requests", "errors", "bytes", "cpu", "decode")}
+            points.append(self._point(group[0]["size"], max(p["seconds"] for p in group),
+                                      counts, merged(p["histogram"] for p in group)))
+        return self._sample(points)
+
+    @staticmethod
+    def _point(size, seconds, counts, hist):
+        megabytes = counts["bytes"] / 1e6
+        return {
+            "size": size,
+            "seconds": seconds,
+            **counts,
+            "throughput": counts["requests"] / seconds if seconds else 0.0,
+            "mb_per_s": megabytes / seconds if seconds else 0.0,
+            "cpu_per_mb": counts["cpu"] / megabytes if megabytes else None,
+            "decode_mb_per_s": megabytes / counts["decode"] if counts["decode"] else None,
+            "histogram": hist,
+        }
+
+    @staticmethod
+    def _sample(points):
+        seconds = sum(p["seconds"] for p in points)
+        requests = sum(p["requests"] for p in points)
+        return {
+            "seconds": seconds,
+            "requests": requests,
+            "bytes": sum(p["bytes"] for p in points),
+            "throughput": requests / seconds if seconds else 0.0,
+            "histogram": merged(p["histogram"] for p in points),
+            "points": points,
+        }
+
+    def _payload(self, size):
+        if size not in self._payloads:
+            self._payloads[size] = b"x" * size
+        return self._payloads[size]
+
+    async def _measure(self, rt, client, size):
+        args = self.args
+        hist = Histogram()
+        counts = dict.fromkeys(("requests", "errors", "bytes", "cpu", "decode"), 0)
+        limiter = rt.limiter(args.concurrency)
+        separator = "&" if "?" in args.url else "?"
+        url = f"{args.url}{separator}size={size}"
+        if self.decode is not None:
+            url += "&shape=records"
+        payload = self._payload(size) if args.direction == "upload" else None
+
+        async def one():
+            async with limiter:
+                start = time.perf_counter()
+                try:
+                    if payload is None:
+                        status, moved, chunks = await client.download(url, args.chunk_size,
+                                                                      self.decode is not None)
+                    else:
+                        status, answer = await client.upload(args.url, payload, args.chunk_size)
+                        moved = len(payload)
+                except Exception:
+                    counts["errors"] += 1
+                    return
+                # A target that ignores ?size= (or drops upload bytes) is an error,
+                # not a fast result.
+                if status != 200 or moved < size or (
+                        payload is not None and json.loads(answer) != {"received": size}):
+                    counts["errors"] += 1
+                    return
+                if self.decode is not None:
+                    decode_start = time.perf_counter()
+                    self.decode(b"".join(chunks))
+                    counts["decode"] += time.perf_counter() - decode_start
+                hist.record(time.perf_counter() - start)
+            counts["requests"] += 1
+            counts["bytes"] += moved
+
+        cpu = time.process_time()
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            for _ in range(args.requests):
+                await g.spawn(one)
+        seconds = time.perf_counter() - start
+        counts["cpu"] = time.process_time() - cpu
+        return self._point(size, seconds, counts, hist)
+
+    async def iteration(self, rt, state):
+        cls = STREAMING_CLIENTS[self.client_for(rt)]
+        async with cls(self.args.concurrency, self.args.timeout) as client:
+            points = [await self._measure(rt, client, size) for size in self.args.sizes]
+        return self._sample(points)
+
+    def _describe(self, point):
+        line = (f"{format_size(point['size']):>6}: {point['throughput']:.1f} req/s, "
+                f"{point['mb_per_s']:.1f} MB/s, {point['errors']} errors")
+        if point["cpu_per_mb"] is not None:
+            line += f", {point['cpu_per_mb'] * 1000:.2f} ms CPU/MB"
+        if point["decode_mb_per_s"] is not None:
+            line += f", decode {point['decode_mb_per_s']:.1f} MB/s"
+        return line
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {sample['requests']} {self.args.direction} {self.label} "
+                 f"({self.client_for(rt)}) in {sample['seconds']:.9f} seconds"]
+        lines += ["  " + self._describe(p) for p in sample["points"]]
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        """Median rates per size with the merged p99 and CPU cost."""
+        by_size = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_size.setdefault(p["size"], []).append(p)
+        lines = [f"{'size':>6}{'req/s':>10}{'MB/s':>10}{'p99 ms':>10}{'CPU ms/MB':>11}"
+                 f"{'decode MB/s':>13}"]
+        for size, points in by_size.items():
+            def median(key):
+                values = [p[key] for p in points if p[key] is not None]
+                return statistics.median(values) if values else None
+            p99 = merged(p["histogram"] for p in points).value_at_percentile(99)
+            cpu, decode = median("cpu_per_mb"), median("decode_mb_per_s")
+            lines.append(f"{format_size(size):>6}{median('throughput'):>10.1f}"
+                         f"{median('mb_per_s'):>10.1f}"
+                         f"{'-' if p99 is None else f'{p99 * 1000:.3f}':>10}"
+                         f"{'-' if cpu is None else f'{cpu * 1000:.2f}':>11}"
+                         f"{'-' if decode is None else f'{decode:.1f}':>13}")
+        return "\n".join(lines)
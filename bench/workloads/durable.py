@@ -0,0 +1,251 @@
+import mmap
+import os
+import time
+
+from bench.histogram import Histogram
+from bench.workloads.base import Workload
+from bench.workloads.stream import parse_size
+
+SYNCS = ("none", "fsync", "fdatasync", "dsync", "direct", "group")
+PATTERNS = ("files", "log")
+
+# O_DIRECT needs buffers, sizes and offsets aligned to the logical block
+# size; 4 KiB covers every common device, and mmap buffers are page-aligned.
+_ALIGN = 4096
+
+
+def _write_all(fd, buf):
+    view = memoryview(buf)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _sync(fd, how):
+    if how == "fsync":
+        os.fsync(fd)
+    elif how == "fdatasync":
+        os.fdatasync(fd)
+
+
+def _write_file_job(path, flags, buf, how, keep_open=False):
+    fd = os.open(path, flags, 0o644)
+    try:
+        _write_all(fd, buf)
+        _sync(fd, how)
+    except BaseException:
+        os.close(fd)
+        raise
+    if keep_open:
+        return fd
+    os.close(fd)
+    return None
+
+
+def _append_job(fd, buf, how):
+    _write_all(fd, buf)
+    _sync(fd, how)
+
+
+def _sync_batch_job(fds, how, close):
+    for fd in fds:
+        try:
+            _sync(fd, how)
+        finally:
+            if close:
+                os.close(fd)
+
+
+class _GroupCommit:
+    """Makes each completed write durable, sharing one sync among concurrent writers.
+
+    Writers arriving while a sync is running queue on a one-slot limiter;
+    the first to get it syncs everything written so far, and the rest
+    find their write already covered and return without a syscall.
+    ``batches`` counts those shared rounds and ``syncs`` the sync calls
+    they made: one per distinct fd, so new files still take one each.
+    """
+
+    def __init__(self, rt, how, close):
+        self._rt = rt
+        self._how = how
+        self._close = close
+        self._lock = rt.limiter(1)
+        self._pending = []
+        self._written = 0
+        self._synced = 0
+        self.batches = 0
+        self.syncs = 0
+
+    async def commit(self, fd):
+        self._written += 1
+        seq = self._written
+        self._pending.append(fd)
+        async with self._lock:
+            if self._synced >= seq:
+                return
+            batch, self._pending = list(dict.fromkeys(self._pending)), []
+            covered = self._written
+            await self._rt.run_in_thread(_sync_batch_job, batch, self._how, self._close)
+            self._synced = covered
+            self.batches += 1
+            self.syncs += len(batch)
+
+
+class DurableWorkload(Workload):
+    """Durable writes: each write counts once it would survive a crash.
+
+    ``--pattern files`` writes one new file per operation, like the io
+    workload's write phase. ``--pattern log`` appends records to
+    ``--logs`` shared files opened with O_APPEND, like a write-ahead log.
+    ``--sync`` picks how durability is reached:
+
+    * ``none``: page cache only, the io workload's behaviour (baseline);
+    * ``fsync`` / ``fdatasync``: after every write;
+    * ``dsync``: files opened with O_DSYNC, so every write is synchronous;
+    * ``direct``: O_DIRECT | O_DSYNC with page-aligned buffers and sizes
+      rounded up to 4 KiB, bypassing the page cache;
+    * ``group``: group commit, where writers that finish while a sync is
+      running share the next one (fdatasync for logs, fsync for files).
+
+    Every blocking call runs in the runtime's worker-thread pool. The
+    histogram holds per-operation latency from the start of the write
+    until it is durable.
+    """
+
+    name = "durable"
+    label = "durable writes"
+    iterations = 5
+    additive = ("ops", "bytes", "syncs", "batches")
+    counted = "ops"
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--dir", default="durable_files",
+                            help="directory written to; put it on the device under test")
+        parser.add_argument("--pattern", choices=PATTERNS, default="files")
+        parser.add_argument("--sync", choices=SYNCS, default="fsync")
+        parser.add_argument("--ops", type=int, default=1000, help="writes per iteration")
+        parser.add_argument("--size", type=parse_size, default=parse_size("4K"),
+                            help="bytes per write (default: 4K)")
+        parser.add_argument("--concurrency", type=int, default=16, help="concurrent writers")
+        parser.add_argument("--logs", type=int, default=1, help="log files for --pattern log")
+
+    def setup(self):
+        args = self.args
+        os.makedirs(args.dir, exist_ok=True)
+        self.prefix = ""
+        self.size = args.size
+        if args.sync == "direct":
+            self.size = -(-args.size // _ALIGN) * _ALIGN
+            if self.size != args.size:
+                print(f"O_DIRECT: rounding --size up to {self.size} bytes")
+        self.buf = mmap.mmap(-1, self.size)
+        self.buf.write(b"x" * self.size)
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.ops = args.ops // count + (index < args.ops % count)
+        args.concurrency = max(1, args.concurrency // count)
+        self.prefix = f"w{index}_"
+
+    def unsupported(self, rt):
+        sync = self.args.sync
+        if sync == "fdatasync" and not hasattr(os, "fdatasync"):
+            return "os.fdatasync is not available on this platform"
+        if sync == "dsync" and not hasattr(os, "O_DSYNC"):
+            return "O_DSYNC is not available on this platform"
+        if sync == "direct" and not hasattr(os, "O_DIRECT"):
+            return "O_DIRECT is not available on this platform"
+        return None
+
+    def teardown(self):
+        """Removes the files the iterations wrote, here or in worker processes.
+
+        Only those exact names are touched: ``--dir`` may hold other files.
+        """
+        args = self.args
+        kind, count = ("log", args.logs) if args.pattern == "log" else ("durable", args.ops)
+        prefixes = [""] + [f"w{index}_" for index in range(getattr(args, "processes", 1))]
+        for prefix in prefixes:
+            for i in range(count):
+                path = os.path.join(args.dir, f"{prefix}{kind}_{i}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _flags(self):
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_CLOEXEC", 0)
+        if self.args.sync == "dsync":
+            flags |= os.O_DSYNC
+        elif self.args.sync == "direct":
+            flags |= os.O_DIRECT | os.O_DSYNC
+        return flags | (os.O_APPEND if self.args.pattern == "log" else os.O_TRUNC)
+
+    def _path(self, kind, i):
+        return os.path.join(self.args.dir, f"{self.prefix}{kind}_{i}")
+
+    def _sync_call(self):
+        """The explicit sync after each write, if the mode needs one."""
+        if self.args.sync in ("fsync", "fdatasync"):
+            return self.args.sync
+        return None
+
+    async def iteration(self, rt, state):
+        args = self.args
+        flags = self._flags()
+        logs = []
+        if args.pattern == "log":
+            # Fresh logs each iteration, opened untimed.
+            logs = [os.open(self._path("log", i), flags | os.O_TRUNC, 0o644) for i in range(args.logs)]
+        group = None
+        if args.sync == "group":
+            how = "fdatasync" if args.pattern == "log" and hasattr(os, "fdatasync") else "fsync"
+            group = _GroupCommit(rt, how, close=args.pattern == "files")
+
+        hist = Histogram()
+        ops = iter(range(args.ops))
+        how = self._sync_call()
+
+        async def writer():
+            for i in ops:
+                started = time.perf_counter()
+                if args.pattern == "log":
+                    fd = logs[i % len(logs)]
+                    await rt.run_in_thread(_append_job, fd, self.buf, how)
+                else:
+                    fd = await rt.run_in_thread(_write_file_job, self._path("durable", i), flags,
+                                                self.buf, how, group is not None)
+                if group is not None:
+                    await group.commit(fd)
+                hist.record(time.perf_counter() - started)
+
+        try:
+            start = time.perf_counter()
+            async with rt.open_group() as g:
+                for _ in range(min(args.concurrency, args.ops)):
+                    await g.spawn(writer)
+            seconds = time.perf_counter() - start
+        finally:
+            for fd in logs:
+                os.close(fd)
+
+        if group is not None:
+            syncs, batches = group.syncs, group.batches
+        else:
+            syncs = args.ops if args.sync != "none" else 0
+            batches = None
+        return {
+            "seconds": seconds,
+            "ops": hist.count,
+            "bytes": hist.count * self.size,
+            "syncs": syncs,
+            "batches": batches,
+            "throughput": hist.count / seconds if seconds else 0.0,
+            "histogram": hist,
+        }
+
+    def format_sample(self, rt, sample):
+        batches = f" in {sample['batches']} batches" if sample.get("batches") is not None else ""
+        return (f"{rt.name}: {sample['ops']} {self.label} ({self.args.pattern}, {self.args.sync}) "
+                f"in {sample['seconds']:.9f} seconds ({sample['throughput']:.0f} ops/s, "
+                f"{sample['bytes'] / 1e6 / (sample['seconds'] or float('nan')):.2f} MB/s, "
+                f"{sample['syncs']} syncs{batches})")
@@ -0,0 +1,214 @@
+import collections
+import contextlib
+import errno
+import statistics
+import time
+
+from bench import clients
+from bench.histogram import Histogram, merged
+from bench.native_http import ProtocolError
+from bench.workloads.base import Workload
+from bench.workloads.web import DEFAULT_CLIENTS
+
+TIMEOUT_VIA = ("runtime", "client")
+
+
+def classify_error(exc):
+    """Class of a failed attempt: timeout, reset, disconnect or the exception's type."""
+    cause, seen = exc, set()
+    # Libraries wrap the OS error (httpx.ReadError from ConnectionResetError,
+    # trio.BrokenResourceError, ...), so the chain is searched.
+    while cause is not None and id(cause) not in seen:
+        seen.add(id(cause))
+        if isinstance(cause, TimeoutError) or "Timeout" in type(cause).__name__:
+            return "timeout"
+        if isinstance(cause, ConnectionResetError) or getattr(cause, "errno", None) == errno.ECONNRESET:
+            return "reset"
+        cause = cause.__cause__ or cause.__context__
+    name = type(exc).__name__
+    if isinstance(exc, (ConnectionError, ProtocolError)) or "Disconnect" in name \
+            or "RemoteProtocol" in name:
+        return "disconnect"
+    return name
+
+
+class FaultsWorkload(Workload):
+    """Error paths: timeouts, retries and cancellation against a faulty server.
+
+    Point it at ``python -m bench serve --reset-rate 0.01 --stall-rate 0.01
+    --slow-rate 0.05``, which resets some connections, never answers some
+    requests and delays others. Every request gets ``--retries`` retries
+    with exponential ``--backoff`` after a timeout, a dropped connection or
+    a 5xx answer, and each attempt is bounded by ``--timeout``: through the
+    runtime (asyncio.timeout, trio.fail_after, curio.timeout_after) or,
+    with ``--timeout-via client``, through the client's own ``timeout``
+    (aiohttp ClientTimeout(total=...); httpx and asks apply it to each I/O
+    step rather than the whole attempt; the native clients fall back on
+    the runtime's scope).
+
+    Failed attempts are counted by class instead of vanishing from the
+    throughput math. The sample also holds how late each timeout fired
+    past its deadline, the share of in-flight time spent in attempts that
+    failed and the attempt rate next to the goodput, i.e. what the
+    cancellations cost each runtime. aiohttp quietly retries a GET once
+    when a reused connection drops, so it reports fewer resets than the
+    server injected.
+    """
+
+    name = "faults"
+    label = "requests"
+    iterations = 3
+    additive = ("issued", "requests", "given_up", "retries", "attempts", "good_time",
+                "failed_time")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/",
+                            help="python -m bench serve target with fault injection")
+        parser.add_argument("--client", default=None, choices=sorted(clients.CLIENTS),
+                            help="HTTP client (default: aiohttp on asyncio loops, httpx on trio, "
+                                 "native on curio)")
+        parser.add_argument("--requests", type=int, default=2000,
+                            help="requests issued per iteration")
+        parser.add_argument("--concurrency", type=int, default=50,
+                            help="requests in flight at once")
+        parser.add_argument("--timeout", type=float, default=0.5, help="seconds per attempt")
+        parser.add_argument("--timeout-via", choices=TIMEOUT_VIA, default="runtime",
+                            help="enforce the timeout with the runtime's scope or the client's "
+                                 "own option")
+        parser.add_argument("--retries", type=int, default=2,
+                            help="retries after a failed attempt")
+        parser.add_argument("--backoff", type=float, default=0.01,
+                            help="seconds before the first retry, doubled for each next one")
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.requests = args.requests // count + (index < args.requests % count)
+        args.concurrency = max(1, args.concurrency // count)
+
+    def client_for(self, rt):
+        return self.args.client or DEFAULT_CLIENTS[rt.family]
+
+    def unsupported(self, rt):
+        client = self.client_for(rt)
+        if client not in clients.compatible(rt):
+            return f"client {client} is unavailable under {rt.name}"
+        return None
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        client = self.client_for(rt)
+        options = {"max_connections": self.args.concurrency} if client in ("native", "anyio") \
+            else {}
+        async with clients.open_client(client, rt, **options) as c:
+            yield c
+
+    def _get_options(self, rt):
+        if self.args.timeout_via == "runtime":
+            return {}
+        if self.client_for(rt) == "aiohttp":
+            import aiohttp
+            return {"timeout": aiohttp.ClientTimeout(total=self.args.timeout)}
+        return {"timeout": self.args.timeout}
+
+    async def iteration(self, rt, client):
+        args = self.args
+        hist, late = Histogram(), Histogram()
+        errors = collections.Counter()
+        totals = dict.fromkeys(("requests", "given_up", "retries", "attempts", "good_time",
+                                "failed_time"), 0)
+        limiter = rt.limiter(args.concurrency)
+        options = self._get_options(rt)
+
+        async def attempt():
+            """Returns the error class of one attempt, None if it succeeded."""
+            totals["attempts"] += 1
+            start = time.perf_counter()
+            try:
+                if options:
+                    status = await client.get(args.url, **options)
+                else:
+                    async with rt.timeout(args.timeout):
+                        status = await client.get(args.url)
+                kind = None if status < 500 else f"http_{status}"
+            except Exception as exc:
+                kind = classify_error(exc)
+            elapsed = time.perf_counter() - start
+            if kind is None:
+                totals["good_time"] += elapsed
+            else:
+                totals["failed_time"] += elapsed
+                errors[kind] += 1
+                if kind == "timeout":
+                    late.record(max(elapsed - args.timeout, 0.0))
+            return kind
+
+        async def one():
+            async with limiter:
+                start = time.perf_counter()
+                for number in range(args.retries + 1):
+                    if number:
+                        totals["retries"] += 1
+                        await rt.sleep(args.backoff * 2 ** (number - 1))
+                    if await attempt() is None:
+                        totals["requests"] += 1
+                        hist.record(time.perf_counter() - start)
+                        return
+                totals["given_up"] += 1
+
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            for _ in range(args.requests):
+                await g.spawn(one)
+        seconds = time.perf_counter() - start
+
+        sample = {"seconds": seconds, "issued": args.requests, **totals,
+                  "errors": dict(errors), "histogram": hist, "timeout_late": late}
+        return self._derive(sample)
+
+    @staticmethod
+    def _derive(sample):
+        seconds = sample["seconds"]
+        busy = sample["good_time"] + sample["failed_time"]
+        sample["throughput"] = sample["requests"] / seconds if seconds else 0.0
+        sample["attempt_rate"] = sample["attempts"] / seconds if seconds else 0.0
+        sample["wasted"] = sample["failed_time"] / busy if busy else 0.0
+        return sample
+
+    def merge_samples(self, samples):
+        out = super().merge_samples(samples)
+        errors = collections.Counter()
+        for s in samples:
+            errors.update(s["errors"])
+        out["errors"] = dict(errors)
+        out["timeout_late"] = merged(s["timeout_late"] for s in samples)
+        return self._derive(out)
+
+    @staticmethod
+    def _errors(errors):
+        return ", ".join(f"{kind} {n}" for kind, n in sorted(errors.items())) or "none"
+
+    def format_sample(self, rt, sample):
+        return (f"{rt.name}: {sample['requests']}/{sample['issued']} {self.label} "
+                f"({self.client_for(rt)}) in {sample['seconds']:.9f} seconds "
+                f"({sample['throughput']:.2f} req/s, {sample['attempt_rate']:.2f} attempts/s, "
+                f"{sample['retries']} retries, {sample['given_up']} given up; "
+                f"errors: {self._errors(sample['errors'])}; "
+                f"{sample['wasted']:.1%} of in-flight time in failed attempts)")
+
+    def format_summary(self, samples):
+        """Error classes over all samples and how late the timeouts fired."""
+        errors = collections.Counter()
+        for s in samples:
+            errors.update(s["errors"])
+        attempts = sum(s["attempts"] for s in samples)
+        lines = [f"errors per attempt: {self._errors(errors)} (of {attempts} attempts)",
+                 f"goodput: median {statistics.median(s['throughput'] for s in samples):.2f} "
+                 f"req/s; in-flight time in failed attempts: median "
+                 f"{statistics.median(s['wasted'] for s in samples):.1%}"]
+        late = merged(s["timeout_late"] for s in samples)
+        if late is not None and late.count:
+            parts = [f"p{p:g}={v * 1000:.3f}ms" for p, v in late.percentiles().items()]
+            lines.append("timeout fired late by: " + " ".join(parts)
+                         + f" max={late.max * 1000:.3f}ms")
+        return "\n".join(lines)
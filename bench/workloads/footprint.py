@@ -0,0 +1,219 @@
+import gc
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+from bench.memory import current_rss
+from bench.native_http import CONNECTORS
+from bench.workloads.base import Workload
+from bench.workloads.sched import parse_counts
+
+KINDS = ("tasks", "connections")
+
+# File descriptors kept free for the runtime, stdio and result files.
+_SPARE_FDS = 256
+
+
+def _snapshot():
+    """(traced bytes, RSS, GC-tracked objects) after a full collection."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0], current_rss(), len(gc.get_objects())
+
+
+def _raise_fd_limit():
+    """Raises the open file limit to its hard maximum; returns the limit, None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module and no per-process descriptor cap to raise.
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
+class FootprintWorkload(Workload):
+    """Memory cost of idle tasks or idle connections, from 1k up to 1M.
+
+    Every iteration grows one population up to the largest ``--counts``
+    entry and, each time it reaches an entry, records how many Python
+    bytes tracemalloc traced, how many GC-tracked objects and how much RSS
+    it has added per task or connection. Growing one population keeps the
+    figures free of memory released and reused between points, and every
+    iteration runs in a fresh process (unless ``--processes`` splits the
+    work) so each runtime starts from the same heap.
+
+    Traced bytes are the headline figure: they count exactly what the
+    tasks and connections allocate. RSS is kept as a secondary column; it
+    moves in arena- and page-sized steps and includes tracemalloc's own
+    bookkeeping, so at small counts it says little, and it is missing
+    where the platform does not report it.
+
+    ``--kind tasks`` spawns tasks parked in a long sleep. ``--kind
+    connections`` has each task open a keep-alive connection to ``--url``
+    (``python -m bench serve``) over the runtime's own streams and wait on
+    a read, like a gateway holding an idle client. Counts above the open
+    file limit, raised to its hard maximum, are dropped.
+    """
+
+    name = "footprint"
+    label = "idle"
+    iterations = 3
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--kind", choices=KINDS, default="tasks")
+        parser.add_argument("--counts", type=parse_counts, default=[1_000, 10_000, 100_000],
+                            help="comma-separated population sizes, e.g. 1e3,1e4,1e5,1e6 "
+                                 "(default: 1000,10000,100000)")
+        parser.add_argument("--url", default="http://127.0.0.1:8000/",
+                            help="server the idle connections are opened to")
+        parser.add_argument("--connect-concurrency", type=int, default=100,
+                            help="connections being opened at once")
+
+    def setup(self):
+        self.args.counts = sorted(set(self.args.counts))
+        if self.args.kind != "connections":
+            return
+        limit = _raise_fd_limit()
+        if limit is not None:
+            usable = limit - _SPARE_FDS
+            dropped = [n for n in self.args.counts if n > usable]
+            if dropped:
+                print(f"open file limit is {limit}; dropping counts {dropped}")
+                self.args.counts = [n for n in self.args.counts if n <= usable]
+            if not self.args.counts:
+                raise SystemExit("Error: every count exceeds the open file limit (ulimit -n)")
+        parts = urlsplit(self.args.url)
+        self.address = (parts.hostname, parts.port or 80)
+
+    def for_worker(self, index, count):
+        self.args.counts = [max(1, n // count) for n in self.args.counts]
+
+    def merge_samples(self, samples):
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            rss = [p["rss"] for p in group]
+            points.append(self._point(
+                sum(p["count"] for p in group), max(p["seconds"] for p in group),
+                sum(p["traced"] for p in group), None if None in rss else sum(rss),
+                sum(p["objects"] for p in group)))
+        self._add_marginal(points)
+        return {"seconds": max(s["seconds"] for s in samples), "points": points}
+
+    @staticmethod
+    def _point(count, seconds, traced, rss, objects):
+        return {
+            "count": count,
+            "seconds": seconds,
+            "traced": traced,
+            "rss": rss,
+            "objects": objects,
+            "traced_per": traced / count,
+            "rss_per": rss / count if rss is not None else None,
+            "objects_per": objects / count,
+        }
+
+    @staticmethod
+    def _add_marginal(points):
+        """Traced bytes per item added since the previous point, free of fixed costs."""
+        previous_count, previous_traced = 0, 0
+        for p in points:
+            p["traced_marginal"] = (p["traced"] - previous_traced) / (p["count"] - previous_count)
+            previous_count, previous_traced = p["count"], p["traced"]
+
+    async def _idle_task(self, rt, started):
+        started[0] += 1
+        await rt.sleep(3600)
+
+    async def _idle_connection(self, rt, started, streams, limiter, failures):
+        async with limiter:
+            try:
+                stream = await CONNECTORS[rt.family](rt, *self.address)
+            except Exception as exc:
+                # asyncio's group only reports it once the body exits, so
+                # the body has to be told.
+                failures.append(exc)
+                raise
+        streams.append(stream)
+        started[0] += 1
+        await stream.receive()
+
+    async def iteration(self, rt, state):
+        args = self.args
+        # The runner already traces under --trace-memory; only the current
+        # traced size is read, so its peak is left alone.
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        started = [0]
+        streams, failures = [], []
+        limiter = rt.limiter(args.connect_concurrency)
+        points = []
+        try:
+            base_traced, base_rss, base_objects = _snapshot()
+            seconds = 0.0
+            async with rt.open_group() as g:
+                for target in args.counts:
+                    begin = time.perf_counter()
+                    for _ in range(target - started[0]):
+                        if args.kind == "tasks":
+                            await g.spawn(self._idle_task, rt, started)
+                        else:
+                            await g.spawn(self._idle_connection, rt, started, streams,
+                                          limiter, failures)
+                    # Wait until every item is parked, not merely scheduled.
+                    while started[0] < target:
+                        if failures:
+                            raise failures[0]
+                        await rt.sleep(0)
+                    seconds += time.perf_counter() - begin
+                    traced, rss, objects = _snapshot()
+                    points.append(self._point(
+                        target, seconds, traced - base_traced,
+                        rss - base_rss if rss is not None and base_rss is not None else None,
+                        objects - base_objects))
+                await g.cancel()
+        finally:
+            for stream in streams:
+                await stream.close()
+            if started_tracing:
+                tracemalloc.stop()
+        self._add_marginal(points)
+        return {"seconds": seconds, "points": points}
+
+    @staticmethod
+    def _describe(point):
+        line = (f"{point['count']:>8}: {point['traced_per']:>8.0f} B traced each "
+                f"({point['traced_marginal']:.0f} B marginal), "
+                f"{point['objects_per']:.1f} objects each")
+        if point["rss_per"] is not None:
+            line += f", {point['rss_per']:.0f} B RSS each"
+        return line + f", created in {point['seconds']:.3f} s"
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {self.label} {self.args.kind} (memory added per item)"]
+        lines += ["  " + self._describe(p) for p in sample["points"]]
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        """Median cost per item at each count, and at the largest count overall."""
+        by_count = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_count.setdefault(p["count"], []).append(p)
+        lines = [f"{'count':>8}{'traced B':>10}{'marginal':>10}{'objects':>9}{'RSS B':>10}"]
+        for count, points in by_count.items():
+            def median(key):
+                values = sorted(p[key] for p in points if p[key] is not None)
+                return values[len(values) // 2] if values else None
+            rss = median("rss_per")
+            lines.append(f"{count:>8}{median('traced_per'):>10.0f}"
+                         f"{median('traced_marginal'):>10.0f}{median('objects_per'):>9.1f}"
+                         f"{'-' if rss is None else f'{rss:.0f}':>10}")
+        return "\n".join(lines)
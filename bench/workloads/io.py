@@ -0,0 +1,92 @@
+import contextlib
+import os
+import time
+
+from bench import filebackends
+from bench.workloads.base import Workload
+
+
+def list_files(directory):
+    """Every input file under ``directory``, nested directories included."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, f) for f in sorted(files) if not f.endswith("_out"))
+    return paths
+
+
+def read_mode(path):
+    """Mode the io workload reads ``path`` in: text, except the random-content .bin files."""
+    return "rb" if path.endswith(".bin") else "r"
+
+
+class IOWorkload(Workload):
+    """Concurrent read of every file in a directory, then a concurrent write."""
+
+    name = "io"
+    label = "file I/O"
+    iterations = 20
+    requires = {"asyncio": ("aiofiles",)}
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--dir", default="test_files",
+                            help="directory produced by io_bench/dummy_file_generator.py")
+        parser.add_argument("--data", default="Test data",
+                            help="payload written to each <file>_out")
+        parser.add_argument("--file-backend", choices=filebackends.BACKENDS, default="default",
+                            help="how asyncio loops reach the files: the runtime's wrapper, "
+                                 "io_uring, preadv/pwritev in threads, or direct syscalls")
+
+    def setup(self):
+        if not os.path.isdir(self.args.dir):
+            raise SystemExit(f"Error: Directory '{self.args.dir}' not found. "
+                             "Run io_bench/dummy_file_generator.py first.")
+        self.paths = list_files(self.args.dir)
+        backend, reason = filebackends.resolve(self.args.file_backend)
+        if reason:
+            print(f"{self.args.file_backend} file backend unavailable ({reason}); using {backend}")
+        # Recorded parameters show the backend that actually ran.
+        self.args.file_backend = backend
+
+    def unsupported(self, rt):
+        if self.args.file_backend == "default":
+            return super().unsupported(rt)
+        if rt.family != "asyncio":
+            return f"the {self.args.file_backend} file backend needs an asyncio loop"
+        return None
+
+    def for_worker(self, index, count):
+        self.paths = self.paths[index::count]
+
+    def teardown(self):
+        for p in self.paths:
+            out_file = p + "_out"
+            if os.path.exists(out_file):
+                os.remove(out_file)
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        async with filebackends.opener(self.args.file_backend, rt) as open_file:
+            yield open_file
+
+    async def read_file(self, open_file, path):
+        async with open_file(path, read_mode(path)) as f:
+            await f.read()
+
+    async def write_file(self, open_file, path, data):
+        async with open_file(path, "w") as f:
+            await f.write(data)
+
+    async def iteration(self, rt, open_file):
+        start = time.perf_counter()
+
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self.read_file, open_file, p)
+
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self.write_file, open_file, p + "_out", self.args.data)
+
+        return {"seconds": time.perf_counter() - start}
@@ -0,0 +1,383 @@
+import argparse
+import importlib.util
+import os
+import ssl
+import statistics
+import time
+
+from bench.histogram import Histogram, merged
+from bench.workloads.base import Workload
+from bench.workloads.sched import comma_list, parse_counts
+
+PHASES = ("pool_wait", "dns", "connect", "tls", "send", "first_byte", "body", "total")
+# Phases that set up a connection rather than use it.
+SETUP_PHASES = ("dns", "connect", "tls")
+DEFAULT_CLIENTS = {"asyncio": "aiohttp", "trio": "httpx"}
+
+# httpcore trace events and the timeline mark each one sets.
+_HTTPCORE_MARKS = {
+    "connection.connect_tcp.started": "connect_start",
+    "connection.connect_tcp.complete": "connect_end",
+    "connection.start_tls.started": "tls_start",
+    "connection.start_tls.complete": "tls_end",
+    "http11.send_request_headers.started": "acquired",
+    "http11.send_request_body.complete": "sent",
+    "http2.send_request_headers.started": "acquired",
+    "http2.send_request_body.complete": "sent",
+}
+
+
+def parse_limits(value):
+    limits = comma_list(int)(value)
+    if min(limits) < 0:
+        raise argparse.ArgumentTypeError(f"expected limits of 0 or more, got {value!r}")
+    return limits
+
+
+def client_ssl_context(url, ca):
+    """Context trusting ``ca`` for an https ``url``, None for plain HTTP."""
+    if not url.startswith("https:"):
+        return None
+    if not os.path.exists(ca):
+        raise SystemExit(f"Error: CA file '{ca}' not found. "
+                         "Run python -m bench serve --tls first, or pass --ca.")
+    return ssl.create_default_context(cafile=ca)
+
+
+class Timeline:
+    """perf_counter marks of one request, reduced to phase durations."""
+
+    def __init__(self):
+        self.marks = {"start": time.perf_counter()}
+
+    def mark(self, name):
+        # The first occurrence wins, e.g. connect_start also acquires a slot.
+        self.marks.setdefault(name, time.perf_counter())
+
+    @property
+    def opened(self):
+        return "connect_start" in self.marks
+
+    def phases(self):
+        m = self.marks
+
+        def span(begin, end):
+            return m[end] - m[begin] if begin in m and end in m else None
+
+        # httpcore has no acquire event: "acquired" comes with the request
+        # headers, after a new connection's connect and TLS. Such a
+        # connection was acquired when it began connecting.
+        acquired = [m[k] for k in ("acquired", "connect_start") if k in m]
+        out = {"pool_wait": min(acquired) - m["start"] if acquired else None,
+               "dns": span("dns_start", "dns_end"),
+               "connect": span("connect_start", "connect_end"), "tls": span("tls_start", "tls_end")}
+        if out["connect"] is not None and out["dns"] is not None:
+            # aiohttp resolves inside its connection-create hooks.
+            out["connect"] -= out["dns"]
+        ready = [m[k] for k in ("acquired", "connect_end", "tls_end") if k in m]
+        if ready and "sent" in m:
+            out["send"] = m["sent"] - max(ready)
+        out["first_byte"] = span("sent", "headers")
+        out["body"] = span("headers", "end")
+        out["total"] = span("start", "end")
+        return {name: value for name, value in out.items() if value is not None}
+
+
+class AiohttpTraced:
+    """aiohttp session whose TraceConfig hooks mark the request's timeline.
+
+    ``keepalive`` is 0 to close every connection after its request; aiohttp
+    has no cap on idle connections, so any other value keeps all of them.
+    ``None`` for ``keepalive_expiry`` keeps the library's default.
+    """
+
+    name = "aiohttp"
+    families = ("asyncio",)
+
+    def __init__(self, pool, per_host=0, keepalive=None, keepalive_expiry=None, http2=False,
+                 ssl_context=None, timeout=10.0):
+        if http2:
+            raise ValueError("aiohttp only speaks HTTP/1.1")
+        self._options = (pool, per_host, keepalive, keepalive_expiry, ssl_context, timeout)
+        self._session = None
+
+    @staticmethod
+    def _hook(name):
+        async def hook(session, ctx, params):
+            ctx.trace_request_ctx.mark(name)
+        return hook
+
+    async def __aenter__(self):
+        import aiohttp
+        pool, per_host, keepalive, keepalive_expiry, ssl_context, timeout = self._options
+        trace = aiohttp.TraceConfig()
+        for signal, name in (("on_connection_create_start", "acquired"),
+                             ("on_connection_reuseconn", "acquired"),
+                             ("on_dns_resolvehost_start", "dns_start"),
+                             ("on_dns_resolvehost_end", "dns_end"),
+                             ("on_connection_create_end", "connect_end"),
+                             ("on_request_headers_sent", "sent")):
+            getattr(trace, signal).append(self._hook(name))
+        trace.on_connection_create_start.append(self._hook("connect_start"))
+        options = {"force_close": keepalive == 0}
+        if keepalive != 0 and keepalive_expiry is not None:
+            options["keepalive_timeout"] = keepalive_expiry
+        connector = aiohttp.TCPConnector(limit=pool, limit_per_host=per_host, ssl=ssl_context,
+                                         **options)
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace],
+                                              timeout=aiohttp.ClientTimeout(total=timeout))
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._session.__aexit__(exc_type, exc, tb)
+
+    async def fetch(self, url, timeline):
+        async with self._session.get(url, trace_request_ctx=timeline) as resp:
+            timeline.mark("headers")
+            await resp.read()
+            timeline.mark("end")
+            return resp.status, f"HTTP/{resp.version.major}.{resp.version.minor}"
+
+
+class HttpxTraced:
+    """httpx client reporting httpcore's trace events to the request's timeline.
+
+    httpx has no per-host limit, so ``per_host`` must be 0. ``keepalive``
+    None keeps every idle connection; ``http2`` needs the h2 package.
+    """
+
+    name = "httpx"
+    families = ("asyncio", "trio")
+
+    def __init__(self, pool, per_host=0, keepalive=None, keepalive_expiry=None, http2=False,
+                 ssl_context=None, timeout=10.0):
+        import httpx
+        if per_host:
+            raise ValueError("httpx has no per-host connection limit")
+        limits = httpx.Limits(max_connections=pool, max_keepalive_connections=keepalive,
+                              keepalive_expiry=5.0 if keepalive_expiry is None else keepalive_expiry)
+        self._client = httpx.AsyncClient(limits=limits, http2=http2, verify=ssl_context or True,
+                                         timeout=timeout)
+
+    async def __aenter__(self):
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._client.__aexit__(exc_type, exc, tb)
+
+    async def fetch(self, url, timeline):
+        async def trace(event, info):
+            name = _HTTPCORE_MARKS.get(event)
+            if name is not None:
+                timeline.mark(name)
+
+        async with self._client.stream("GET", url, extensions={"trace": trace}) as resp:
+            timeline.mark("headers")
+            await resp.aread()
+            timeline.mark("end")
+            return resp.status_code, resp.http_version
+
+
+# Only these clients expose per-request trace hooks.
+TRACED_CLIENTS = {cls.name: cls for cls in (AiohttpTraced, HttpxTraced)}
+
+
+def traced_client_for(name, rt):
+    """``name``, or the default traced client of ``rt``'s family."""
+    return name or DEFAULT_CLIENTS.get(rt.family)
+
+
+def traced_unsupported(name, rt):
+    """Why traced client ``name`` cannot run under ``rt``, or None."""
+    if name is None or rt.family not in TRACED_CLIENTS[name].families:
+        return f"no client with trace hooks runs under {rt.name}"
+    if importlib.util.find_spec(name) is None:
+        return f"needs {name}"
+    return None
+
+
+class LifecycleWorkload(Workload):
+    """Where a request's time goes: pool wait, DNS, connect, TLS, first byte, body.
+
+    Every iteration sends ``--requests`` GETs to ``--url``, ``--concurrency``
+    at a time, once per combination of ``--pool-sizes`` and ``--keepalive``,
+    each with a new client, and times the phases of every request through
+    the client's trace hooks (aiohttp's TraceConfig, httpcore's ``trace``
+    extension). Reused connections skip the setup phases, so the counts of
+    connections opened and reused show how well each setting amortizes the
+    handshake.
+
+    The phases are:
+
+    * ``pool_wait``: from the call to a connection being picked or started;
+    * ``dns``: host resolution (aiohttp only; httpx resolves inside connect,
+      and aiohttp's DNS cache skips it after the first lookup);
+    * ``connect``: the TCP connect (aiohttp: including the TLS handshake,
+      which asyncio performs inside create_connection);
+    * ``tls``: the TLS handshake (httpx only, see above);
+    * ``send``: writing the request;
+    * ``first_byte``: from the request sent to the response headers;
+    * ``body``: reading the response body.
+
+    ``python -m bench serve --tls --port 8443`` provides an HTTPS target
+    with a self-signed certificate, which ``--ca`` points at.
+    ``--keepalive 0`` closes every connection after its request; aiohttp
+    cannot cap the number of idle connections, so any other value keeps
+    all of them.
+    """
+
+    name = "lifecycle"
+    label = "requests"
+    iterations = 3
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--url", default="https://localhost:8443/",
+                            help="target; start one with python -m bench serve --tls --port 8443")
+        parser.add_argument("--ca", default=os.path.join("bench_tls", "cert.pem"),
+                            help="certificate the client trusts for https URLs")
+        parser.add_argument("--client", default=None, choices=sorted(TRACED_CLIENTS),
+                            help="traced HTTP client (default: aiohttp on asyncio loops, "
+                                 "httpx on trio)")
+        parser.add_argument("--requests", type=int, default=500,
+                            help="requests per pool setting")
+        parser.add_argument("--concurrency", type=int, default=10,
+                            help="requests in flight at once")
+        parser.add_argument("--pool-sizes", type=parse_counts, default=[1, 10, 100],
+                            help="comma-separated connection pool sizes (default: 1,10,100)")
+        parser.add_argument("--keepalive", type=parse_limits, default=[0, 20],
+                            help="comma-separated idle keep-alive connection limits; 0 closes "
+                                 "each connection after its request (default: 0,20)")
+        parser.add_argument("--timeout", type=float, default=10.0)
+
+    def setup(self):
+        self.ssl_context = client_ssl_context(self.args.url, self.args.ca)
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.requests = args.requests // count + (index < args.requests % count)
+        args.concurrency = max(1, args.concurrency // count)
+
+    def client_for(self, rt):
+        return traced_client_for(self.args.client, rt)
+
+    def unsupported(self, rt):
+        return traced_unsupported(self.client_for(rt), rt)
+
+    def merge_samples(self, samples):
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            phases = {name: merged(p["phases"][name] for p in group) for name in PHASES}
+            counts = {key: sum(p[key] for p in group)
+                      for key in ("requests", "errors", "opened", "reused")}
+            points.append(self._point(group[0]["pool"], group[0]["keepalive"],
+                                      max(p["seconds"] for p in group), counts, phases))
+        return self._sample(points)
+
+    @staticmethod
+    def _point(pool, keepalive, seconds, counts, phases):
+        return {
+            "pool": pool,
+            "keepalive": keepalive,
+            "seconds": seconds,
+            **counts,
+            "throughput": counts["requests"] / seconds if seconds else 0.0,
+            "phases": phases,
+        }
+
+    @staticmethod
+    def _sample(points):
+        seconds = sum(p["seconds"] for p in points)
+        requests = sum(p["requests"] for p in points)
+        return {
+            "seconds": seconds,
+            "requests": requests,
+            "throughput": requests / seconds if seconds else 0.0,
+            "histogram": merged(p["phases"]["total"] for p in points),
+            "points": points,
+        }
+
+    async def _measure(self, rt, pool, keepalive):
+        args = self.args
+        phases = {name: Histogram() for name in PHASES}
+        counts = dict.fromkeys(("requests", "errors", "opened", "reused"), 0)
+        limiter = rt.limiter(args.concurrency)
+        cls = TRACED_CLIENTS[self.client_for(rt)]
+
+        async def one(client):
+            async with limiter:
+                # Waiting for --concurrency is the load shape, not pool wait.
+                timeline = Timeline()
+                try:
+                    status, _ = await client.fetch(args.url, timeline)
+                except Exception:
+                    counts["errors"] += 1
+                    return
+            if status != 200:
+                counts["errors"] += 1
+                return
+            counts["requests"] += 1
+            counts["opened" if timeline.opened else "reused"] += 1
+            for name, seconds in timeline.phases().items():
+                phases[name].record(seconds)
+
+        start = time.perf_counter()
+        async with cls(pool, keepalive=keepalive, ssl_context=self.ssl_context,
+                       timeout=args.timeout) as client:
+            async with rt.open_group() as g:
+                for _ in range(args.requests):
+                    await g.spawn(one, client)
+        return self._point(pool, keepalive, time.perf_counter() - start, counts, phases)
+
+    async def iteration(self, rt, state):
+        points = []
+        for pool in self.args.pool_sizes:
+            for keepalive in self.args.keepalive:
+                points.append(await self._measure(rt, pool, keepalive))
+        return self._sample(points)
+
+    @staticmethod
+    def _describe(point):
+        medians = ", ".join(f"{name} {hist.value_at_percentile(50) * 1000:.3f}ms"
+                            for name, hist in point["phases"].items()
+                            if name != "total" and hist.count)
+        return (f"pool {point['pool']:>4} keep-alive {point['keepalive']:>4}: "
+                f"{point['throughput']:.0f} req/s, {point['opened']} opened/"
+                f"{point['reused']} reused, {point['errors']} errors; p50 {medians}")
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {sample['requests']} {self.label} ({self.client_for(rt)}) "
+                 f"in {sample['seconds']:.9f} seconds"]
+        lines += ["  " + self._describe(p) for p in sample["points"]]
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        """Per pool setting: throughput, connection setup cost per request and phase p50s."""
+        by_point = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_point.setdefault((p["pool"], p["keepalive"]), []).append(p)
+        shown = ("pool_wait", "connect", "tls", "first_byte", "body")
+        lines = [f"{'pool':>5}{'keep':>5}{'req/s':>8}{'opened':>8}{'setup/req':>11}"
+                 + "".join(f"{name:>11}" for name in shown) + f"{'p99 total':>11}"
+                 + "  (ms)"]
+        for (pool, keepalive), points in by_point.items():
+            phases = {name: merged(p["phases"][name] for p in points) for name in PHASES}
+            requests = sum(p["requests"] for p in points) or 1
+            # Handshake time spread over every request, reused ones included.
+            setup = sum(phases[name].mean * phases[name].count
+                        for name in SETUP_PHASES if phases[name].count) / requests
+
+            def p50(name):
+                hist = phases[name]
+                return f"{hist.value_at_percentile(50) * 1000:.3f}" if hist.count else "-"
+
+            p99 = phases["total"].value_at_percentile(99)
+            lines.append(f"{pool:>5}{keepalive:>5}"
+                         f"{statistics.median(p['throughput'] for p in points):>8.0f}"
+                         f"{statistics.median(p['opened'] for p in points):>8.0f}"
+                         f"{setup * 1000:>11.3f}" + "".join(f"{p50(name):>11}" for name in shown)
+                         + f"{'-' if p99 is None else f'{p99 * 1000:.3f}':>11}")
+        return "\n".join(lines)
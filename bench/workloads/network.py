@@ -0,0 +1,161 @@
+import contextlib
+import time
+
+from bench import arrivals, clients
+from bench.histogram import Histogram
+from bench.workloads.base import Workload
+
+
+class NetworkWorkload(Workload):
+    """Requests to network_bench/server.py, closed-loop or at an open-loop rate.
+
+    Closed loop (default) issues ``--requests`` through a limiter of
+    ``--concurrency`` slots; ``--concurrency 0`` spawns every request at
+    once, which is what the old network_program_100 scripts did.
+
+    Open loop (``--rate``) sends requests on an arrival schedule that does
+    not wait for the server, and measures latency from the intended send
+    time, so a slow server shows up as latency instead of as less load.
+    """
+
+    name = "network"
+    label = "requests"
+    iterations = 1
+    additive = ("issued", "requests", "offered_rate", "sent_rate")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/test")
+        parser.add_argument("--requests", type=int, default=5000,
+                            help="requests issued per closed-loop iteration")
+        parser.add_argument("--concurrency", type=int, default=100,
+                            help="maximum requests in flight (0 = unlimited)")
+        parser.add_argument("--client", default="httpx", choices=sorted(clients.CLIENTS),
+                            help="'native' speaks HTTP/1.1 over the runtime's own streams, "
+                                 "'anyio' the same over anyio streams")
+        parser.add_argument("--pipeline", type=int, default=1,
+                            help="requests pipelined per keep-alive connection "
+                                 "(native and anyio clients)")
+        parser.add_argument("--expected-interval", type=float, default=None,
+                            help="seconds between requests of one in-flight slot, used for "
+                                 "coordinated-omission correction (default: mean latency)")
+
+        group = parser.add_argument_group("open loop")
+        group.add_argument("--rate", type=float, default=None,
+                           help="offered requests per second; switches to open-loop mode")
+        group.add_argument("--arrival", choices=arrivals.ARRIVALS, default="fixed")
+        group.add_argument("--duration", type=float, default=10.0,
+                           help="seconds of scheduled arrivals per iteration")
+        group.add_argument("--ramp-to", type=float, default=None,
+                           help="final rate of a ramp schedule")
+        group.add_argument("--seed", type=int, default=None, help="seed for poisson arrivals")
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.requests = args.requests // count + (index < args.requests % count)
+        if args.concurrency > 0:
+            args.concurrency = max(1, args.concurrency // count)
+        if args.rate is not None:
+            args.rate /= count
+            if args.ramp_to is not None:
+                args.ramp_to /= count
+            if args.seed is not None:
+                args.seed += index
+
+    @property
+    def open_loop(self):
+        return self.args.rate is not None
+
+    def unsupported(self, rt):
+        if self.args.client not in clients.compatible(rt):
+            return f"client {self.args.client} is unavailable under {rt.name}"
+        return None
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        options = {}
+        if self.args.client in ("native", "anyio"):
+            options = {"max_connections": self.args.concurrency or 100,
+                       "pipeline": self.args.pipeline}
+        async with clients.open_client(self.args.client, rt, **options) as client:
+            yield client
+
+    async def fetch(self, rt, client, limiter, hist, intended=None):
+        async with limiter if limiter is not None else contextlib.nullcontext():
+            start = time.perf_counter() if intended is None else intended
+            try:
+                status = await client.get(self.args.url)
+            except Exception:
+                return
+            # Injected or real server errors must not count as served load.
+            if status < 400:
+                hist.record(time.perf_counter() - start)
+
+    async def iteration(self, rt, client):
+        if self.open_loop:
+            return await self._open_loop(rt, client)
+
+        hist = Histogram()
+        limiter = rt.limiter(self.args.concurrency) if self.args.concurrency > 0 else None
+        start = time.perf_counter()
+
+        async with rt.open_group() as g:
+            for _ in range(self.args.requests):
+                await g.spawn(self.fetch, rt, client, limiter, hist)
+
+        seconds = time.perf_counter() - start
+        return {
+            "seconds": seconds,
+            "issued": self.args.requests,
+            "requests": hist.count,
+            "throughput": hist.count / seconds,
+            "histogram": hist,
+        }
+
+    async def _open_loop(self, rt, client):
+        hist = Histogram()
+        limiter = rt.limiter(self.args.concurrency) if self.args.concurrency > 0 else None
+        offsets = arrivals.schedule(self.args.arrival, self.args.rate, self.args.duration,
+                                    self.args.ramp_to, self.args.seed)
+        issued = 0
+        start = time.perf_counter()
+
+        async with rt.open_group() as g:
+            # Sleep until the next arrival is due, then release every
+            # request whose intended time has passed: at high rates one
+            # wakeup serves a batch instead of one sleep per request.
+            pending = next(offsets, None)
+            while pending is not None:
+                delay = start + pending - time.perf_counter()
+                if delay > 0:
+                    await rt.sleep(delay)
+                now = time.perf_counter()
+                while pending is not None and start + pending <= now:
+                    await g.spawn(self.fetch, rt, client, limiter, hist, start + pending)
+                    issued += 1
+                    pending = next(offsets, None)
+            sent = time.perf_counter() - start
+
+        seconds = time.perf_counter() - start
+        return {
+            "seconds": seconds,
+            "issued": issued,
+            "requests": hist.count,
+            "offered_rate": issued / self.args.duration,
+            "sent_rate": issued / sent if sent else None,
+            "throughput": hist.count / seconds,
+            "histogram": hist,
+        }
+
+    def expected_interval(self, hist):
+        # Open-loop latencies already start at the intended send time.
+        if self.open_loop:
+            return None
+        return self.args.expected_interval or hist.mean
+
+    def format_sample(self, rt, sample):
+        line = (f"{rt.name}: {sample['requests']}/{sample['issued']} {self.label} "
+                f"in {sample['seconds']:.9f} seconds ({sample['throughput']:.2f} req/s")
+        if self.open_loop:
+            line += f" achieved, {sample['offered_rate']:.2f} req/s offered"
+        return line + ")"
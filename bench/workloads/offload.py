@@ -0,0 +1,177 @@
+import argparse
+import concurrent.futures
+import statistics
+import time
+
+from bench.histogram import Histogram, merged
+from bench.workloads.io import IOWorkload, read_mode
+
+BACKENDS = ("wrapper", "thread", "process")
+
+
+def _pool_sizes(value):
+    try:
+        sizes = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        sizes = []
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError(f"expected comma-separated positive integers, got {value!r}")
+    return sizes
+
+
+# Jobs run inside the pool worker and return when they started, so the
+# caller can tell queueing from service time. perf_counter is the system
+# monotonic clock on Linux and comparable across processes.
+
+
+def _read_job(path):
+    started = time.perf_counter()
+    with open(path, read_mode(path)) as f:
+        f.read()
+    return started
+
+
+def _write_job(path, data):
+    started = time.perf_counter()
+    with open(path, "w") as f:
+        f.write(data)
+    return started
+
+
+def _noop():
+    return None
+
+
+class OffloadWorkload(IOWorkload):
+    """The io workload's read and write phases over a range of worker-pool sizes.
+
+    aiofiles, trio.open_file and curio.aopen all hand each call to a worker
+    thread, so the pool size decides how many of the concurrent file
+    operations actually run. Every iteration repeats both phases once per
+    ``--pool-sizes`` entry and reports throughput and, for the ``thread``
+    and ``process`` backends, how long each job queued before a worker
+    picked it up.
+
+    Backends:
+
+    * ``wrapper``: the io workload's own file path (``rt.open_file``, or
+      the ``--file-backend`` in use) with the default thread pool
+      resized; throughput only.
+    * ``thread``: one job per file (open, read or write, close) in that
+      same pool, so queueing is measurable.
+    * ``process``: the same jobs in a ``ProcessPoolExecutor`` of each size,
+      started before the phase is timed.
+    """
+
+    name = "offload"
+    label = "file jobs"
+    iterations = 5
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--pool-sizes", type=_pool_sizes, default=[1, 2, 4, 8, 16, 32, 64, 128],
+                            help="comma-separated worker counts to sweep (default: 1,2,4,...,128)")
+        parser.add_argument("--backend", choices=BACKENDS, default="thread",
+                            help="how file operations reach a worker (default: thread)")
+
+    def merge_samples(self, samples):
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            seconds = max(p["seconds"] for p in group)
+            jobs = sum(p["jobs"] for p in group)
+            queue = merged(p["queue"] for p in group if p["queue"] is not None)
+            points.append(self._point(group[0]["pool_size"], seconds, jobs, queue))
+        return {"seconds": max(s["seconds"] for s in samples), "points": points}
+
+    @staticmethod
+    def _point(size, seconds, jobs, queue):
+        return {
+            "pool_size": size,
+            "seconds": seconds,
+            "jobs": jobs,
+            "throughput": jobs / seconds if seconds else 0.0,
+            "queue": queue,
+        }
+
+    async def _job(self, submit, hist, fn, *args):
+        submitted = time.perf_counter()
+        started = await submit(fn, *args)
+        hist.record(started - submitted)
+
+    async def _phases(self, rt, submit, hist):
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self._job, submit, hist, _read_job, p)
+
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self._job, submit, hist, _write_job, p + "_out", self.args.data)
+
+    async def _measure_point(self, rt, open_file, size):
+        backend = self.args.backend
+        if backend == "process":
+            with concurrent.futures.ProcessPoolExecutor(size) as pool:
+                # Fork every worker up front; startup is not part of the phase.
+                for f in [pool.submit(_noop) for _ in range(size)]:
+                    f.result()
+
+                def submit(fn, *args):
+                    return rt.run_in_executor(pool, fn, *args)
+
+                hist = Histogram()
+                start = time.perf_counter()
+                await self._phases(rt, submit, hist)
+                seconds = time.perf_counter() - start
+            return self._point(size, seconds, 2 * len(self.paths), hist)
+
+        await rt.set_thread_limit(size)
+        if backend == "wrapper":
+            start = time.perf_counter()
+            await super().iteration(rt, open_file)
+            return self._point(size, time.perf_counter() - start, 2 * len(self.paths), None)
+
+        hist = Histogram()
+        start = time.perf_counter()
+        await self._phases(rt, rt.run_in_thread, hist)
+        return self._point(size, time.perf_counter() - start, 2 * len(self.paths), hist)
+
+    async def iteration(self, rt, open_file):
+        points = [await self._measure_point(rt, open_file, size) for size in self.args.pool_sizes]
+        return {"seconds": sum(p["seconds"] for p in points), "points": points}
+
+    @staticmethod
+    def _describe(point):
+        line = (f"pool {point['pool_size']:>4}: {point['seconds']:.6f} s, "
+                f"{point['throughput']:.0f} jobs/s")
+        queue = point["queue"]
+        if queue is not None and queue.count:
+            line += (f", queued p50={queue.value_at_percentile(50) * 1000:.3f}ms "
+                     f"p99={queue.value_at_percentile(99) * 1000:.3f}ms")
+        return line
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {self.args.backend} backend, {len(self.paths)} files "
+                 f"in {sample['seconds']:.9f} seconds"]
+        lines += ["  " + self._describe(p) for p in sample["points"]]
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        by_size = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_size.setdefault(p["pool_size"], []).append(p)
+        lines = [f"{'pool':>6}{'median jobs/s':>16}{'queue p50 ms':>15}{'queue p99 ms':>15}"]
+        best, best_rate = None, -1.0
+        for size, points in by_size.items():
+            rate = statistics.median(p["throughput"] for p in points)
+            queue = merged(p["queue"] for p in points if p["queue"] is not None)
+            p50 = p99 = "-"
+            if queue is not None and queue.count:
+                p50 = f"{queue.value_at_percentile(50) * 1000:.3f}"
+                p99 = f"{queue.value_at_percentile(99) * 1000:.3f}"
+            lines.append(f"{size:>6}{rate:>16.0f}{p50:>15}{p99:>15}")
+            if rate > best_rate:
+                best, best_rate = size, rate
+        lines.append(f"best pool size: {best} ({best_rate:.0f} jobs/s)")
+        return "\n".join(lines)
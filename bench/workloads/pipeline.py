@@ -0,0 +1,226 @@
+import hashlib
+import os
+import time
+import zlib
+
+from bench.histogram import Histogram
+from bench.workloads.base import Workload
+from bench.workloads.io import list_files
+
+TRANSFORMS = ("none", "sha256", "zlib")
+QUEUES = ("read", "write")
+
+
+def _transform(name, data, level):
+    """The transform stage's work on one file; returns the bytes to write."""
+    if name == "sha256":
+        # Checksummed pass-through, as an ETL job would verify records.
+        return data + hashlib.sha256(data).digest()
+    if name == "zlib":
+        return zlib.compress(data, level)
+    return data
+
+
+class _DepthSampler:
+    """Time-sampled queue depths: mean and max per queue over an iteration."""
+
+    def __init__(self, queues):
+        self._queues = queues
+        self._totals = dict.fromkeys(queues, 0)
+        self._max = dict.fromkeys(queues, 0)
+        self._samples = 0
+        self.done = False
+
+    def sample(self):
+        for name, q in self._queues.items():
+            depth = q.qsize()
+            self._totals[name] += depth
+            self._max[name] = max(self._max[name], depth)
+        self._samples += 1
+
+    async def run(self, rt, interval):
+        while not self.done:
+            self.sample()
+            await rt.sleep(interval)
+
+    def result(self):
+        n = self._samples or 1
+        return {name: {"mean": self._totals[name] / n, "max": self._max[name]}
+                for name in self._queues}
+
+
+class PipelineWorkload(Workload):
+    """Streaming read -> transform -> write over bounded queues.
+
+    Unlike the io workload's read phase followed by its write phase, the
+    three stages here run at once: ``--readers`` tasks read the files of
+    ``--dir`` into a queue of ``--queue-size`` items, ``--transformers``
+    tasks hash or compress them into a second queue, and ``--writers``
+    tasks write the results to ``--out-dir``. A full queue blocks the stage
+    feeding it, so the slowest stage sets the pace. Queues are the
+    runtime's own: asyncio.Queue, a trio memory channel or curio.Queue.
+
+    The transform runs on the loop by default, like CPU work inside a real
+    handler; ``--transform-in thread`` moves it to the worker-thread pool.
+    The histogram holds each file's latency from the start of its read to
+    the end of its write, and the sample the mean and max depth of each
+    queue, sampled every ``--sample-interval`` seconds.
+    """
+
+    name = "pipeline"
+    label = "files piped"
+    iterations = 10
+    requires = {"asyncio": ("aiofiles",)}
+    additive = ("files", "bytes_in", "bytes_out")
+    counted = "files"
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--dir", default="test_files",
+                            help="directory produced by io_bench/dummy_file_generator.py")
+        parser.add_argument("--out-dir", default="pipeline_out",
+                            help="directory the write stage writes to")
+        parser.add_argument("--transform", choices=TRANSFORMS, default="sha256")
+        parser.add_argument("--level", type=int, default=6, help="zlib compression level")
+        parser.add_argument("--transform-in", choices=("loop", "thread"), default="loop",
+                            help="run the transform on the loop or in the worker-thread pool")
+        parser.add_argument("--readers", type=int, default=8, help="read stage concurrency")
+        parser.add_argument("--transformers", type=int, default=4,
+                            help="transform stage concurrency")
+        parser.add_argument("--writers", type=int, default=8, help="write stage concurrency")
+        parser.add_argument("--queue-size", type=int, default=16,
+                            help="capacity of each queue between stages")
+        parser.add_argument("--sample-interval", type=float, default=0.001,
+                            help="queue depth sampling period in seconds")
+
+    def setup(self):
+        args = self.args
+        if not os.path.isdir(args.dir):
+            raise SystemExit(f"Error: Directory '{args.dir}' not found. "
+                             "Run io_bench/dummy_file_generator.py first.")
+        if min(args.readers, args.transformers, args.writers, args.queue_size) < 1:
+            raise SystemExit("Error: stage concurrency and --queue-size must be at least 1")
+        self.paths = list_files(args.dir)
+        self.prefix = ""
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    def for_worker(self, index, count):
+        self.paths = self.paths[index::count]
+        self.prefix = f"w{index}_"
+
+    def teardown(self):
+        """Removes the files the iterations wrote, here or in worker processes.
+
+        Only those exact names are touched: ``--out-dir`` may hold other files.
+        """
+        args = self.args
+        out_dir = args.out_dir
+        processes = getattr(args, "processes", 1)
+        # Worker ``index`` numbers its share of the files from 0.
+        outputs = [("", len(self.paths))] + [
+            (f"w{index}_", len(self.paths[index::processes])) for index in range(processes)]
+        for prefix, count in outputs:
+            for i in range(count):
+                path = os.path.join(out_dir, f"{prefix}{i}.out")
+                if os.path.exists(path):
+                    os.remove(path)
+        if not os.listdir(out_dir):
+            os.rmdir(out_dir)
+
+    async def iteration(self, rt, state):
+        args = self.args
+        read_q = rt.queue(args.queue_size)
+        write_q = rt.queue(args.queue_size)
+        sampler = _DepthSampler({"read": read_q, "write": write_q})
+        hist = Histogram()
+        totals = {"in": 0, "out": 0}
+        paths = iter(enumerate(self.paths))
+
+        async def reader():
+            for i, path in paths:
+                started = time.perf_counter()
+                async with rt.open_file(path, "rb") as f:
+                    data = await f.read()
+                totals["in"] += len(data)
+                await read_q.put((i, started, data))
+
+        async def transformer():
+            while (item := await read_q.get()) is not None:
+                i, started, data = item
+                if args.transform_in == "thread":
+                    data = await rt.run_in_thread(_transform, args.transform, data, args.level)
+                else:
+                    data = _transform(args.transform, data, args.level)
+                await write_q.put((i, started, data))
+
+        async def writer():
+            while (item := await write_q.get()) is not None:
+                i, started, data = item
+                path = os.path.join(args.out_dir, f"{self.prefix}{i}.out")
+                async with rt.open_file(path, "wb") as f:
+                    await f.write(data)
+                totals["out"] += len(data)
+                hist.record(time.perf_counter() - started)
+
+        async def stage(worker, count, downstream, consumers):
+            # Once every worker of a stage is done, one None per consumer
+            # of the next stage tells it to stop.
+            async with rt.open_group() as g:
+                for _ in range(count):
+                    await g.spawn(worker)
+            if downstream is not None:
+                for _ in range(consumers):
+                    await downstream.put(None)
+            else:
+                # The sampler may still be asleep; the clock stops here.
+                totals["end"] = time.perf_counter()
+                sampler.done = True
+
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            await g.spawn(sampler.run, rt, args.sample_interval)
+            await g.spawn(stage, reader, args.readers, read_q, args.transformers)
+            await g.spawn(stage, transformer, args.transformers, write_q, args.writers)
+            await g.spawn(stage, writer, args.writers, None, 0)
+        seconds = totals["end"] - start
+
+        return {
+            "seconds": seconds,
+            "files": hist.count,
+            "bytes_in": totals["in"],
+            "bytes_out": totals["out"],
+            "throughput": hist.count / seconds if seconds else 0.0,
+            "histogram": hist,
+            "queues": sampler.result(),
+        }
+
+    def merge_samples(self, samples):
+        out = super().merge_samples(samples)
+        out["queues"] = {
+            name: {"mean": sum(s["queues"][name]["mean"] for s in samples) / len(samples),
+                   "max": max(s["queues"][name]["max"] for s in samples)}
+            for name in QUEUES
+        }
+        return out
+
+    def format_sample(self, rt, sample):
+        depths = ", ".join(f"{name} queue {q['mean']:.1f} avg / {q['max']} max"
+                           for name, q in sample["queues"].items())
+        return (f"{rt.name}: {sample['files']} {self.label} ({self.args.transform}) "
+                f"in {sample['seconds']:.9f} seconds ({sample['throughput']:.0f} files/s, "
+                f"{sample['bytes_in'] / 1e6 / (sample['seconds'] or float('nan')):.2f} MB/s in; "
+                f"{depths})")
+
+    def format_summary(self, samples):
+        """The stage that held the pipeline back, judged by where items piled up."""
+        depth = {name: sum(s["queues"][name]["mean"] for s in samples) / len(samples)
+                 for name in QUEUES}
+        size = self.args.queue_size
+        if depth["write"] >= 0.5 * size:
+            bottleneck = "write"
+        elif depth["read"] >= 0.5 * size:
+            bottleneck = "transform"
+        else:
+            bottleneck = "read"
+        return (f"queues: read {depth['read']:.1f}/{size}, write {depth['write']:.1f}/{size} "
+                f"on average; bottleneck: {bottleneck} stage")
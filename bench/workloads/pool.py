@@ -0,0 +1,262 @@
+import argparse
+import collections
+import importlib.util
+import itertools
+import os
+import statistics
+import time
+
+from bench.histogram import Histogram, merged
+from bench.workloads.base import Workload
+from bench.workloads.lifecycle import (TRACED_CLIENTS, Timeline, client_ssl_context,
+                                       parse_limits, traced_client_for, traced_unsupported)
+from bench.workloads.sched import comma_list, parse_counts
+
+HTTP_VERSIONS = ("1.1", "2")
+
+
+def parse_expiries(value):
+    expiries = comma_list(float)(value)
+    if min(expiries) < 0:
+        raise argparse.ArgumentTypeError(f"expected expiries of 0 or more, got {value!r}")
+    return expiries
+
+
+class PoolWorkload(Workload):
+    """Connection-pool tuning sweep for aiohttp's TCPConnector and httpx.Limits.
+
+    Every iteration runs the same fan-out load once per combination of
+    ``--pool-sizes`` (TCPConnector ``limit`` / ``max_connections``),
+    ``--per-host`` limits (``limit_per_host``, 0 = none), ``--keepalive-
+    expiry`` seconds (``keepalive_timeout`` / ``keepalive_expiry``) and
+    ``--http`` versions, each with a new client. The load is ``--bursts``
+    bursts of ``--requests`` GETs, ``--concurrency`` in flight, spread
+    round-robin over ``--urls``; bursts are ``--gap`` seconds apart, so
+    idle connections outlive a short expiry or not. Only the bursts are
+    timed.
+
+    Per setting it reports throughput, p99 latency, sockets opened and the
+    time requests waited for a pooled connection, all taken from the same
+    trace hooks as the lifecycle workload, plus the protocol the server
+    actually negotiated. The wait ends once a connection is handed over
+    or a new one starts connecting, so neither client's figure includes
+    connect or TLS time and the two can be compared.
+
+    httpx has no per-host limit, so those settings are left out for it.
+    ``--http 2`` runs on httpx with the h2 package (the default client
+    then, since aiohttp only speaks HTTP/1.1) against https URLs whose
+    server offers h2 through ALPN, such as ``python -m bench serve --tls
+    --http2``. It is never quietly dropped or downgraded: without h2 or
+    https the run stops before it starts, and a target that answers an
+    HTTP/2 setting over HTTP/1.1 fails the iteration.
+    """
+
+    name = "pool"
+    label = "requests"
+    iterations = 3
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--urls", type=comma_list(str), default=["http://127.0.0.1:8000/"],
+                            help="comma-separated targets, requested round-robin; give several "
+                                 "hosts for --per-host to matter")
+        parser.add_argument("--ca", default=os.path.join("bench_tls", "cert.pem"),
+                            help="certificate the client trusts for https URLs")
+        parser.add_argument("--client", default=None, choices=sorted(TRACED_CLIENTS),
+                            help="HTTP client (default: aiohttp on asyncio loops, httpx on trio)")
+        parser.add_argument("--requests", type=int, default=1000, help="requests per burst")
+        parser.add_argument("--concurrency", type=int, default=100,
+                            help="requests in flight at once")
+        parser.add_argument("--bursts", type=int, default=3, help="bursts per setting")
+        parser.add_argument("--gap", type=float, default=0.2,
+                            help="untimed idle seconds between bursts")
+        parser.add_argument("--pool-sizes", type=parse_counts, default=[10, 100],
+                            help="comma-separated total connection limits (default: 10,100)")
+        parser.add_argument("--per-host", type=parse_limits, default=[0],
+                            help="comma-separated per-host connection limits, 0 = none")
+        parser.add_argument("--keepalive-expiry", type=parse_expiries, default=[0.1, 5.0],
+                            help="comma-separated seconds an idle connection is kept "
+                                 "(default: 0.1,5)")
+        parser.add_argument("--http", type=comma_list(str, HTTP_VERSIONS), default=["1.1"],
+                            help="comma-separated HTTP versions to offer: 1.1, 2")
+        parser.add_argument("--timeout", type=float, default=10.0)
+
+    def setup(self):
+        args = self.args
+        if "2" in args.http:
+            if args.client not in (None, "httpx"):
+                raise SystemExit(f"Error: --http 2 needs --client httpx; {args.client} only "
+                                 "speaks HTTP/1.1")
+            if importlib.util.find_spec("h2") is None:
+                raise SystemExit("Error: --http 2 needs the h2 package (pip install h2)")
+            if not all(url.startswith("https:") for url in args.urls):
+                raise SystemExit("Error: HTTP/2 is negotiated through TLS ALPN; --http 2 needs "
+                                 "https --urls (python -m bench serve --tls --http2)")
+            args.client = "httpx"
+        https = [url for url in self.args.urls if url.startswith("https:")]
+        self.ssl_context = client_ssl_context(https[0], self.args.ca) if https else None
+
+    def for_worker(self, index, count):
+        args = self.args
+        args.requests = args.requests // count + (index < args.requests % count)
+        args.concurrency = max(1, args.concurrency // count)
+
+    def client_for(self, rt):
+        return traced_client_for(self.args.client, rt)
+
+    def settings(self, rt):
+        """(pool, per_host, expiry, http) combinations the client can express."""
+        client = self.client_for(rt)
+        args = self.args
+        out = []
+        for pool, per_host, expiry, http in itertools.product(
+                args.pool_sizes, args.per_host, args.keepalive_expiry, args.http):
+            if client == "httpx" and per_host:
+                continue
+            out.append((pool, per_host, expiry, http))
+        return out
+
+    def unsupported(self, rt):
+        reason = traced_unsupported(self.client_for(rt), rt)
+        if reason is None and not self.settings(rt):
+            reason = (f"{self.client_for(rt)} can express none of the requested settings "
+                      "(per-host limits need aiohttp)")
+        return reason
+
+    def merge_samples(self, samples):
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            first = group[0]
+            counts = {key: sum(p[key] for p in group) for key in ("requests", "errors", "opened")}
+            protocols = collections.Counter()
+            for p in group:
+                protocols.update(p["protocols"])
+            points.append(self._point(
+                (first["pool"], first["per_host"], first["expiry"], first["http"]),
+                max(p["seconds"] for p in group), counts, dict(protocols),
+                merged(p["histogram"] for p in group), merged(p["pool_wait"] for p in group)))
+        return self._sample(points)
+
+    @staticmethod
+    def _point(setting, seconds, counts, protocols, hist, pool_wait):
+        pool, per_host, expiry, http = setting
+        return {
+            "pool": pool,
+            "per_host": per_host,
+            "expiry": expiry,
+            "http": http,
+            "seconds": seconds,
+            **counts,
+            "throughput": counts["requests"] / seconds if seconds else 0.0,
+            "protocols": protocols,
+            "histogram": hist,
+            "pool_wait": pool_wait,
+        }
+
+    @staticmethod
+    def _sample(points):
+        seconds = sum(p["seconds"] for p in points)
+        requests = sum(p["requests"] for p in points)
+        return {
+            "seconds": seconds,
+            "requests": requests,
+            "throughput": requests / seconds if seconds else 0.0,
+            "histogram": merged(p["histogram"] for p in points),
+            "points": points,
+        }
+
+    async def _measure(self, rt, setting):
+        args = self.args
+        pool, per_host, expiry, http = setting
+        hist, pool_wait = Histogram(), Histogram()
+        counts = dict.fromkeys(("requests", "errors", "opened"), 0)
+        protocols = collections.Counter()
+        limiter = rt.limiter(args.concurrency)
+
+        async def one(client, url):
+            async with limiter:
+                timeline = Timeline()
+                try:
+                    status, protocol = await client.fetch(url, timeline)
+                except Exception:
+                    counts["errors"] += 1
+                    return
+            if timeline.opened:
+                counts["opened"] += 1
+            if status != 200:
+                counts["errors"] += 1
+                return
+            counts["requests"] += 1
+            protocols[protocol] += 1
+            phases = timeline.phases()
+            hist.record(phases["total"])
+            pool_wait.record(phases.get("pool_wait", 0.0))
+
+        seconds = 0.0
+        client = TRACED_CLIENTS[self.client_for(rt)](
+            pool, per_host=per_host, keepalive_expiry=expiry, http2=http == "2",
+            ssl_context=self.ssl_context, timeout=args.timeout)
+        async with client:
+            urls = itertools.cycle(args.urls)
+            for burst in range(args.bursts):
+                if burst:
+                    await rt.sleep(args.gap)
+                start = time.perf_counter()
+                async with rt.open_group() as g:
+                    for _ in range(args.requests):
+                        await g.spawn(one, client, next(urls))
+                seconds += time.perf_counter() - start
+        downgraded = set(protocols) - {"HTTP/2"} if http == "2" else set()
+        if downgraded:
+            raise RuntimeError(f"HTTP/2 was asked for but {', '.join(sorted(downgraded))} was "
+                               "negotiated; the target must offer h2 through ALPN "
+                               "(python -m bench serve --tls --http2)")
+        return self._point(setting, seconds, counts, dict(protocols), hist, pool_wait)
+
+    async def iteration(self, rt, state):
+        return self._sample([await self._measure(rt, setting) for setting in self.settings(rt)])
+
+    @staticmethod
+    def _setting(point):
+        per_host = point["per_host"] or "-"
+        return (f"pool {point['pool']:>4} per-host {per_host:>4} expiry {point['expiry']:>5g}s "
+                f"HTTP/{point['http']}")
+
+    @staticmethod
+    def _p(hist, percentile):
+        value = hist.value_at_percentile(percentile) if hist.count else None
+        return "-" if value is None else f"{value * 1000:.3f}"
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {sample['requests']} {self.label} ({self.client_for(rt)}) "
+                 f"in {sample['seconds']:.9f} seconds"]
+        for p in sample["points"]:
+            protocols = ", ".join(sorted(p["protocols"])) or "-"
+            lines.append(f"  {self._setting(p)}: {p['throughput']:.0f} req/s, "
+                         f"p99 {self._p(p['histogram'], 99)}ms, {p['opened']} sockets opened, "
+                         f"pool wait p99 {self._p(p['pool_wait'], 99)}ms, "
+                         f"{p['errors']} errors ({protocols})")
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        """Median throughput and merged p99s per setting, best throughput marked."""
+        by_setting = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_setting.setdefault((p["pool"], p["per_host"], p["expiry"], p["http"]),
+                                      []).append(p)
+        rows = []
+        for setting, points in by_setting.items():
+            rows.append((setting, statistics.median(p["throughput"] for p in points),
+                         merged(p["histogram"] for p in points),
+                         statistics.median(p["opened"] for p in points),
+                         merged(p["pool_wait"] for p in points)))
+        best = max(rows, key=lambda row: row[1])[0] if rows else None
+        lines = [f"{'pool':>5}{'host':>5}{'expiry':>8}{'http':>5}{'req/s':>9}{'p99 ms':>10}"
+                 f"{'sockets':>9}{'wait p50':>10}{'wait p99':>10}"]
+        for setting, rate, hist, opened, wait in rows:
+            pool, per_host, expiry, http = setting
+            lines.append(f"{pool:>5}{per_host or '-':>5}{expiry:>8g}{http:>5}{rate:>9.0f}"
+                         f"{self._p(hist, 99):>10}{opened:>9.0f}{self._p(wait, 50):>10}"
+                         f"{self._p(wait, 99):>10}" + ("  <- best" if setting == best else ""))
+        return "\n".join(lines)
@@ -0,0 +1,252 @@
+import contextlib
+import mmap
+import os
+import selectors
+import socket
+import threading
+import time
+
+from bench.workloads.base import Workload
+from bench.workloads.io import list_files, read_mode
+
+MODES = ("read", "read-binary", "readinto", "mmap", "sendfile", "splice")
+
+_PAGE = mmap.PAGESIZE
+_SPLICE_CHUNK = 64 * 1024
+
+
+def _touch(view):
+    """Faults in every page of ``view`` by reading one byte per page."""
+    return sum(view[::_PAGE])
+
+
+def _mmap_job(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if not size:
+            return 0
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                _touch(view)
+        return size
+    finally:
+        os.close(fd)
+
+
+def _sendfile_job(path, out_fd):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out_fd, fd, offset, size - offset)
+            if not sent:
+                break
+            offset += sent
+        return offset
+    finally:
+        os.close(fd)
+
+
+def _splice_job(path, out_fd, pipe):
+    read_end, write_end = pipe
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        offset = 0
+        while offset < size:
+            n = os.splice(fd, write_end, min(_SPLICE_CHUNK, size - offset), offset_src=offset)
+            if not n:
+                break
+            offset += n
+            while n:
+                n -= os.splice(read_end, out_fd, n)
+        return offset
+    finally:
+        os.close(fd)
+
+
+class _SocketSink:
+    """Connected socket pairs whose far ends a thread drains into one scratch buffer."""
+
+    def __init__(self, count, blocking):
+        self.senders = []
+        self._receivers = []
+        for _ in range(count):
+            a, b = socket.socketpair()
+            a.setblocking(blocking)
+            b.setblocking(False)
+            self.senders.append(a)
+            self._receivers.append(b)
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        scratch = bytearray(256 * 1024)
+        with selectors.DefaultSelector() as sel:
+            for r in self._receivers:
+                sel.register(r, selectors.EVENT_READ)
+            sel.register(self._stop_r, selectors.EVENT_READ)
+            while True:
+                for key, _ in sel.select():
+                    if key.fileobj == self._stop_r:
+                        return
+                    try:
+                        key.fileobj.recv_into(scratch)
+                    except BlockingIOError:
+                        pass
+
+    def close(self):
+        os.write(self._stop_w, b"x")
+        self._thread.join()
+        for s in self.senders + self._receivers:
+            s.close()
+        os.close(self._stop_r)
+        os.close(self._stop_w)
+
+
+class ReadPathWorkload(Workload):
+    """Reads every file of a directory through copying and zero-copy paths.
+
+    ``read`` is the io workload's read (text, or bytes for .bin files) and
+    ``read-binary`` always reads bytes, both through the runtime's own
+    file wrapper.
+    ``readinto`` fills a preallocated bytearray from a pool with one slot per
+    ``--concurrency`` through the same wrapper. The remaining modes are one
+    worker-thread job per file: ``mmap`` maps the file and touches every
+    page through a memoryview, ``sendfile`` and ``splice`` move it to
+    ``--sink`` without it ever reaching Python. On the stdlib asyncio
+    loop, ``sendfile`` into a socket uses ``loop.sock_sendfile`` and needs
+    no thread. Each sample carries the iteration's peak RSS and, with the
+    global ``--trace-memory``, the peak of Python allocations.
+    """
+
+    name = "readpath"
+    label = "files read"
+    iterations = 20
+    requires = {"asyncio": ("aiofiles",)}
+    additive = ("bytes", "files", "peak_rss", "allocated_peak")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--dir", default="test_files",
+                            help="directory produced by io_bench/dummy_file_generator.py")
+        parser.add_argument("--mode", choices=MODES, default="read",
+                            help="read path to measure (default: read, the io workload's)")
+        parser.add_argument("--sink", choices=("devnull", "socket"), default="devnull",
+                            help="destination of sendfile/splice (default: devnull)")
+        parser.add_argument("--concurrency", type=int, default=64,
+                            help="files in flight, and readinto buffers in the pool")
+
+    def setup(self):
+        if not os.path.isdir(self.args.dir):
+            raise SystemExit(f"Error: Directory '{self.args.dir}' not found. "
+                             "Run io_bench/dummy_file_generator.py first.")
+        self.paths = list_files(self.args.dir)
+        self.largest = max((os.path.getsize(p) for p in self.paths), default=0)
+
+    def for_worker(self, index, count):
+        self.paths = self.paths[index::count]
+
+    def unsupported(self, rt):
+        mode = self.args.mode
+        if mode == "sendfile" and not hasattr(os, "sendfile"):
+            return "os.sendfile is not available on this platform"
+        if mode == "splice" and not hasattr(os, "splice"):
+            return "os.splice needs Linux and Python 3.10+"
+        if mode in ("read", "read-binary", "readinto"):
+            return super().unsupported(rt)
+        return None
+
+    def _native_sendfile(self, rt):
+        """True when the running loop can sendfile() into a socket by itself."""
+        if self.args.mode != "sendfile" or self.args.sink != "socket" or rt.family != "asyncio":
+            return False
+        import asyncio
+        # uvloop and winloop leave sock_sendfile unimplemented.
+        return isinstance(asyncio.get_running_loop(), asyncio.BaseEventLoop)
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        """Buffers, sinks and pipes, one per concurrency slot, allocated untimed."""
+        slots = self.args.concurrency
+        state = {"slots": list(range(slots)), "native_sendfile": self._native_sendfile(rt)}
+        sink = None
+        pipes = []
+        try:
+            if self.args.mode == "readinto":
+                state["buffers"] = [bytearray(self.largest) for _ in range(slots)]
+            elif self.args.mode in ("sendfile", "splice"):
+                if self.args.sink == "socket":
+                    sink = _SocketSink(slots, blocking=not state["native_sendfile"])
+                    state["sinks"] = sink.senders
+                else:
+                    null = os.open(os.devnull, os.O_WRONLY)
+                    state["sinks"] = [null] * slots
+                if self.args.mode == "splice":
+                    pipes = [os.pipe() for _ in range(slots)]
+                    state["pipes"] = pipes
+            yield state
+        finally:
+            if sink is not None:
+                sink.close()
+            elif "sinks" in state:
+                os.close(state["sinks"][0])
+            for r, w in pipes:
+                os.close(r)
+                os.close(w)
+
+    async def _read(self, rt, path, state, slot):
+        mode = self.args.mode
+        if mode == "read":
+            async with rt.open_file(path, read_mode(path)) as f:
+                return len(await f.read())
+        if mode == "read-binary":
+            async with rt.open_file(path, "rb") as f:
+                return len(await f.read())
+        if mode == "readinto":
+            async with rt.open_file(path, "rb") as f:
+                return await f.readinto(state["buffers"][slot])
+        if mode == "mmap":
+            return await rt.run_in_thread(_mmap_job, path)
+        sink = state["sinks"][slot]
+        if state["native_sendfile"]:
+            import asyncio
+            with open(path, "rb") as f:
+                return await asyncio.get_running_loop().sock_sendfile(sink, f, fallback=False)
+        out_fd = sink.fileno() if isinstance(sink, socket.socket) else sink
+        if mode == "splice":
+            return await rt.run_in_thread(_splice_job, path, out_fd, state["pipes"][slot])
+        return await rt.run_in_thread(_sendfile_job, path, out_fd)
+
+    async def _one(self, rt, path, state, limiter, totals):
+        async with limiter:
+            slot = state["slots"].pop()
+            try:
+                n = await self._read(rt, path, state, slot)
+            finally:
+                state["slots"].append(slot)
+        totals[0] += n
+
+    async def iteration(self, rt, state):
+        limiter = rt.limiter(self.args.concurrency)
+        totals = [0]
+        # The runner adds peak_rss, and allocated_peak with --trace-memory.
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self._one, rt, p, state, limiter, totals)
+        seconds = time.perf_counter() - start
+        return {"seconds": seconds, "bytes": totals[0], "files": len(self.paths)}
+
+    def format_sample(self, rt, sample):
+        line = (f"{rt.name}: {sample['files']} {self.label} ({self.args.mode}) "
+                f"in {sample['seconds']:.9f} seconds "
+                f"({sample['bytes'] / 1e6 / (sample['seconds'] or float('nan')):.2f} MB/s")
+        if sample.get("peak_rss") is not None:
+            line += f", peak RSS {sample['peak_rss'] / 2 ** 20:.1f} MiB"
+        if sample.get("allocated_peak") is not None:
+            line += f", allocated peak {sample['allocated_peak'] / 2 ** 20:.2f} MiB"
+        return line + ")"
@@ -0,0 +1,210 @@
+import argparse
+import statistics
+import time
+
+from bench.workloads.base import Workload
+
+SCENARIOS = ("spawn", "chain", "yield", "limiter", "pingpong", "cancel", "timeout",
+             "timeout-fired")
+
+# Await-chain depth for ``chain``: every operation is one await through
+# this many nested coroutines.
+_CHAIN_DEPTH = 10
+
+
+def comma_list(convert, choices=None):
+    def parse(value):
+        try:
+            items = [convert(v.strip()) for v in value.split(",") if v.strip()]
+        except ValueError:
+            items = []
+        if not items or (choices is not None and not set(items) <= set(choices)):
+            expected = f"a comma-separated subset of {', '.join(choices)}" if choices else \
+                "comma-separated positive integers"
+            raise argparse.ArgumentTypeError(f"expected {expected}, got {value!r}")
+        return items
+    return parse
+
+
+def parse_counts(value):
+    counts = comma_list(lambda v: int(float(v)))(value)
+    if min(counts) < 1:
+        raise argparse.ArgumentTypeError(f"expected positive counts, got {value!r}")
+    return counts
+
+
+async def _noop():
+    pass
+
+
+async def _chain(depth):
+    if depth:
+        await _chain(depth - 1)
+
+
+class SchedWorkload(Workload):
+    """Scheduler microbenchmarks: the runtime's own overhead, no I/O.
+
+    Each iteration runs every ``--scenarios`` entry once per ``--counts``
+    value N and reports operations per second and nanoseconds per
+    operation:
+
+    * ``spawn``: start N no-op tasks in one group and join them
+      (asyncio tasks, a trio nursery or a curio TaskGroup);
+    * ``chain``: N awaits, each through a chain of nested coroutines,
+      with no trip through the scheduler;
+    * ``yield``: N ``sleep(0)`` calls spread over ``--tasks`` tasks, i.e.
+      task switches;
+    * ``limiter``: N acquire/release pairs by ``--tasks`` tasks contending
+      for a limiter of ``--limit`` slots;
+    * ``pingpong``: N round trips of an item between two tasks over two
+      one-slot queues;
+    * ``cancel``: cancelling N sleeping tasks at once; only the time from
+      the cancellation to the group's exit is measured;
+    * ``timeout``: N timeout scopes entered and left without firing;
+    * ``timeout-fired``: N timeout scopes that expire at once.
+    """
+
+    name = "sched"
+    label = "scheduler operations"
+    iterations = 5
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--scenarios", type=comma_list(str, SCENARIOS), default=list(SCENARIOS),
+                            help="comma-separated scenarios to run (default: all)")
+        parser.add_argument("--counts", type=parse_counts, default=[10_000, 100_000],
+                            help="comma-separated operation/task counts, e.g. 1e4,1e5,1e6 "
+                                 "(default: 10000,100000)")
+        parser.add_argument("--tasks", type=int, default=100,
+                            help="tasks sharing the yield and limiter operations")
+        parser.add_argument("--limit", type=int, default=10, help="limiter slots")
+
+    def merge_samples(self, samples):
+        # Each worker runs the whole suite, so operations add up.
+        points = []
+        for group in zip(*(s["points"] for s in samples)):
+            seconds = max(p["seconds"] for p in group)
+            ops = sum(p["ops"] for p in group)
+            points.append(self._point(group[0]["scenario"], group[0]["count"], seconds, ops))
+        return {"seconds": max(s["seconds"] for s in samples), "points": points}
+
+    @staticmethod
+    def _point(scenario, count, seconds, ops):
+        return {
+            "scenario": scenario,
+            "count": count,
+            "seconds": seconds,
+            "ops": ops,
+            "throughput": ops / seconds if seconds else 0.0,
+            "ns_per_op": seconds / ops * 1e9 if ops else None,
+        }
+
+    async def _spawn(self, rt, n):
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            for _ in range(n):
+                await g.spawn(_noop)
+        return time.perf_counter() - start
+
+    async def _chain(self, rt, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            await _chain(_CHAIN_DEPTH)
+        return time.perf_counter() - start
+
+    async def _spread(self, rt, n, body):
+        """Runs ``body(k)`` in ``--tasks`` tasks sharing ``n`` iterations."""
+        tasks = min(self.args.tasks, n)
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            for i in range(tasks):
+                await g.spawn(body, n // tasks + (i < n % tasks))
+        return time.perf_counter() - start
+
+    async def _yield(self, rt, n):
+        async def body(k):
+            for _ in range(k):
+                await rt.sleep(0)
+        return await self._spread(rt, n, body)
+
+    async def _limiter(self, rt, n):
+        limiter = rt.limiter(self.args.limit)
+
+        async def body(k):
+            for _ in range(k):
+                async with limiter:
+                    await rt.sleep(0)
+        return await self._spread(rt, n, body)
+
+    async def _pingpong(self, rt, n):
+        ping, pong = rt.queue(1), rt.queue(1)
+
+        async def echo():
+            while (item := await ping.get()) is not None:
+                await pong.put(item)
+
+        start = time.perf_counter()
+        async with rt.open_group() as g:
+            await g.spawn(echo)
+            for i in range(n):
+                await ping.put(i)
+                await pong.get()
+            await ping.put(None)
+        return time.perf_counter() - start
+
+    async def _cancel(self, rt, n):
+        async with rt.open_group() as g:
+            for _ in range(n):
+                await g.spawn(rt.sleep, 3600)
+            # Let every task reach its sleep before cancelling them all.
+            await rt.sleep(0)
+            start = time.perf_counter()
+            await g.cancel()
+        return time.perf_counter() - start
+
+    async def _timeout(self, rt, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            async with rt.timeout(3600):
+                await rt.sleep(0)
+        return time.perf_counter() - start
+
+    async def _timeout_fired(self, rt, n):
+        start = time.perf_counter()
+        for _ in range(n):
+            try:
+                async with rt.timeout(0):
+                    await rt.sleep(3600)
+            except TimeoutError:
+                pass
+        return time.perf_counter() - start
+
+    async def iteration(self, rt, state):
+        points = []
+        for scenario in self.args.scenarios:
+            measure = getattr(self, "_" + scenario.replace("-", "_"))
+            for n in self.args.counts:
+                points.append(self._point(scenario, n, await measure(rt, n), n))
+        return {"seconds": sum(p["seconds"] for p in points), "points": points}
+
+    @staticmethod
+    def _describe(point):
+        return (f"{point['scenario']:>14} x {point['count']:<8}: {point['seconds']:.6f} s, "
+                f"{point['throughput']:.0f} ops/s, {point['ns_per_op']:.0f} ns/op")
+
+    def format_sample(self, rt, sample):
+        lines = [f"{rt.name}: {self.label} in {sample['seconds']:.9f} seconds"]
+        lines += ["  " + self._describe(p) for p in sample["points"]]
+        return "\n".join(lines)
+
+    def format_summary(self, samples):
+        by_point = {}
+        for sample in samples:
+            for p in sample["points"]:
+                by_point.setdefault((p["scenario"], p["count"]), []).append(p)
+        lines = [f"{'scenario':>14}{'count':>10}{'median ops/s':>15}{'ns/op':>10}"]
+        for (scenario, count), points in by_point.items():
+            rate = statistics.median(p["throughput"] for p in points)
+            lines.append(f"{scenario:>14}{count:>10}{rate:>15.0f}{1e9 / rate if rate else 0:>10.0f}")
+        return "\n".join(lines)
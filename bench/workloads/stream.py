@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import os
+import time
+
+from bench.workloads.base import Workload
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+# Bytes written per syscall while materializing the dataset.
+_FILL_BLOCK = 1024 ** 2
+
+
+def parse_size(value):
+    """Parses ``4096``, ``4K``, ``64KB``, ``1.5M`` or ``10G`` into bytes."""
+    text = value.strip().upper().removesuffix("B").removesuffix("I")
+    number, unit = text, ""
+    if text and text[-1] in _UNITS:
+        number, unit = text[:-1], text[-1]
+    try:
+        size = int(float(number) * _UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r} (e.g. 4K, 1M, 10G)") from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, got {value!r}")
+    return size
+
+
+def format_size(size):
+    for unit in ("G", "M", "K"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return str(size)
+
+
+class StreamWorkload(Workload):
+    """Chunked binary streaming over large files or many small ones.
+
+    Every file of the dataset is read (or written, or copied) with one
+    ``read(chunk)``/``write(chunk)`` call per ``--chunk-size`` bytes, at most
+    ``--concurrency`` files at a time. ``--files 1 --file-size 1G`` models
+    blob staging, ``--files 100000 --file-size 1K`` models log shipping
+    and other many-small-files traffic. Throughput is reported in MB/s,
+    chunk operations/s and files/s.
+    """
+
+    name = "stream"
+    label = "streamed"
+    iterations = 5
+    requires = {"asyncio": ("aiofiles",)}
+    additive = ("bytes", "ops", "files")
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--dir", default="stream_files",
+                            help="dataset directory; missing or wrongly sized files are created")
+        parser.add_argument("--op", choices=("read", "write", "copy"), default="read",
+                            help="read the dataset, write <file>_out, or both (default: read)")
+        parser.add_argument("--files", type=int, default=1, help="files in the dataset")
+        parser.add_argument("--file-size", type=parse_size, default=parse_size("100M"),
+                            help="bytes per file, with K/M/G suffixes (default: 100M)")
+        parser.add_argument("--chunk-size", type=parse_size, default=parse_size("64K"),
+                            help="bytes per read()/write() call, 4K to 4M (default: 64K)")
+        parser.add_argument("--concurrency", type=int, default=64,
+                            help="files open at once (0 = unlimited)")
+        parser.add_argument("--text", action="store_true",
+                            help="open files in text mode, as the io workload does")
+
+    def setup(self):
+        args = self.args
+        os.makedirs(args.dir, exist_ok=True)
+        # Text runs get their own ASCII files; random bytes are not valid UTF-8.
+        ext = "txt" if args.text else "bin"
+        self.paths = [os.path.join(args.dir, f"stream_{i}.{ext}") for i in range(args.files)]
+        block = os.urandom(min(_FILL_BLOCK, args.file_size))
+        if args.text:
+            block = b"A" * len(block)
+        for path in self.paths:
+            if os.path.exists(path) and os.path.getsize(path) == args.file_size:
+                continue
+            with open(path, "wb") as f:
+                remaining = args.file_size
+                while remaining:
+                    remaining -= f.write(block[:remaining])
+        chunk = block * (args.chunk_size // len(block) + 1)
+        self.chunk = chunk[:args.chunk_size]
+        if args.text:
+            self.chunk = self.chunk.decode("ascii")
+
+    def for_worker(self, index, count):
+        self.paths = self.paths[index::count]
+
+    def teardown(self):
+        for p in self.paths:
+            out_file = p + "_out"
+            if os.path.exists(out_file):
+                os.remove(out_file)
+
+    def _mode(self, mode):
+        return mode if self.args.text else mode + "b"
+
+    async def read_file(self, rt, path):
+        size = self.args.chunk_size
+        nbytes = ops = 0
+        async with rt.open_file(path, self._mode("r")) as f:
+            while True:
+                data = await f.read(size)
+                ops += 1
+                if not data:
+                    break
+                nbytes += len(data)
+        return nbytes, ops
+
+    async def write_file(self, rt, path):
+        remaining = self.args.file_size
+        ops = 0
+        async with rt.open_file(path, self._mode("w")) as f:
+            while remaining:
+                n = min(remaining, self.args.chunk_size)
+                await f.write(self.chunk if n == self.args.chunk_size else self.chunk[:n])
+                remaining -= n
+                ops += 1
+        return self.args.file_size, ops
+
+    async def copy_file(self, rt, src, dst):
+        size = self.args.chunk_size
+        nbytes = ops = 0
+        async with rt.open_file(src, self._mode("r")) as fin, \
+                rt.open_file(dst, self._mode("w")) as fout:
+            while True:
+                data = await fin.read(size)
+                ops += 1
+                if not data:
+                    break
+                await fout.write(data)
+                ops += 1
+                nbytes += len(data)
+        return nbytes, ops
+
+    async def _one(self, rt, limiter, path, totals):
+        async with limiter if limiter is not None else contextlib.nullcontext():
+            if self.args.op == "read":
+                nbytes, ops = await self.read_file(rt, path)
+            elif self.args.op == "write":
+                nbytes, ops = await self.write_file(rt, path + "_out")
+            else:
+                nbytes, ops = await self.copy_file(rt, path, path + "_out")
+        totals[0] += nbytes
+        totals[1] += ops
+
+    async def iteration(self, rt, state):
+        limiter = rt.limiter(self.args.concurrency) if self.args.concurrency > 0 else None
+        totals = [0, 0]
+        start = time.perf_counter()
+
+        async with rt.open_group() as g:
+            for p in self.paths:
+                await g.spawn(self._one, rt, limiter, p, totals)
+
+        return {
+            "seconds": time.perf_counter() - start,
+            "bytes": totals[0],
+            "ops": totals[1],
+            "files": len(self.paths),
+        }
+
+    def format_sample(self, rt, sample):
+        seconds = sample["seconds"] or float("nan")
+        return (f"{rt.name}: {self.label} {sample['bytes'] / 1e6:.1f} MB ({sample['files']} files, "
+                f"{self.args.op}, {format_size(self.args.chunk_size)} chunks) "
+                f"in {sample['seconds']:.9f} seconds "
+                f"({sample['bytes'] / 1e6 / seconds:.2f} MB/s, {sample['ops'] / seconds:.0f} ops/s, "
+                f"{sample['files'] / seconds:.0f} files/s)")
+
+    def format_summary(self, samples):
+        seconds = sum(s["seconds"] for s in samples) or float("nan")
+        return (f"rate: {sum(s['bytes'] for s in samples) / 1e6 / seconds:.2f} MB/s, "
+                f"{sum(s['ops'] for s in samples) / seconds:.0f} ops/s, "
+                f"{sum(s['files'] for s in samples) / seconds:.0f} files/s")
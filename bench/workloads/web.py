@@ -0,0 +1,97 @@
+import contextlib
+import time
+
+from bench import clients
+from bench.histogram import Histogram
+from bench.workloads.base import Workload
+
+# Pool settings the original reuse benchmarks hardcoded per library.
+POOL_OPTIONS = {
+    "aiohttp": {"limit": 100, "limit_per_host": 20},
+    "httpx": {"max_connections": 100, "max_keepalive_connections": 20},
+    "native": {"max_connections": 100},
+}
+# Client used when --client is not given.
+DEFAULT_CLIENTS = {"asyncio": "aiohttp", "trio": "httpx", "curio": "native"}
+
+
+class WebWorkload(Workload):
+    """Fetches a URL set concurrently, with a new session per round or a reused pool."""
+
+    name = "web"
+    label = "URLs"
+    iterations = 5
+    fresh_loop = False
+    additive = ("successful",)
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument("--url", default="http://localhost:1337")
+        parser.add_argument("--count", type=int, default=50,
+                            help="number of times the URL is fetched per round")
+        parser.add_argument("--mode", choices=("new-session", "reuse"), default="reuse",
+                            help="open a new session per round or reuse one pooled session")
+        parser.add_argument("--client", default=None, choices=sorted(clients.CLIENTS),
+                            help="HTTP client (default: aiohttp on asyncio loops, httpx on trio, "
+                                 "native on curio)")
+        parser.add_argument("--timeout", type=float, default=10.0)
+        parser.add_argument("--pause", type=float, default=1.0,
+                            help="untimed idle seconds between rounds")
+
+    def for_worker(self, index, count):
+        self.args.count = self.args.count // count + (index < self.args.count % count)
+
+    def client_for(self, rt):
+        if self.args.client:
+            return self.args.client
+        return DEFAULT_CLIENTS[rt.family]
+
+    def unsupported(self, rt):
+        client = self.client_for(rt)
+        if client not in clients.compatible(rt):
+            return f"client {client} is unavailable under {rt.name}"
+        return None
+
+    def _open(self, rt, pooled):
+        client = self.client_for(rt)
+        options = POOL_OPTIONS.get(client, {}) if pooled else {}
+        return clients.open_client(client, rt, **options)
+
+    @contextlib.asynccontextmanager
+    async def session(self, rt):
+        if self.args.mode == "reuse":
+            async with self._open(rt, pooled=True) as client:
+                yield client
+        else:
+            yield None
+
+    async def fetch(self, client, url, hist):
+        start = time.perf_counter()
+        try:
+            status = await client.get(url, timeout=self.args.timeout)
+        except Exception:
+            return
+        if status == 200:
+            hist.record(time.perf_counter() - start)
+
+    async def _round(self, rt, client, hist):
+        async with rt.open_group() as g:
+            for _ in range(self.args.count):
+                await g.spawn(self.fetch, client, self.args.url, hist)
+
+    async def iteration(self, rt, client):
+        hist = Histogram()
+        start = time.perf_counter()
+        if client is None:
+            async with self._open(rt, pooled=False) as fresh:
+                await self._round(rt, fresh, hist)
+        else:
+            await self._round(rt, client, hist)
+        seconds = time.perf_counter() - start
+
+        await rt.sleep(self.args.pause)
+        return {"seconds": seconds, "successful": hist.count, "histogram": hist}
+
+    def format_sample(self, rt, sample):
+        return (f"{rt.name}: fetched {self.args.count} {self.label} in {sample['seconds']:.9f} seconds "
+                f"(successful: {sample['successful']}/{self.args.count})")
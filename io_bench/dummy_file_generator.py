@@ -1,12 +1,211 @@
+"""Generates datasets for the file workloads.
+
+With no arguments it writes the original dataset: 500 files of 50 KB of
+"A" in ./test_files. Options add size distributions, incompressible or
+text-like content, nested directory trees and parallel generation, and
+can fsync the files or evict them from the page cache so that cold-cache
+reads can be measured as well as warm ones:
+
+    python io_bench/dummy_file_generator.py --files 100000 --size 4K \\
+        --distribution lognormal --content text --depth 2 --fanout 32
+    python io_bench/dummy_file_generator.py --files 200 --distribution zipf \\
+        --min-size 4K --max-size 64M --content random --drop-cache
+    python io_bench/dummy_file_generator.py --drop-cache-only   # before a cold run
+"""
+import argparse
+import bisect
+import itertools
+import math
 import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Run as a script from anywhere: make the bench package importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.workloads.stream import parse_size  # noqa: E402
+
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "zipf")
+CONTENTS = ("repeat", "random", "text")
+
+_BLOCK = 1024 ** 2
+_WORDS = ("GET", "POST", "200", "404", "500", "user", "request", "session", "api", "v1",
+          "status", "ok", "error", "timeout", "latency_ms", "bytes", "id", "info", "warn",
+          "debug", "cache", "hit", "miss", "db", "query", "select", "from", "where", "and")
+
+
+def file_sizes(n, distribution="fixed", size=50 * 1024, min_size=None, max_size=None,
+               sigma=1.0, zipf_s=1.2, seed=0):
+    """Sizes of ``n`` files.
+
+    ``fixed`` and ``lognormal`` are centred on ``size`` (the lognormal
+    mean). ``uniform`` draws from [``min_size``, ``max_size``]. ``zipf``
+    draws multiples k of ``min_size`` up to ``max_size`` with P(k) ~ k^-s:
+    many small files and a heavy tail of large ones.
+    """
+    rng = random.Random(seed)
+    low = 1 if min_size is None else min_size
+    high = 10 * size if max_size is None else max_size
+    if distribution == "fixed":
+        return [size] * n
+    if distribution == "uniform":
+        return [rng.randint(low, high) for _ in range(n)]
+    if distribution == "lognormal":
+        mu = math.log(size) - sigma ** 2 / 2
+        return [min(max(int(rng.lognormvariate(mu, sigma)), low), high) for _ in range(n)]
+    if distribution == "zipf":
+        unit = min_size or 1024
+        ranks = max(1, high // unit)
+        cumulative = list(itertools.accumulate(k ** -zipf_s for k in range(1, ranks + 1)))
+        total = cumulative[-1]
+        return [unit * (bisect.bisect_left(cumulative, rng.random() * total) + 1) for _ in range(n)]
+    raise ValueError(f"unknown distribution {distribution!r} (choose from {', '.join(DISTRIBUTIONS)})")
+
+
+def relative_path(i, depth=0, fanout=16, suffix=".txt"):
+    """``d03/d11/file_i.txt``-style path spreading files over ``fanout``**``depth`` directories."""
+    parts = []
+    rest = i
+    for _ in range(depth):
+        parts.append(f"d{rest % fanout:02d}")
+        rest //= fanout
+    return os.path.join(*parts, f"file_{i}{suffix}")
+
+
+def _text_corpus(rng, size):
+    """Log-like lines: compressible roughly like real text, unlike "AAAA"."""
+    out = bytearray()
+    while len(out) < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14)))
+        out += f"{rng.randint(10 ** 9, 10 ** 10)} {words}\n".encode()
+    return bytes(out)
+
 
-def create_files(n=500, size_kb=50, directory="test_files"):
+def _content_writer(content, seed):
+    rng = random.Random(seed)
+    if content == "repeat":
+        block = b"A" * _BLOCK
+        return lambda n: block[:n]
+    if content == "random":
+        return rng.randbytes
+    corpus = _text_corpus(rng, 4 * _BLOCK)
+
+    def text(n):
+        start = rng.randrange(len(corpus) - min(n, len(corpus)) + 1)
+        return corpus[start:start + n]
+    return text
+
+
+def _write_batch(directory, jobs, content, seed, fsync):
+    chunk = _content_writer(content, seed)
+    written = 0
+    for rel, size in jobs:
+        path = os.path.join(directory, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining:
+                remaining -= f.write(chunk(min(remaining, _BLOCK)))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        written += size
+    return written
+
+
+def drop_cache(directory):
+    """Evicts every file under ``directory`` from the page cache.
+
+    Uses posix_fadvise(DONTNEED) per file, which needs no privileges but
+    only drops clean pages, so dirty data is synced first. Returns the
+    number of files advised, or None where fadvise is unavailable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return None
+    os.sync()
+    count = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            fd = os.open(os.path.join(root, name), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+            count += 1
+    return count
+
+
+def create_files(n=500, size_kb=50, directory="test_files", *, distribution="fixed",
+                 size=None, min_size=None, max_size=None, sigma=1.0, zipf_s=1.2,
+                 content="repeat", depth=0, fanout=16, workers=None, fsync=False,
+                 seed=0):
+    """Writes ``n`` files under ``directory`` and returns the bytes written.
+
+    The defaults reproduce the original 500 x 50 KB "A" files. Files are
+    split into batches written by a pool of ``workers`` processes
+    (default: one per CPU).
+    """
+    size = size_kb * 1024 if size is None else size
+    sizes = file_sizes(n, distribution, size, min_size, max_size, sigma, zipf_s, seed)
+    suffix = ".bin" if content == "random" else ".txt"
+    jobs = [(relative_path(i, depth, fanout, suffix), s) for i, s in enumerate(sizes)]
     os.makedirs(directory, exist_ok=True)
-    data = "A" * (size_kb * 1024)
-    for i in range(n):
-        with open(os.path.join(directory, f"file_{i}.txt"), "w") as f:
-            f.write(data)
+
+    workers = workers or os.cpu_count() or 1
+    batches = [jobs[i::workers * 4] for i in range(workers * 4)]
+    batches = [b for b in batches if b]
+    if workers == 1 or len(batches) == 1:
+        return sum(_write_batch(directory, b, content, seed + i, fsync) for i, b in enumerate(batches))
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_write_batch, directory, b, content, seed + i, fsync)
+                   for i, b in enumerate(batches)]
+        return sum(f.result() for f in futures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a dataset for the file workloads.")
+    parser.add_argument("--dir", default="test_files")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--size", type=parse_size, default=50 * 1024,
+                        help="file size for fixed, mean for lognormal (default: 50K)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--min-size", type=parse_size, default=None,
+                        help="lower bound; the zipf size unit (default: 1 byte, 1K for zipf)")
+    parser.add_argument("--max-size", type=parse_size, default=None,
+                        help="upper bound (default: 10 x --size)")
+    parser.add_argument("--sigma", type=float, default=1.0, help="lognormal shape")
+    parser.add_argument("--zipf-s", type=float, default=1.2, help="zipf exponent")
+    parser.add_argument("--content", choices=CONTENTS, default="repeat",
+                        help="repeat: 'A' bytes (original), random: incompressible, "
+                             "text: log-like lines")
+    parser.add_argument("--depth", type=int, default=0, help="levels of nested directories")
+    parser.add_argument("--fanout", type=int, default=16, help="subdirectories per level")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="generator processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fsync", action="store_true", help="fsync every file after writing it")
+    parser.add_argument("--drop-cache", action="store_true",
+                        help="evict the dataset from the page cache afterwards (cold reads)")
+    parser.add_argument("--drop-cache-only", action="store_true",
+                        help="only evict an existing dataset from the page cache")
+    args = parser.parse_args(argv)
+
+    if not args.drop_cache_only:
+        written = create_files(args.files, directory=args.dir, distribution=args.distribution,
+                               size=args.size, min_size=args.min_size, max_size=args.max_size,
+                               sigma=args.sigma, zipf_s=args.zipf_s, content=args.content,
+                               depth=args.depth, fanout=args.fanout, workers=args.workers,
+                               fsync=args.fsync, seed=args.seed)
+        print(f"Dummy files have been generated: {args.files} files, {written / 1e6:.1f} MB "
+              f"in {args.dir}")
+    if args.drop_cache or args.drop_cache_only:
+        count = drop_cache(args.dir)
+        if count is None:
+            print("posix_fadvise is unavailable; page cache not dropped")
+        else:
+            print(f"Dropped {count} files from the page cache.")
+
 
 if __name__ == "__main__":
-    create_files()
-    print("Dummy files have been generated.")
+    main()
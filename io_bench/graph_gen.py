@@ -1,30 +1,48 @@
-import sys
 import os
-import re
+import sys
+import json
 import argparse
 import statistics
 import matplotlib.pyplot as plt
 
-def parse_log_file(filepath):
-    """Parses a log file to extract execution times."""
-    times = []
-    time_pattern = re.compile(r"in\s+([\d\.]+)\s+seconds")
+# Run as a script from anywhere: make the bench package importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.analysis import bootstrap_ci  # noqa: E402
+
+def load_results(filepath, workload=None, run_id=None):
+    """Reads benchmark records from a JSONL result store (see bench/results.py).
 
+    Returns one entry per runtime with its per-iteration times in ms, taken
+    from the requested run or, by default, the latest run of each runtime.
+    """
+    records = []
     try:
         with open(filepath, 'r') as f:
             for line in f:
-                match = time_pattern.search(line)
-                if match and "total" not in line.lower(): 
-                    times.append(float(match.group(1)) * 1000) # Convert to ms immediately
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
     except FileNotFoundError:
         print(f"Error: File '{filepath}' not found.")
-        return None
+        return []
 
-    if not times:
-        return None
+    latest = {}
+    for record in records:
+        if record.get("kind") != "run" or not record.get("samples"):
+            continue
+        if workload and record["workload"] != workload:
+            continue
+        if run_id and record["run_id"] != run_id:
+            continue
+        latest[(record["workload"], record["runtime"])] = record  # later lines win
 
-    label = os.path.basename(filepath).replace(".txt", "").replace("_", " ").title()
-    return {"label": label, "times": times}
+    data = []
+    for (wl, runtime), record in latest.items():
+        label = runtime if workload else f"{runtime} ({wl})"
+        times = [s["seconds"] * 1000 for s in record["samples"]]  # Convert to ms immediately
+        data.append({"label": label, "times": times})
+    return data
 
 def save_violin_plot(data_list):
     """Graph 1: Distribution Density (Violin Plot) - Best for outliers."""
@@ -50,14 +68,16 @@ def save_violin_plot(data_list):
     print("Saved: graph_distribution.png")
 
 def save_comparison_bar(data_list):
-    """Graph 2: Simple Average Comparison (Bar Chart)."""
+    """Graph 2: Average Comparison (Bar Chart) with bootstrap CI error bars."""
     plt.figure(figsize=(10, 6))
     labels = [d['label'] for d in data_list]
     means = [statistics.mean(d['times']) for d in data_list]
+    cis = [bootstrap_ci(d['times']) for d in data_list]
+    errors = [[m - lo for m, (lo, hi) in zip(means, cis)], [hi - m for m, (lo, hi) in zip(means, cis)]]
     
-    bars = plt.bar(labels, means, color=['#3498db', '#2ecc71', '#e74c3c', '#f1c40f'])
+    bars = plt.bar(labels, means, yerr=errors, capsize=6, color=['#3498db', '#2ecc71', '#e74c3c', '#f1c40f'])
     
-    plt.title('Average Execution Time (Mean)')
+    plt.title('Average Execution Time (Mean, 95% bootstrap CI)')
     plt.ylabel('Time (milliseconds)')
     plt.grid(axis='y', linestyle='--', alpha=0.3)
     
@@ -88,14 +108,15 @@ def save_time_series(data_list):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("files", nargs="+")
+    parser.add_argument("files", nargs="*", default=["results.jsonl"],
+                        help="JSONL result stores written by `python -m bench run`")
+    parser.add_argument("--workload", default=None, help="only plot this workload (e.g. io)")
+    parser.add_argument("--run-id", default=None, help="only plot this run")
     args = parser.parse_args()
 
     all_data = []
     for f in args.files:
-        data = parse_log_file(f)
-        if data:
-            all_data.append(data)
+        all_data.extend(load_results(f, args.workload, args.run_id))
 
     if not all_data:
         print("No data found.")